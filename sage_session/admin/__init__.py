@@ -1 +1,3 @@
 from .user_session import UserSession
+from .user_session_archive import UserSessionArchiveAdmin
+from .session_rollup import SessionRollupAdmin
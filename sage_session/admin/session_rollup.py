@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from sage_session.models import SessionRollup
+
+
+@admin.register(SessionRollup)
+class SessionRollupAdmin(admin.ModelAdmin):
+    """Analytics dashboard reading only the precomputed session rollups."""
+
+    change_list_template = "session_rollups.html"
+    default_hours = 24
+    max_hours = 24 * 7
+    max_values = 20
+
+    def changelist_view(self, request, extra_context=None):
+        dimensions = dict(SessionRollup.DIMENSIONS)
+        dimension = request.GET.get("dimension")
+        if dimension not in dimensions:
+            dimension = "country"
+        try:
+            hours = int(request.GET.get("hours", self.default_hours))
+        except ValueError:
+            hours = self.default_hours
+        hours = min(max(hours, 1), self.max_hours)
+
+        now = timezone.now()
+        series = SessionRollup.objects.series(
+            dimension, now - timedelta(hours=hours - 1), now
+        )
+        current = {value: points[-1][1] for value, points in series.items()}
+        total = sum(current.values())
+        values = sorted(series, key=lambda value: (-current[value], value))
+        rows = [
+            {
+                "value": value or _("Unknown"),
+                "active": current[value],
+                "share": current[value] * 100 / total if total else 0,
+                "hourly": [point[1] for point in series[value]],
+            }
+            for value in values[: self.max_values]
+        ]
+        periods = [point[0] for point in next(iter(series.values()), [])]
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Session Analytics"),
+            "dimensions": dimensions,
+            "dimension": dimension,
+            "dimension_label": dimensions[dimension],
+            "hours": hours,
+            "periods": periods,
+            "rows": rows,
+            "total": total,
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, self.change_list_template, context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,14 +1,94 @@
-from django.contrib import admin
+import logging
+
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.sessions.models import Session
-from django.utils.translation import gettext_lazy as _
-from sage_session.models import UserSession
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _, ngettext
+from sage_session.local_cache import local_caches
+from sage_session.models import Browser, Device, UserSession
+from sage_session.utils.engines import delete_sessions_in_batches
+from sage_session.utils.queries import record_queries
+
+logger = logging.getLogger(__name__)
+
+
+class BulkSessionActionsMixin:
+    """Admin actions ending thousands of sessions without the delete collector.
+
+    The selection, or every filtered row with "select all", is processed in
+    batches of `SESSION_ADMIN_BATCH_SIZE` with set-based deletes. Progress is
+    logged after each batch and summarized in a message.
+    """
+
+    session_key_field = "session_id"
+
+    def run_in_batches(self, request, queryset, verb, revoke=True):
+        total = queryset.count()
+        batch_size = getattr(settings, "SESSION_ADMIN_BATCH_SIZE", 1000)
+        started = timezone.now()
+
+        def progress(done):
+            logger.info("%s %d of %d session(s).", verb, done, total)
+
+        processed = delete_sessions_in_batches(
+            queryset,
+            self.session_key_field,
+            batch_size=batch_size,
+            revoke=revoke,
+            progress=progress,
+        )
+        batches = -(-processed // batch_size)
+        self.message_user(
+            request,
+            ngettext(
+                "%(verb)s %(count)d session in %(batches)d batch(es) (%(seconds).1fs).",
+                "%(verb)s %(count)d sessions in %(batches)d batch(es) (%(seconds).1fs).",
+                processed,
+            )
+            % {
+                "verb": verb,
+                "count": processed,
+                "batches": batches,
+                "seconds": (timezone.now() - started).total_seconds(),
+            },
+            messages.SUCCESS,
+        )
+
+    @admin.action(description=_("Revoke selected sessions"), permissions=["delete"])
+    def revoke_sessions(self, request, queryset):
+        self.run_in_batches(request, queryset, _("Revoked"))
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """Shows the sessions stored on one of the `SESSION_SHARDS`.
+
+    Changelist queries are not bound to a user, so `SessionShardRouter`
+    cannot place them; without a selection the default database is listed.
+    Hidden when sharding is disabled.
+    """
+
+    title = _("Shard")
+    parameter_name = "shard"
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in UserSession.objects.shard_aliases()]
+
+    def queryset(self, request, queryset):
+        if self.value() in UserSession.objects.shard_aliases():
+            return queryset.using(self.value())
+        return queryset
 
 
 @admin.register(UserSession)
-class UserSessionAdmin(admin.ModelAdmin):
+class UserSessionAdmin(BulkSessionActionsMixin, admin.ModelAdmin):
     list_display = (
         "user",
-        "session",
+        "session_key",
         "ip_address",
         "city",
         "country",
@@ -19,26 +99,31 @@ class UserSessionAdmin(admin.ModelAdmin):
         "expires_at",
     )
     list_filter = (
+        ShardListFilter,
         "user",
         "created_at",
         "last_activity",
         "expires_at",
         "country",
-        "browser_info",
+        "browser",
+        "is_flagged",
     )
     search_fields = (
-        "session__session_key",
+        "session_id",
         "user__username",
         "ip_address",
         "city",
         "country",
-        "browser_info",
-        "device_info",
+        "browser__label",
+        "device__label",
     )
     autocomplete_fields = (
         'user',
-        'session',
+        'browser',
+        'device',
     )
+    raw_id_fields = ("session",)
+    list_select_related = ("user", "browser", "device")
     fieldsets = (
         (
             _("Session Details"),
@@ -52,8 +137,10 @@ class UserSessionAdmin(admin.ModelAdmin):
                     "ip_address",
                     "city",
                     "country",
-                    "browser_info",
-                    "device_info",
+                    "browser",
+                    "device",
+                    "fingerprint",
+                    "is_flagged",
                 ),
             },
         ),
@@ -72,9 +159,90 @@ class UserSessionAdmin(admin.ModelAdmin):
     )
     date_hierarchy = "created_at"
     list_per_page = 20
+    actions = ("revoke_sessions", "purge_expired_sessions")
+
+    @admin.display(description=_("Session"), ordering="session_id")
+    def session_key(self, obj):
+        return obj.session_id
+
+    @admin.action(
+        description=_("Purge selected sessions that have expired"),
+        permissions=["delete"],
+    )
+    def purge_expired_sessions(self, request, queryset):
+        self.run_in_batches(request, queryset.expired(), _("Purged"), revoke=False)
+
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None or not UserSession.objects.shard_aliases():
+            return obj
+        # Change links of a shard selected in `ShardListFilter`.
+        field = self.model._meta.get_field(from_field or self.model._meta.pk.name)
+        for alias in UserSession.objects.shard_aliases():
+            try:
+                return (
+                    self.get_queryset(request)
+                    .using(alias)
+                    .get(**{field.name: field.to_python(object_id)})
+                )
+            except (self.model.DoesNotExist, ValidationError, ValueError):
+                continue
+        return None
+
+    def get_urls(self):
+        return [
+            path(
+                "caches/",
+                self.admin_site.admin_view(self.caches_view),
+                name="sage_session_usersession_caches",
+            ),
+            *super().get_urls(),
+        ]
+
+    def caches_view(self, request):
+        """Shows the in-process cache statistics and clears the caches on POST."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if request.method == "POST":
+            if not self.has_delete_permission(request):
+                raise PermissionDenied
+            local_caches.clear_everywhere()
+            self.message_user(
+                request,
+                _("The caches of every process are cleared within one sync interval."),
+                messages.SUCCESS,
+            )
+            return redirect(request.path)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Session Caches"),
+            "caches": local_caches.stats(),
+            "budget": local_caches.budget,
+            "total_bytes": local_caches.nbytes,
+            "workers": local_caches.worker_stats(),
+            "can_clear": self.has_delete_permission(request),
+        }
+        return TemplateResponse(request, "session_caches.html", context)
+
+    def changelist_view(self, request, extra_context=None):
+        # The ChangeList evaluates the page of sessions while it is built, so
+        # recording this call covers its queries; the response is returned
+        # unrendered to keep TemplateResponse post-processing working.
+        with record_queries(request, "UserSessionAdmin.changelist"):
+            return super().changelist_view(request, extra_context)
+
+
+@admin.register(Browser, Device)
+class InternedValueAdmin(admin.ModelAdmin):
+    list_display = ("label",)
+    search_fields = ("label",)
 
 
 @admin.register(Session)
-class SessionAdmin(admin.ModelAdmin):
+class SessionAdmin(BulkSessionActionsMixin, admin.ModelAdmin):
     list_display = ['session_key', 'expire_date']
     search_fields = ['session_key',]
+    actions = ("revoke_sessions",)
+    session_key_field = "session_key"
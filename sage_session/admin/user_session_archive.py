@@ -0,0 +1,57 @@
+from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+from sage_session.models import UserSessionArchive
+
+
+@admin.register(UserSessionArchive)
+class UserSessionArchiveAdmin(admin.ModelAdmin):
+    """Read-only view of the archived session history."""
+
+    list_display = (
+        "user",
+        "session_key",
+        "ip_address",
+        "browser_info",
+        "device_info",
+        "session_created_at",
+        "last_activity",
+        "archived_at",
+    )
+    list_filter = ("session_created_at", "archived_at")
+    search_fields = ("session_key", "user__username", "ip_address")
+    list_select_related = ("user",)
+    date_hierarchy = "session_created_at"
+    list_per_page = 20
+    fieldsets = (
+        (
+            _("Session Details"),
+            {
+                "fields": (
+                    "user",
+                    "session_key",
+                    "ip_address",
+                    "city",
+                    "country",
+                    "browser_info",
+                    "device_info",
+                ),
+            },
+        ),
+        (
+            _("Activity Tracking"),
+            {
+                "fields": (
+                    "session_created_at",
+                    "last_activity",
+                    "expires_at",
+                    "archived_at",
+                ),
+            },
+        ),
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SageSessionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sage_session"
+
+    def ready(self):
+        from sage_session import receivers  # noqa: F401
@@ -1,13 +1,65 @@
 import logging
-from ipware import get_client_ip
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import get_user_model, logout
+from django.db import connections, router, transaction
+from django.db.models import F
 from django.utils import timezone
-from sage_session.models import UserSession
-from user_agents import parse
-from django.contrib.gis.geoip2 import GeoIP2
+from sage_session.cache import invalidate_session_list
+from sage_session.geo import locate
+from sage_session.handlers.session import SessionHandler
+from sage_session.local_cache import lru_cached
+from sage_session.models import Browser, Device, SessionRollup, UserSession
+from sage_session.routers import shard_for_user, use_primary
+from sage_session.utils.engines import delete_sessions, uses_session_model
+from sage_session.utils.fingerprint import (
+    FINGERPRINT_SESSION_KEY,
+    get_request_fingerprint,
+)
+from sage_session.utils.ip import get_client_ip
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cached("user_agents", maxsize=1024)
+def parse_user_agent(user_agent):
+    """Parses a `User-Agent` string; a few distinct strings cover most logins.
+
+    `user_agents` compiles large regular expression tables on import, so it
+    is only imported once the first session is created.
+    """
+    try:
+        from user_agents import parse
+    except ImportError as err:
+        raise ImportError(
+            "Install `user-agents` package. Run `pip install user-agents`."
+        ) from err
+    return parse(user_agent)
+
+
+# Columns refreshed when a session key is tracked again.
+UPSERT_FIELDS = (
+    "ip_address",
+    "city",
+    "country",
+    "browser",
+    "device",
+    "last_activity",
+    "expires_at",
+    "fingerprint",
+    "modified_at",
+)
+
+EVICTION_POLICIES = {
+    # Keep the most recently active sessions, evict the idle ones.
+    "lru": (F("last_activity").desc(nulls_last=True), "-pk"),
+    # Keep the most recently created sessions, evict the oldest ones.
+    "oldest": ("-created_at", "-pk"),
+    # Keep every existing session and refuse the new one.
+    "reject": ("-created_at", "-pk"),
+}
+
+
 class SessionBackend:
     """
     A utility class responsible for managing and updating session-related data,
@@ -16,19 +68,91 @@ class SessionBackend:
     information such as geographic location, device details, and time.
     """
 
+    @staticmethod
+    def start_session(request):
+        """
+        Starts tracking the current session of the authenticated user and
+        returns whether it is tracked.
+
+        The tracking marker, the session key and the `UserSession` row are
+        created together: when the session already lives in the store (e.g.
+        right after `login()`), the marker rides along with the write
+        `SessionMiddleware` does anyway. Otherwise the session is saved here
+        to obtain its key, and `SessionMiddleware` saves it again and sets
+        the cookie on the response.
+        """
+        session_name = getattr(settings, "CUSTOM_SESSION_NAME", "default_session")
+        expiry_time = getattr(settings, "EXPIRY_TIME", 5)
+        max_sessions = getattr(settings, "MAX_USER_SESSIONS", 10)
+        policy = getattr(settings, "SESSION_EVICTION_POLICY", "lru")
+
+        ip_address, _ = get_client_ip(request)
+        if ip_address is None:
+            logger.warning(
+                "Could not determine the client IP of %s, session is not tracked.",
+                request.user,
+            )
+            return False
+
+        with transaction.atomic(savepoint=False):
+            allowed = SessionBackend.enforce_session_limit(
+                request.user, max_sessions, policy
+            )
+            if allowed:
+                SessionHandler(request).set(session_name, "Rc", expiry_time)
+                request.session[FINGERPRINT_SESSION_KEY] = get_request_fingerprint(
+                    request
+                )
+                is_new = not request.session.session_key
+                if is_new:
+                    # The row needs the key now; the session stays modified
+                    # so `SessionMiddleware` still sends it in the cookie.
+                    request.session.save()
+                track_rollup = SessionRollup.objects.is_incremental()
+                if track_rollup and not is_new:
+                    # Logins of the user are serialized by the limit's row
+                    # lock, so the row cannot appear between check and upsert.
+                    with use_primary():
+                        is_new = (
+                            not UserSession.objects.for_user(request.user)
+                            .filter(session_id=request.session.session_key)
+                            .exists()
+                        )
+                user_session = SessionBackend.create_or_update_session(
+                    request, expiry_time
+                )
+                if track_rollup and is_new:
+                    transaction.on_commit(
+                        lambda: SessionRollup.objects.record(user_session, started=1)
+                    )
+
+        if not allowed:
+            logger.info(
+                "User %s has reached the maximum number of allowed sessions.",
+                request.user,
+            )
+            logout(request)
+            messages.warning(
+                request,
+                "You have reached the maximum number of active sessions.",
+                fail_silently=True,
+            )
+        return allowed
+
     @staticmethod
     def create_or_update_session(request, expiry_time):
         """
         Creates or updates a session for the authenticated user by extracting
         information such as the IP address, geographic location (city and
         country), browser information, and device information. The session
-        expiration time is also set.
+        expiration time is also set. The row is upserted, so a retried or
+        concurrent first request updates it instead of failing. Returns the
+        `UserSession` that was written.
         """
-        g = GeoIP2()
         user_agent = request.META.get("HTTP_USER_AGENT", "")
         ip_address, is_routable = get_client_ip(request)
 
-        if ip_address in ["127.0.0.1", "localhost"] or not is_routable:
+        if not is_routable:
             city = {
                 "accuracy_radius": None,
                 "city": "Local",
@@ -55,23 +179,108 @@ class SessionBackend:
                 "is_in_european_union": None,
             }
         else:
-            city = g.city(ip_address)
-            country = g.country(ip_address)
+            city, country = locate(ip_address)
 
-        browser_info = SessionBackend.get_browser_info(user_agent)
-        device_info = SessionBackend.get_device_info(user_agent)
-
-        UserSession.objects.create(
+        browser = SessionBackend.get_browser_info(user_agent)
+        device = SessionBackend.get_device_info(user_agent)
+        alias = shard_for_user(request.user) or router.db_for_write(Browser)
+        now = timezone.now()
+        user_session = UserSession(
             user=request.user,
             session_id=request.session.session_key,
             ip_address=ip_address,
-            browser_info=browser_info,
-            device_info=device_info,
-            last_activity=timezone.now(),
+            browser_id=(
+                Browser.objects.intern(browser, using=alias) if browser else None
+            ),
+            device_id=Device.objects.intern(device, using=alias) if device else None,
+            last_activity=now,
             city=city,
             country=country,
-            expires_at=timezone.now() + timezone.timedelta(minutes=expiry_time),
+            expires_at=now + timezone.timedelta(minutes=expiry_time),
+            fingerprint=get_request_fingerprint(request) or "",
         )
+        SessionBackend.upsert_session(user_session)
+        return user_session
+
+    @staticmethod
+    def upsert_session(user_session):
+        """
+        Inserts `user_session`, or updates the row already tracking its
+        session key, in a single statement.
+
+        Backends supporting `INSERT ... ON CONFLICT DO UPDATE` resolve racing
+        first requests and retries atomically in the database. Others fall
+        back to `update_or_create`, which locks the existing row first.
+        """
+        user_sessions = UserSession.objects.for_user(user_session.user)
+        using = shard_for_user(user_session.user) or router.db_for_write(UserSession)
+        if connections[using].features.supports_update_conflicts_with_target:
+            user_sessions.bulk_create(
+                [user_session],
+                update_conflicts=True,
+                unique_fields=["session"],
+                update_fields=UPSERT_FIELDS,
+            )
+            # `bulk_create` sends no `post_save`.
+            invalidate_session_list(user_session.user_id, using=using)
+        else:
+            user_sessions.update_or_create(
+                session_id=user_session.session_id,
+                defaults={
+                    field: getattr(user_session, field)
+                    for field in UPSERT_FIELDS
+                    if field != "modified_at"
+                }
+                | {"user": user_session.user},
+            )
+
+    @staticmethod
+    def enforce_session_limit(user, max_sessions, policy="lru"):
+        """
+        Makes room for a new session of `user` according to the eviction
+        `policy` and returns whether the new session may be tracked.
+
+        The user row is locked first so concurrent logins of the same user
+        are serialized. A single query ordered by the policy index then
+        returns only the sessions beyond the `max_sessions - 1` ones to keep,
+        and those are deleted in one set-based statement. Deleting the
+        Django `Session` cascades to the `UserSession` rows and logs the
+        evicted devices out.
+        """
+        keep = max(max_sessions - 1, 0)
+        shard = shard_for_user(user)
+        with use_primary(), transaction.atomic(savepoint=False):
+            list(
+                get_user_model()
+                .objects.select_for_update()
+                .filter(pk=user.pk)
+                .values_list("pk", flat=True)
+            )
+            sessions = (
+                UserSession.objects.for_user(user)
+                .active()
+                .order_by(*EVICTION_POLICIES[policy])
+            )
+
+            if policy == "reject":
+                return not sessions[keep : keep + 1].exists()
+
+            stale_keys = list(sessions.values_list("session_id", flat=True)[keep:])
+            if stale_keys:
+                delete_sessions(stale_keys, user=user)
+                if shard and uses_session_model():
+                    # The cascade only reaches rows stored next to the sessions.
+                    with transaction.atomic(using=shard, savepoint=False):
+                        UserSession.objects.for_user(user).filter(
+                            session_id__in=stale_keys
+                        ).delete()
+                logger.info(
+                    "Evicted %d session(s) of user %s using the %r policy.",
+                    len(stale_keys),
+                    user,
+                    policy,
+                )
+        return True
 
     @staticmethod
     def get_browser_info(user_agent):
@@ -79,7 +288,7 @@ class SessionBackend:
         Extracts and returns the browser information from the `User-Agent`
         string.
         """
-        ua = parse(user_agent)
+        ua = parse_user_agent(user_agent)
         return f"{ua.browser.family} {ua.browser.version_string}"
 
     @staticmethod
@@ -88,5 +297,5 @@ class SessionBackend:
         Extracts and returns the device and operating system (OS) information
         from the `User-Agent` string.
         """
-        ua = parse(user_agent)
+        ua = parse_user_agent(user_agent)
         return f"{ua.device.family} {ua.os.family} {ua.os.version_string}"
@@ -0,0 +1,152 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.db import router
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sage_session.store"
+
+
+class SessionStore(DBStore):
+    """Cached database session engine keeping user id and activity with the data.
+
+    Enable it with `SESSION_ENGINE = "sage_session.backends.store"`. Sessions
+    are rows of `SessionRecord` holding the encoded data, the expiry, the
+    authenticated user id and the last activity:
+
+    - Loading reads the `SESSION_CACHE_ALIAS` cache and falls back to a
+      single `SELECT` of the row, which is then cached.
+    - Saving an existing session is a single `UPDATE` of data, expiry, user
+      id and activity; only new sessions are inserted.
+    - `last_activity` is refreshed by marking authenticated sessions as
+      modified once it is older than `SESSION_STORE_ACTIVITY_INTERVAL`
+      seconds, so the activity rides along with the regular session save
+      instead of costing a write on every request.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._cache = caches[settings.SESSION_CACHE_ALIAS]
+        self.last_activity = None
+        super().__init__(session_key)
+
+    @classmethod
+    def get_model_class(cls):
+        from sage_session.models import SessionRecord
+
+        return SessionRecord
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends (e.g. memcache) raise an exception on invalid
+            # cache keys; treat it as a cache miss.
+            cached = None
+
+        if cached is None:
+            record = self._get_session_from_db()
+            if record is None:
+                return {}
+            cached = (self.decode(record.session_data), record.last_activity)
+            self._cache_session(*cached, expiry=record.expire_date)
+
+        data, self.last_activity = cached
+        if data.get(SESSION_KEY) is not None and self._activity_is_stale():
+            self.modified = True
+        return data
+
+    def _activity_is_stale(self):
+        interval = getattr(settings, "SESSION_STORE_ACTIVITY_INTERVAL", 60)
+        return self.last_activity is None or (
+            (timezone.now() - self.last_activity).total_seconds() >= interval
+        )
+
+    def _cache_session(self, data, last_activity, expiry=None):
+        try:
+            self._cache.set(
+                self.cache_key,
+                (data, last_activity),
+                self.get_expiry_age(expiry=expiry) if expiry else self.get_expiry_age(),
+            )
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    def exists(self, session_key):
+        return bool(
+            session_key
+            and (self.cache_key_prefix + session_key) in self._cache
+            or super().exists(session_key)
+        )
+
+    def create_model_instance(self, data):
+        instance = super().create_model_instance(data)
+        instance.user_id = data.get(SESSION_KEY)
+        instance.last_activity = self.last_activity = timezone.now()
+        return instance
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if must_create:
+            super().save(must_create=True)
+        else:
+            data = self._get_session()
+            now = timezone.now()
+            updated = (
+                self.model.objects.using(router.db_for_write(self.model))
+                .filter(session_key=self.session_key)
+                .update(
+                    session_data=self.encode(data),
+                    expire_date=self.get_expiry_date(),
+                    user_id=data.get(SESSION_KEY),
+                    last_activity=now,
+                )
+            )
+            if not updated:
+                raise UpdateError
+            self.last_activity = now
+        self._cache_session(self._session, self.last_activity)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(self.cache_key_prefix + session_key)
+        super().delete(session_key)
+
+    def flush(self):
+        """Removes the current session data and regenerates the key."""
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    # The cache entry holds the activity next to the data, so the async
+    # variants reuse the synchronous implementation.
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def aexists(self, session_key):
+        return await sync_to_async(self.exists)(session_key)
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    async def adelete(self, session_key=None):
+        return await sync_to_async(self.delete)(session_key)
+
+    async def aflush(self):
+        return await sync_to_async(self.flush)()
@@ -0,0 +1,148 @@
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from sage_session.models import Browser, Device, UserSession
+from sage_session.routers import stick_to_primary, use_primary
+
+logger = logging.getLogger(__name__)
+
+BROWSER_ICONS = {
+    "Chrome": "fa-chrome",
+    "Firefox": "fa-firefox",
+    "Safari": "fa-safari",
+    "Edge": "fa-edge",
+    "Opera": "fa-opera",
+    "Internet Explorer": "fa-internet-explorer",
+}
+
+SESSION_LIST_KEY = "sage_session:sessions:{user_id}"
+ACTIVITY_THROTTLE_KEY = "sage_session:sessions:{user_id}:activity"
+
+
+def get_cache():
+    return caches[getattr(settings, "SESSION_LIST_CACHE", "default")]
+
+
+def serialize_session(user_session):
+    """Returns the listing representation of a `UserSession`."""
+    browser_name = (user_session.browser_info.split() or [""])[0]
+    return {
+        "device_info": user_session.device_info,
+        "ip_address": user_session.ip_address,
+        "browser_info": user_session.browser_info,
+        "browser_icon": BROWSER_ICONS.get(browser_name, "fa-question-circle"),
+        "last_activity": user_session.last_activity,
+        "session_id": user_session.session_id,
+    }
+
+
+def build_session_list(user, session_key=None):
+    """Reads the active sessions of `user` from the database."""
+    return stick_to_primary(
+        list(
+            UserSession.objects.for_user(user)
+            .active()
+            .select_related("browser", "device")
+        ),
+        user,
+        session_key,
+    )
+
+
+def get_list_timeout(user_sessions):
+    """Seconds a list of `user_sessions` may be cached.
+
+    `SESSION_LIST_CACHE_TIMEOUT`, shortened to the time left until the first
+    of the sessions expires, so expired sessions are never listed.
+    """
+    timeout = getattr(settings, "SESSION_LIST_CACHE_TIMEOUT", 300)
+    expirations = [
+        user_session.expires_at
+        for user_session in user_sessions
+        if user_session.expires_at is not None
+    ]
+    if expirations:
+        remaining = (min(expirations) - timezone.now()).total_seconds()
+        timeout = max(min(timeout, math.ceil(remaining)), 1)
+    return timeout
+
+
+def get_session_list(user, session_key=None):
+    """Returns the serialized active sessions of `user`, cached.
+
+    The list, browser icons included, is kept in the `SESSION_LIST_CACHE`
+    cache until its first session expires, for at most
+    `SESSION_LIST_CACHE_TIMEOUT` seconds, and dropped whenever one of the
+    user's sessions changes, so polling clients are served from memory.
+    """
+    cache = get_cache()
+    key = SESSION_LIST_KEY.format(user_id=user.pk)
+    session_list = cache.get(key)
+    if session_list is None:
+        user_sessions = build_session_list(user, session_key)
+        session_list = [
+            serialize_session(user_session) for user_session in user_sessions
+        ]
+        cache.set(key, session_list, get_list_timeout(user_sessions))
+    return session_list
+
+
+def invalidate_session_list(user_id, activity_only=False, using=None):
+    """Drops the cached session list of a user.
+
+    Changes that only touch `last_activity` happen on almost every request,
+    so they invalidate at most once per `SESSION_LIST_ACTIVITY_THROTTLE`
+    seconds. Inside a transaction the entry is dropped again on commit, so a
+    concurrent request cannot re-cache the rows from before the change.
+    """
+    if user_id is None:
+        return
+    cache = get_cache()
+    if activity_only:
+        throttle = getattr(settings, "SESSION_LIST_ACTIVITY_THROTTLE", 60)
+        if not cache.add(ACTIVITY_THROTTLE_KEY.format(user_id=user_id), 1, throttle):
+            return
+
+    key = SESSION_LIST_KEY.format(user_id=user_id)
+    cache.delete(key)
+    if connections[using or DEFAULT_DB_ALIAS].in_atomic_block:
+        transaction.on_commit(lambda: cache.delete(key), using=using)
+
+
+def warm_session_caches(user):
+    """Fills the caches read after login with one query.
+
+    The active sessions of `user` are read from the primary together with
+    their browser and device, which are remembered by the interning caches,
+    and stored as the cached session list. An entry that is already cached
+    is left alone, so repeated logins of the same user cost nothing more.
+    Returns whether the list was cached.
+    """
+    cache = get_cache()
+    key = SESSION_LIST_KEY.format(user_id=user.pk)
+    if key in cache:
+        return False
+    with use_primary():
+        user_sessions = list(
+            UserSession.objects.for_user(user)
+            .active()
+            .select_related("browser", "device")
+        )
+    for user_session in user_sessions:
+        alias = user_session._state.db
+        for manager, value in (
+            (Browser.objects, user_session.browser),
+            (Device.objects, user_session.device),
+        ):
+            if value is not None:
+                manager._remember(alias, value.label, value.pk)
+    return cache.add(
+        key,
+        [serialize_session(user_session) for user_session in user_sessions],
+        get_list_timeout(user_sessions),
+    )
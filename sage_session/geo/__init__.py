@@ -0,0 +1,2 @@
+from .base import GeoProvider, get_geo_provider, locate
+from .range_index import RangeIndex, RangeIndexProvider
@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from sage_session.local_cache import lru_cached
+
+DEFAULT_GEO_PROVIDER = "sage_session.geo.gis.GeoIP2Provider"
+
+# Keys of the city dictionaries stored on `UserSession.city`, with the type
+# each value is converted to when read from text.
+CITY_FIELDS = {
+    "accuracy_radius": int,
+    "city": str,
+    "continent_code": str,
+    "continent_name": str,
+    "country_code": str,
+    "country_name": str,
+    "dma_code": int,
+    "is_in_european_union": lambda value: str(value).lower() in ("1", "true"),
+    "latitude": float,
+    "longitude": float,
+    "metro_code": int,
+    "postal_code": str,
+    "region": str,
+    "region_code": str,
+    "region_name": str,
+    "time_zone": str,
+}
+
+COUNTRY_FIELDS = (
+    "continent_code",
+    "continent_name",
+    "country_code",
+    "country_name",
+    "is_in_european_union",
+)
+
+
+class GeoProvider:
+    """Resolves IP addresses to the city and country stored on sessions.
+
+    Subclasses implement `city`, returning a dictionary with the keys of
+    `CITY_FIELDS` or None for unknown addresses; `country` is derived from
+    it unless overridden.
+    """
+
+    def city(self, ip_address):
+        raise NotImplementedError("Subclasses of GeoProvider must implement city().")
+
+    def country(self, ip_address):
+        city = self.city(ip_address)
+        if city is None:
+            return None
+        return {field: city.get(field) for field in COUNTRY_FIELDS}
+
+
+@lru_cache(maxsize=None)
+def get_geo_provider():
+    """Returns the provider configured in `SESSION_GEO_PROVIDER`.
+
+    The provider class is imported on first use, so unused providers and
+    their dependencies are never loaded.
+    """
+    return import_string(
+        getattr(settings, "SESSION_GEO_PROVIDER", DEFAULT_GEO_PROVIDER)
+    )()
+
+
+@lru_cached("geo_lookups", maxsize=4096, ttl=24 * 60 * 60)
+def locate(ip_address):
+    """Returns the city and country of `ip_address`, remembered for a day.
+
+    Returning users and shared egress addresses resolve without another
+    provider lookup.
+    """
+    provider = get_geo_provider()
+    return provider.city(ip_address), provider.country(ip_address)
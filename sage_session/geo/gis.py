@@ -0,0 +1,28 @@
+from sage_session.geo.base import GeoProvider
+
+try:
+    from django.contrib.gis.geoip2 import GeoIP2
+except ImportError as err:
+    raise ImportError("Install `geoip2` package. Run `pip install geoip2`.") from err
+
+
+class GeoIP2Provider(GeoProvider):
+    """Looks addresses up with GeoDjango's `GeoIP2` and the `GEOIP_PATH` databases.
+
+    The databases are opened on the first lookup and kept open afterwards.
+    """
+
+    def __init__(self):
+        self._geoip = None
+
+    @property
+    def geoip(self):
+        if self._geoip is None:
+            self._geoip = GeoIP2()
+        return self._geoip
+
+    def city(self, ip_address):
+        return self.geoip.city(ip_address)
+
+    def country(self, ip_address):
+        return self.geoip.country(ip_address)
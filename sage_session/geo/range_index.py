@@ -0,0 +1,166 @@
+import csv
+import threading
+from array import array
+from bisect import bisect_right
+from ipaddress import ip_address as parse_ip, ip_network
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from sage_session.geo.base import CITY_FIELDS, GeoProvider
+
+
+class RangeIndex:
+    """Sorted, array-backed index of IP ranges to location records.
+
+    Range starts and ends are kept in parallel sorted sequences per IP
+    version (`array` for IPv4, lists of ints for 128-bit IPv6) together with
+    the position of their record in a tuple of distinct records, so millions
+    of ranges sharing a few thousand locations stay compact. A lookup is one
+    `bisect` over the starts. Ranges must not overlap.
+    """
+
+    def __init__(self, ranges):
+        records = {}
+        by_version = {4: [], 6: []}
+        for start, end, record in ranges:
+            start, end = parse_ip(start), parse_ip(end)
+            key = tuple(sorted(record.items()))
+            record_id = records.setdefault(key, len(records))
+            by_version[start.version].append((int(start), int(end), record_id))
+
+        self.records = tuple(dict(key) for key in records)
+        self.tables = {}
+        for version, entries in by_version.items():
+            entries.sort()
+            starts, ends = (array("I"), array("I")) if version == 4 else ([], [])
+            record_ids = array("I")
+            for start, end, record_id in entries:
+                starts.append(start)
+                ends.append(end)
+                record_ids.append(record_id)
+            self.tables[version] = (starts, ends, record_ids)
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self.tables.values())
+
+    def lookup(self, ip_address):
+        try:
+            address = parse_ip(ip_address)
+        except ValueError:
+            return None
+        starts, ends, record_ids = self.tables[address.version]
+        value = int(address)
+        position = bisect_right(starts, value) - 1
+        if position < 0 or value > ends[position]:
+            return None
+        return self.records[record_ids[position]]
+
+    @classmethod
+    def from_csv(cls, path):
+        """Builds the index from a CSV file with a header row.
+
+        Each row holds either a `network` in CIDR notation or a
+        `start_ip`/`end_ip` pair, followed by any of the `CITY_FIELDS`.
+        """
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            return cls(cls._read_csv_rows(csv.DictReader(csv_file)))
+
+    @staticmethod
+    def _read_csv_rows(reader):
+        for row in reader:
+            network = row.pop("network", None)
+            if network:
+                network = ip_network(network, strict=False)
+                start, end = network.network_address, network.broadcast_address
+            else:
+                start, end = row.pop("start_ip"), row.pop("end_ip")
+            record = {}
+            for field, convert in CITY_FIELDS.items():
+                value = row.get(field)
+                record[field] = convert(value) if value not in (None, "") else None
+            yield start, end, record
+
+    @classmethod
+    def from_mmdb(cls, path):
+        """Builds the index from a MaxMind City or Country database."""
+        try:
+            import maxminddb
+        except ImportError as err:
+            raise ImportError(
+                "Install `maxminddb` package. Run `pip install maxminddb`."
+            ) from err
+
+        with maxminddb.open_database(path) as reader:
+            return cls(
+                (
+                    network.network_address,
+                    network.broadcast_address,
+                    mmdb_record(record),
+                )
+                for network, record in reader
+            )
+
+
+def mmdb_record(record):
+    """Flattens a MaxMind record into the `CITY_FIELDS` dictionary."""
+
+    def name(entry):
+        return (entry.get("names") or {}).get("en")
+
+    city = record.get("city") or {}
+    continent = record.get("continent") or {}
+    country = record.get("country") or record.get("registered_country") or {}
+    location = record.get("location") or {}
+    subdivision = (record.get("subdivisions") or [{}])[0]
+    return {
+        "accuracy_radius": location.get("accuracy_radius"),
+        "city": name(city),
+        "continent_code": continent.get("code"),
+        "continent_name": name(continent),
+        "country_code": country.get("iso_code"),
+        "country_name": name(country),
+        "dma_code": location.get("metro_code"),
+        "is_in_european_union": country.get("is_in_european_union", False),
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+        "metro_code": location.get("metro_code"),
+        "postal_code": (record.get("postal") or {}).get("code"),
+        "region": subdivision.get("iso_code"),
+        "region_code": subdivision.get("iso_code"),
+        "region_name": name(subdivision),
+        "time_zone": location.get("time_zone"),
+    }
+
+
+class RangeIndexProvider(GeoProvider):
+    """Offline provider backed by a `RangeIndex` loaded into memory.
+
+    `SESSION_GEO_DATABASE` points to a `.mmdb` file or a CSV file in the
+    format read by `RangeIndex.from_csv`. The file is loaded on the first
+    lookup; GeoDjango is not needed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, "SESSION_GEO_DATABASE", None)
+        if not self.path:
+            raise ImproperlyConfigured(
+                "RangeIndexProvider requires the SESSION_GEO_DATABASE setting."
+            )
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    if str(self.path).endswith(".mmdb"):
+                        self._index = RangeIndex.from_mmdb(self.path)
+                    else:
+                        self._index = RangeIndex.from_csv(self.path)
+        return self._index
+
+    def city(self, ip_address):
+        record = self.index.lookup(ip_address)
+        return dict(record) if record is not None else None
@@ -5,19 +5,44 @@ from typing import Any, Optional
 from django.conf import settings
 from django.http import HttpRequest
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.contrib.auth import logout
 from django.contrib import messages
 
-try:
-    from cryptography.fernet import InvalidToken
-except ImportError:
-    raise ImportError("Install `cryptography` package. Run `pip install cryptography`.")
-
-from sage_tools.encryptors import FernetEncryptor
+from sage_session.local_cache import lru_cached
 
 logger = logging.getLogger(__name__)
 
 
+def _import_fernet():
+    """Imports the encryption dependencies on first use.
+
+    Checking whether a session is tracked or expired needs no decryption,
+    so `cryptography` is only loaded when a value is encrypted or read.
+    """
+    try:
+        from cryptography.fernet import InvalidToken
+    except ImportError as err:
+        raise ImportError(
+            "Install `cryptography` package. Run `pip install cryptography`."
+        ) from err
+
+    from sage_tools.encryptors import FernetEncryptor
+
+    return FernetEncryptor, InvalidToken
+
+
+@lru_cached("encryptors", maxsize=4)
+def get_fernet(secret_key):
+    """Returns the encryptor for `secret_key`, built once per process.
+
+    Building it decodes and validates the key, which would otherwise be
+    repeated by every handler of every request.
+    """
+    fernet_encryptor, _ = _import_fernet()
+    return fernet_encryptor(secret_key)
+
+
 class SessionHandler:
     """Manages session variables with encryption and a custom expiry time for
     enhanced security and privacy.
@@ -35,7 +60,10 @@ class SessionHandler:
         """Initializes the SessionHandler with the current request and uses the
         secret key from Django settings for encryption."""
         self.request = request
-        self.fernet = FernetEncryptor(settings.FERNET_SECRET_KEY)
+
+    @cached_property
+    def fernet(self):
+        return get_fernet(settings.FERNET_SECRET_KEY)
 
     def set(
         self, key: str, value: str, lifespan=timedelta(minutes=10), encrypt=True
@@ -69,13 +97,14 @@ class SessionHandler:
             expiry = session_info.get("lifespan", 0)
             if timezone.now().timestamp() - created_at < expiry:
                 encrypted_value = session_info.get("value")
+                _, invalid_token = _import_fernet()
                 try:
                     return (
                         self.fernet.decrypt(encrypted_value)
                         if decrypt
                         else encrypted_value
                     )
-                except InvalidToken:
+                except invalid_token:
                     logger.error(
                         "Invalid token for session key %s. Possible data tampering.",
                         key,
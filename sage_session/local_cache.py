@@ -0,0 +1,317 @@
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "sage_session:local_caches:generation"
+WORKERS_KEY = "sage_session:local_caches:workers"
+STATS_KEY = "sage_session:local_caches:stats:{slot}"
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+_MISSING = object()
+
+
+class CacheEntry:
+    """A cached value with its expiry time and approximate size in bytes."""
+
+    __slots__ = ("value", "expires", "size")
+
+    def __init__(self, value, expires, size):
+        self.value = value
+        self.expires = expires
+        self.size = size
+
+
+class LRUCache:
+    """Thread-safe in-process cache bounded by entries, age and memory.
+
+    Entries beyond `maxsize` (or the size configured for `name` in
+    `SESSION_LOCAL_CACHE_SIZES`) are evicted least recently used first, and
+    entries older than `ttl` seconds are dropped when read. Every cache
+    belongs to a `CacheRegistry`, which keeps the approximate memory used by
+    all of them under `SESSION_LOCAL_CACHE_BUDGET` bytes and reports their
+    hit, miss and eviction counts.
+
+    Sizes are estimated with `sys.getsizeof` of the key and the value, so
+    nested containers are undercounted; the budget is a guard against
+    unbounded growth, not an exact accounting.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=None, registry=None):
+        self.name = name
+        self.default_maxsize = maxsize
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.registry = registry or local_caches
+        self.registry.register(self)
+
+    @property
+    def maxsize(self):
+        sizes = getattr(settings, "SESSION_LOCAL_CACHE_SIZES", None) or {}
+        return sizes.get(self.name, self.default_maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key, value):
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        maxsize = self.maxsize
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(value, expires, size)
+            self.nbytes += size
+            while len(self._entries) > maxsize:
+                self.evict_oldest()
+        self.registry.enforce_budget()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def evict_oldest(self):
+        """Drops the least recently used entry; returns whether one existed."""
+        with self._lock:
+            if not self._entries:
+                return False
+            _, entry = self._entries.popitem(last=False)
+            self.nbytes -= entry.size
+            self.evictions += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key):
+        self.nbytes -= self._entries.pop(key).size
+
+
+class CacheRegistry:
+    """All in-process caches of sage_session, under one memory budget.
+
+    When the caches together use more than `SESSION_LOCAL_CACHE_BUDGET`
+    bytes, entries are evicted from the largest cache until they fit.
+
+    Each process is also synchronized through the `SESSION_LOCAL_CACHE_SHARED`
+    cache when a request finishes, at most every
+    `SESSION_LOCAL_CACHE_SYNC_INTERVAL` seconds: it publishes its statistics
+    there, for the `session_caches` command and other processes to read, and
+    clears its caches when `clear_everywhere()` was called since the previous
+    synchronization.
+
+    Every process publishes its statistics under its own numbered slot with
+    an expiry, so processes never overwrite each other and stopped ones
+    disappear on their own. A starting process takes over the first expired
+    slot with an atomic `add`, and only adds a slot when all are live, so
+    the number of slots stays at the peak number of live processes.
+    """
+
+    def __init__(self):
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._generation = None
+        self._next_sync = 0.0
+        self._slot = None
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(self, cache):
+        self._caches[cache.name] = cache
+
+    def __getitem__(self, name):
+        return self._caches[name]
+
+    def __iter__(self):
+        return iter(sorted(self._caches.values(), key=lambda cache: cache.name))
+
+    @property
+    def budget(self):
+        return getattr(settings, "SESSION_LOCAL_CACHE_BUDGET", DEFAULT_MEMORY_BUDGET)
+
+    @property
+    def shared_cache(self):
+        return caches[getattr(settings, "SESSION_LOCAL_CACHE_SHARED", "default")]
+
+    @property
+    def nbytes(self):
+        return sum(cache.nbytes for cache in self._caches.values())
+
+    def enforce_budget(self):
+        budget = self.budget
+        if not budget:
+            return
+        while self.nbytes > budget:
+            largest = max(self._caches.values(), key=lambda cache: cache.nbytes)
+            if not largest.evict_oldest():
+                return
+
+    def clear(self, name=None):
+        """Clears one cache, or all of them, in this process."""
+        for cache in [self[name]] if name else self:
+            cache.clear()
+
+    def stats(self):
+        return [cache.stats() for cache in self]
+
+    def maybe_sync(self):
+        if time.monotonic() < self._next_sync:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.sync()
+        except Exception:
+            logger.exception("Could not synchronize the local sage_session caches.")
+        finally:
+            self._next_sync = time.monotonic() + getattr(
+                settings, "SESSION_LOCAL_CACHE_SYNC_INTERVAL", 30
+            )
+            self._lock.release()
+
+    def sync(self):
+        """Applies pending clears and publishes the statistics of this process."""
+        shared = self.shared_cache
+        generation = shared.get(GENERATION_KEY, 0)
+        if self._generation is not None and generation != self._generation:
+            self.clear()
+        self._generation = generation
+
+        interval = getattr(settings, "SESSION_LOCAL_CACHE_SYNC_INTERVAL", 30)
+        snapshot = {
+            "worker": self.worker,
+            "updated": time.time(),
+            "caches": self.stats(),
+        }
+        if self._slot is not None:
+            key = STATS_KEY.format(slot=self._slot)
+            published = shared.get(key)
+            if published is None or published["worker"] == self.worker:
+                shared.set(key, snapshot, interval * 3)
+                return
+            # The slot expired while this process was idle and was reused.
+        self._slot = self.claim_slot(snapshot, interval * 3)
+
+    def claim_slot(self, snapshot, timeout):
+        """Publishes `snapshot` in a free slot and returns its number."""
+        shared = self.shared_cache
+        slots = range(1, (shared.get(WORKERS_KEY) or 0) + 1)
+        published = shared.get_many([STATS_KEY.format(slot=slot) for slot in slots])
+        for slot in slots:
+            key = STATS_KEY.format(slot=slot)
+            if key not in published and shared.add(key, snapshot, timeout):
+                return slot
+
+        shared.add(WORKERS_KEY, 0, None)
+        try:
+            slot = shared.incr(WORKERS_KEY)
+        except ValueError:
+            # The counter was evicted between `add` and `incr`.
+            shared.set(WORKERS_KEY, 1, None)
+            slot = 1
+        shared.set(STATS_KEY.format(slot=slot), snapshot, timeout)
+        return slot
+
+    def clear_everywhere(self):
+        """Clears the caches of every process within one sync interval."""
+        shared = self.shared_cache
+        shared.add(GENERATION_KEY, 0, None)
+        try:
+            shared.incr(GENERATION_KEY)
+        except ValueError:
+            shared.set(GENERATION_KEY, 1, None)
+        self.clear()
+
+    def worker_stats(self):
+        """Returns the statistics last published by each live process."""
+        slots = range(1, (self.shared_cache.get(WORKERS_KEY) or 0) + 1)
+        snapshots = self.shared_cache.get_many(
+            [STATS_KEY.format(slot=slot) for slot in slots]
+        )
+        return {
+            snapshot["worker"]: snapshot
+            for snapshot in sorted(
+                snapshots.values(), key=lambda snapshot: snapshot["worker"]
+            )
+        }
+
+
+local_caches = CacheRegistry()
+
+
+def lru_cached(name, maxsize=1024, ttl=None):
+    """Memoizes a function in a registered `LRUCache` named `name`.
+
+    A drop-in replacement for `functools.lru_cache`: arguments must be
+    hashable and the wrapper exposes `cache_clear()`.
+    """
+
+    def decorator(function):
+        cache = LRUCache(name, maxsize=maxsize, ttl=ttl)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = function(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
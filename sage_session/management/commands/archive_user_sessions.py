@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sage_session.models import UserSessionArchive
+from sage_session.utils.engines import purge_orphaned_sessions
+
+
+class Command(BaseCommand):
+    help = "Moves expired user sessions into the append-only archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=0,
+            help="Only archive sessions expired at least this many minutes ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sessions moved per transaction.",
+        )
+        parser.add_argument(
+            "--purge-orphans",
+            action="store_true",
+            help="Also delete tracked sessions that no longer exist in the session store.",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(minutes=options["older_than"])
+        archived = UserSessionArchive.objects.archive_expired(
+            before=before, batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} session(s)."))
+        if options["purge_orphans"]:
+            purged = purge_orphaned_sessions(batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Purged {purged} orphaned session(s).")
+            )
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sage_session.models import SessionRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the recent session analytics rollups from the session tables "
+        "and merges old hourly buckets into daily ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=48,
+            help="Number of recent hourly buckets recomputed from the session tables.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help=(
+                "Recompute the recent buckets even when the rollups are maintained "
+                'by signals (SESSION_ROLLUP_MODE = "signals").'
+            ),
+        )
+        parser.add_argument(
+            "--daily-after",
+            type=int,
+            default=30,
+            help="Merge hourly buckets older than this many days into daily buckets.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options["rebuild"] or not SessionRollup.objects.is_incremental():
+            rebuilt = SessionRollup.objects.rebuild(
+                now - timedelta(hours=options["hours"]), now
+            )
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} bucket(s)."))
+        if options["daily_after"]:
+            removed = SessionRollup.objects.compact(
+                now - timedelta(days=options["daily_after"])
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Compacted away {removed} hourly bucket(s).")
+            )
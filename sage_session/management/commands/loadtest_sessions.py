@@ -0,0 +1,228 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.db.models import Count
+from django.test import Client
+
+from sage_session.models import UserSession
+from sage_session.utils.queries import QueryRecorder
+
+USERNAME_PREFIX = "sage-loadtest-"
+
+DEFAULT_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates a login storm: many users log in concurrently and send their "
+        "first request through the configured middleware stack. Run it against "
+        "a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=100, help="Number of simulated users."
+        )
+        parser.add_argument(
+            "--sessions-per-user",
+            type=int,
+            default=3,
+            help="Concurrent logins of each user, from different clients.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Number of clients running at the same time.",
+        )
+        parser.add_argument(
+            "--user-agent",
+            action="append",
+            dest="user_agents",
+            help="User-Agent to draw clients from. May be repeated.",
+        )
+        parser.add_argument(
+            "--ip-pool",
+            type=int,
+            default=256,
+            help="Number of distinct private client addresses to draw from.",
+        )
+        parser.add_argument(
+            "--path", default="/", help="Path requested after each login."
+        )
+        parser.add_argument("--seed", type=int, help="Seed of the random choices.")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the simulated users and their sessions afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["sessions_per_user"] < 1:
+            raise CommandError("--users and --sessions-per-user must be positive.")
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be positive.")
+
+        rng = random.Random(options["seed"])  # noqa: S311
+        user_agents = options["user_agents"] or DEFAULT_USER_AGENTS
+        addresses = [
+            f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+            for index in range(1, options["ip_pool"] + 1)
+        ]
+        users, created = self.create_users(options["users"])
+        clients = [
+            (user, rng.choice(user_agents), rng.choice(addresses))
+            for user in users
+            for _ in range(options["sessions_per_user"])
+        ]
+        rng.shuffle(clients)
+
+        try:
+            started = time.perf_counter()
+            if options["concurrency"] == 1:
+                results = [
+                    self.simulate(*client, options["path"]) for client in clients
+                ]
+            else:
+                with ThreadPoolExecutor(options["concurrency"]) as executor:
+                    results = list(
+                        executor.map(
+                            lambda client: self.simulate_in_thread(
+                                *client, options["path"]
+                            ),
+                            clients,
+                        )
+                    )
+            elapsed = time.perf_counter() - started
+            self.report(results, elapsed, users)
+        finally:
+            if not options["keep"] and created:
+                # Users left by an earlier run with `--keep` are not removed.
+                user_model = get_user_model()
+                user_model.objects.filter(
+                    **{f"{user_model.USERNAME_FIELD}__in": created}
+                ).delete()
+
+    def create_users(self, count):
+        """Returns the simulated users and the usernames this run created."""
+        user_model = get_user_model()
+        usernames = [f"{USERNAME_PREFIX}{index}" for index in range(count)]
+        existing = set(
+            user_model.objects.filter(
+                **{f"{user_model.USERNAME_FIELD}__in": usernames}
+            ).values_list(user_model.USERNAME_FIELD, flat=True)
+        )
+        new_users = []
+        for username in usernames:
+            if username not in existing:
+                user = user_model(**{user_model.USERNAME_FIELD: username})
+                user.set_unusable_password()
+                new_users.append(user)
+        user_model.objects.bulk_create(new_users)
+        users = list(
+            user_model.objects.filter(**{f"{user_model.USERNAME_FIELD}__in": usernames})
+        )
+        return users, [user.get_username() for user in new_users]
+
+    def simulate_in_thread(self, user, user_agent, ip_address, path):
+        try:
+            return self.simulate(user, user_agent, ip_address, path)
+        finally:
+            connections.close_all()
+
+    def simulate(self, user, user_agent, ip_address, path):
+        """Logs `user` in from a new client and sends its first request."""
+        client = Client(
+            HTTP_USER_AGENT=user_agent,
+            REMOTE_ADDR=ip_address,
+            HTTP_HOST=self.get_host(),
+        )
+        recorders = [QueryRecorder("loadtest", alias) for alias in connections]
+        error = None
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(
+                    connections[recorder.alias].execute_wrapper(recorder)
+                )
+            started = time.perf_counter()
+            try:
+                client.force_login(user)
+                client.get(path)
+            except OperationalError as e:
+                error = e
+            duration = (time.perf_counter() - started) * 1000
+        queries = [query for recorder in recorders for query in recorder.queries]
+        return duration, queries, error
+
+    @staticmethod
+    def get_host():
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        return hosts[0].lstrip(".") if hosts else "testserver"
+
+    def report(self, results, elapsed, users):
+        durations = [duration for duration, _, error in results if error is None]
+        errors = [error for _, _, error in results if error is not None]
+        locked = [error for error in errors if "locked" in str(error).lower()]
+        lock_waits = [
+            query["duration"]
+            for _, queries, _ in results
+            for query in queries
+            if "FOR UPDATE" in query["sql"].upper()
+        ]
+        query_count = sum(len(queries) for _, queries, _ in results)
+
+        max_sessions = getattr(settings, "MAX_USER_SESSIONS", 10)
+        user_ids = [user.pk for user in users]
+        overshoot = 0
+        for sessions in UserSession.objects.on_each_shard():
+            overshoot += (
+                sessions.active()
+                .filter(user_id__in=user_ids)
+                .values("user_id")
+                .annotate(total=Count("pk"))
+                .filter(total__gt=max_sessions)
+                .count()
+            )
+
+        self.stdout.write(f"Logins:          {len(results)} ({len(errors)} failed)")
+        self.stdout.write(f"Throughput:      {len(results) / elapsed:.1f} logins/s")
+        self.stdout.write(
+            "Latency (ms):    "
+            f"p50 {percentile(durations, 0.50):.1f}  "
+            f"p95 {percentile(durations, 0.95):.1f}  "
+            f"p99 {percentile(durations, 0.99):.1f}  "
+            f"max {max(durations, default=0):.1f}"
+        )
+        self.stdout.write(
+            f"Queries:         {query_count} ({query_count / len(results):.1f} per login)"
+        )
+        self.stdout.write(
+            f"Lock waits:      {len(lock_waits)} row locks, "
+            f"p99 {percentile(lock_waits, 0.99):.1f} ms, "
+            f"{len(locked)} 'database is locked' errors"
+        )
+        message = f"Limit overshoot: {overshoot} user(s) above MAX_USER_SESSIONS={max_sessions}"
+        self.stdout.write(
+            self.style.ERROR(message) if overshoot else self.style.SUCCESS(message)
+        )
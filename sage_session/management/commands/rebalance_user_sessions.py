@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sage_session.models import Browser, Device, UserSession
+from sage_session.routers import get_session_shards, shard_for_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves user sessions to the shard their user hashes to, e.g. after "
+        "changing SESSION_SHARDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            action="append",
+            dest="sources",
+            help=(
+                "Database alias to drain misplaced sessions from. May be repeated; "
+                "defaults to every alias in SESSION_SHARDS."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sessions moved per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many sessions would be moved.",
+        )
+
+    def handle(self, *args, **options):
+        shards = get_session_shards()
+        if not shards:
+            raise CommandError("SESSION_SHARDS is not configured.")
+
+        total = 0
+        for source in options["sources"] or shards:
+            moved = self.rebalance(source, options["batch_size"], options["dry_run"])
+            self.stdout.write(f"{source}: {moved} misplaced session(s).")
+            total += moved
+
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} session(s)."))
+
+    def rebalance(self, source, batch_size, dry_run):
+        """Copies misplaced rows of `source` to their shard, then deletes them.
+
+        Rows are scanned in primary key order and each batch is inserted on the
+        target shards before being removed from the source, so an interrupted
+        run can simply be restarted.
+        """
+        fields = [
+            field.attname
+            for field in UserSession._meta.concrete_fields
+            if not field.primary_key
+        ]
+        moved = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                UserSession.objects.using(source)
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values("pk", *fields)[:batch_size]
+            )
+            if not batch:
+                return moved
+            last_pk = batch[-1]["pk"]
+
+            targets = {}
+            for row in batch:
+                target = shard_for_user(row["user_id"])
+                if target != source:
+                    targets.setdefault(target, []).append(row)
+            if dry_run or not targets:
+                moved += sum(len(rows) for rows in targets.values())
+                continue
+
+            for target, rows in targets.items():
+                with transaction.atomic(using=target):
+                    UserSession.objects.using(target).filter(
+                        session_id__in=[row["session_id"] for row in rows]
+                    ).delete()
+                    UserSession.objects.using(target).bulk_create(
+                        [
+                            UserSession(**self.relocate(row, fields, source, target))
+                            for row in rows
+                        ]
+                    )
+                with transaction.atomic(using=source):
+                    UserSession.objects.using(source).filter(
+                        pk__in=[row["pk"] for row in rows]
+                    ).delete()
+                moved += len(rows)
+
+    def relocate(self, row, fields, source, target):
+        """Returns the field values of `row` with interned ids of `target`."""
+        values = {field: row[field] for field in fields}
+        for attname, model in (("browser_id", Browser), ("device_id", Device)):
+            if values[attname] is not None:
+                label = model.objects.label_for(values[attname], using=source)
+                values[attname] = model.objects.intern(label, using=target)
+        return values
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from sage_session.local_cache import local_caches
+
+COLUMNS = (
+    "name",
+    "entries",
+    "maxsize",
+    "bytes",
+    "hits",
+    "misses",
+    "hit_rate",
+    "evictions",
+    "expirations",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows the in-process cache statistics published by every running "
+        "process, or clears those caches everywhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Clear the in-process caches of every process within one sync interval.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            local_caches.clear_everywhere()
+            self.stdout.write(
+                self.style.SUCCESS("Requested every process to clear its caches.")
+            )
+            return
+
+        workers = local_caches.worker_stats()
+        if not workers:
+            self.stdout.write("No process has published cache statistics yet.")
+            return
+        for worker, snapshot in workers.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(worker))
+            self.stdout.write("  ".join(f"{column:>12}" for column in COLUMNS))
+            for stats in snapshot["caches"]:
+                stats = {**stats, "hit_rate": f"{stats['hit_rate']:.1%}"}
+                self.stdout.write(
+                    "  ".join(f"{stats[column]!s:>12}" for column in COLUMNS)
+                )
@@ -1,39 +1,125 @@
+import hmac
 import logging
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import logout
+from django.core.exceptions import ImproperlyConfigured
 from sage_session.handlers.session import SessionHandler
-from sage_session.backends.session import SessionBackend
+from sage_session.backends.session import EVICTION_POLICIES, SessionBackend
 from sage_session.models import UserSession
+from sage_session.revocation import revocations
+from sage_session.routers import use_primary
+from sage_session.utils.fingerprint import (
+    FINGERPRINT_MISMATCH_SESSION_KEY,
+    FINGERPRINT_SESSION_KEY,
+    get_request_fingerprint,
+)
+from sage_session.utils.paths import TrackingFilter
+from sage_session.utils.queries import record_queries
 
 logger = logging.getLogger(__name__)
 
 
 class SessionManagementMiddleware(MiddlewareMixin):
+    """
+    Tracks authenticated sessions and enforces their expiration.
+
+    With `SESSION_TRACKING_MODE = "signals"` sessions are only started by
+    the `user_logged_in` receiver and cleaned up on logout or deletion, so
+    this middleware shrinks to an in-memory marker check without queries.
+
+    Sessions revoked on any node (see `sage_session.revocation`) are logged
+    out before anything else, using the in-process copy of the revocation
+    list rather than a database lookup.
+
+    Each tracked session carries the fingerprint of the client that started
+    it. Requests are compared against it in memory; only a mismatch reads
+    the `UserSession` row and applies `SESSION_FINGERPRINT_ACTION`:
+    `"log"` (default), `"flag"` to set `is_flagged`, or `"logout"`. Each
+    mismatching client is handled once per session.
+    """
+
+    FINGERPRINT_ACTIONS = ("log", "flag", "logout")
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.tracking_filter = TrackingFilter.from_settings()
+        self.signals_mode = (
+            getattr(settings, "SESSION_TRACKING_MODE", "middleware") == "signals"
+        )
+        self.fingerprint_action = getattr(settings, "SESSION_FINGERPRINT_ACTION", "log")
+        if self.fingerprint_action not in (None, *self.FINGERPRINT_ACTIONS):
+            raise ImproperlyConfigured(
+                f"Unknown SESSION_FINGERPRINT_ACTION {self.fingerprint_action!r}. "
+                f"Choose one of: {', '.join(self.FINGERPRINT_ACTIONS)}."
+            )
+        policy = getattr(settings, "SESSION_EVICTION_POLICY", "lru")
+        if policy not in EVICTION_POLICIES:
+            raise ImproperlyConfigured(
+                f"Unknown SESSION_EVICTION_POLICY {policy!r}. "
+                f"Choose one of: {', '.join(EVICTION_POLICIES)}."
+            )
+
     def process_request(self, request):
+        session = getattr(request, "session", None)
+        if session is not None and revocations.is_revoked(session.session_key):
+            logger.info("Rejected revoked session of user %s.", request.user)
+            logout(request)
+            return None
+        if self.tracking_filter.is_excluded(request):
+            return None
+        with record_queries(request, self.__class__.__name__):
+            return self.manage_session(request)
+
+    def manage_session(self, request):
         if request.user.is_authenticated:
-            if not request.session.session_key:
-                request.session.save()
             session_handler = SessionHandler(request)
-
             session_name = getattr(settings, "CUSTOM_SESSION_NAME", "default_session")
-            expiry_time = getattr(settings, "EXPIRY_TIME", 5)
 
             if not session_handler.exists(session_name):
-                max_sessions = getattr(settings, "MAX_USER_SESSIONS", 10)
-
-                active_sessions_count = UserSession.objects.filter(
-                    user=request.user
-                ).count()
-
-                if active_sessions_count < max_sessions:
-                    session_handler.set(session_name, "Rc", expiry_time)
-                    SessionBackend.create_or_update_session(request, expiry_time)
-                else:
-                    logger.info(
-                        "User %s has reached the maximum number of allowed sessions.",
-                        request.user,
-                    )
+                if not self.signals_mode:
+                    SessionBackend.start_session(request)
             else:
                 if session_handler.is_expired(session_name):
                     session_handler.handle_expiration(session_name)
                     return
+                self.check_fingerprint(request)
+
+    def check_fingerprint(self, request):
+        expected = request.session.get(FINGERPRINT_SESSION_KEY)
+        if not expected or self.fingerprint_action is None:
+            return
+        current = get_request_fingerprint(request)
+        if current is None or hmac.compare_digest(expected, current):
+            return
+        if current == request.session.get(FINGERPRINT_MISMATCH_SESSION_KEY):
+            return
+        self.handle_fingerprint_mismatch(request, current)
+
+    def handle_fingerprint_mismatch(self, request, fingerprint):
+        user_sessions = UserSession.objects.for_user(request.user).filter(
+            session_id=request.session.session_key
+        )
+        with use_primary():
+            stored = user_sessions.values_list("fingerprint", flat=True).first()
+        if stored == fingerprint:
+            # The session was re-bound to this client since it was cached.
+            request.session[FINGERPRINT_SESSION_KEY] = fingerprint
+            return
+
+        logger.warning(
+            "Session of user %s used from a client not matching its fingerprint.",
+            request.user,
+        )
+        # Later requests from the same client are not looked up and logged again.
+        request.session[FINGERPRINT_MISMATCH_SESSION_KEY] = fingerprint
+        if self.fingerprint_action == "flag":
+            user_sessions.update(is_flagged=True)
+        elif self.fingerprint_action == "logout":
+            logout(request)
+            messages.warning(
+                request,
+                "Your session was ended because it was used from another device.",
+                fail_silently=True,
+            )
@@ -1,24 +1,48 @@
 from django.utils import timezone
+from sage_session.cache import invalidate_session_list
+from sage_session.presence import mark_online
 from sage_session.models import UserSession
+from sage_session.routers import shard_for_user
+from sage_session.utils.paths import TrackingFilter
+from sage_session.utils.queries import record_queries
 
 
 class TrackUserActivityMiddleware:
     """
     Middleware to track the last activity of the user and update the 'last_activity'
     field in the session manager.
+
+    Requests matching `SESSION_TRACKING_EXCLUDED_PATHS` are ignored and the
+    update can be sampled per path with `SESSION_TRACKING_SAMPLE_RATES`.
+    Every other authenticated request also marks the user as online in the
+    cache-backed presence buckets, regardless of sampling.
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.tracking_filter = TrackingFilter.from_settings()
 
     def __call__(self, request):
-        if request.user.is_authenticated:
-            session_manager = UserSession.objects.filter(
-                user=request.user, session__session_key=request.session.session_key
-            ).first()
-            if session_manager:
-                session_manager.last_activity = timezone.now()
-                session_manager.save()
+        if (
+            not self.tracking_filter.is_excluded(request)
+            and request.user.is_authenticated
+        ):
+            mark_online(request.user.pk)
+
+        if self.tracking_filter.should_track(request) and request.user.is_authenticated:
+            with record_queries(request, self.__class__.__name__):
+                now = timezone.now()
+                updated = (
+                    UserSession.objects.for_user(request.user)
+                    .filter(session_id=request.session.session_key)
+                    .update(last_activity=now, modified_at=now)
+                )
+                if updated:
+                    invalidate_session_list(
+                        request.user.pk,
+                        activity_only=True,
+                        using=shard_for_user(request.user),
+                    )
 
         response = self.get_response(request)
         return response
@@ -1 +1,5 @@
+from .user_agent import Browser, Device
 from .user_session import UserSession
+from .user_session_archive import UserSessionArchive
+from .session_record import SessionRecord
+from .session_rollup import SessionRollup
@@ -0,0 +1,415 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.fields.json import KT
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from sage_session.local_cache import LRUCache
+from sage_session.routers import get_session_shards, shard_for_user, use_primary
+
+
+class InternedValueManager(models.Manager):
+    """Manager mapping repeated strings to the ids of their interned rows.
+
+    Both directions are cached in-process, so a label seen before costs no
+    query when a session is inserted and an id seen before costs no query
+    when its label is displayed. Entries are keyed by model and database
+    alias because ids differ between tables and shards, and each direction
+    is a registered LRU cache of at most `max_cached` entries.
+    """
+
+    max_cached = 10000
+    _ids = LRUCache("interned_ids", maxsize=max_cached)
+    _labels = LRUCache("interned_labels", maxsize=max_cached)
+
+    def _remember(self, alias, label, pk):
+        # A row read or created inside a transaction is only cached once the
+        # transaction commits, so a rollback cannot leave a dangling id.
+        transaction.on_commit(partial(self._cache, alias, label, pk), using=alias)
+
+    def _cache(self, alias, label, pk):
+        self._ids.set((self.model, alias, label), pk)
+        self._labels.set((self.model, alias, pk), label)
+
+    def intern(self, label, using=None):
+        """Returns the id of the row holding `label`, creating it if needed."""
+        alias = using or self.db
+        pk = self._ids.get((self.model, alias, label))
+        if pk is not None:
+            return pk
+
+        queryset = self.db_manager(alias)
+        pk = queryset.filter(label=label).values_list("pk", flat=True).first()
+        if pk is None:
+            # Concurrent inserts of the same label resolve on the unique index.
+            queryset.bulk_create([self.model(label=label)], ignore_conflicts=True)
+            pk = queryset.filter(label=label).values_list("pk", flat=True).get()
+        self._remember(alias, label, pk)
+        return pk
+
+    def label_for(self, pk, using=None):
+        """Returns the label of the interned row `pk`."""
+        alias = using or self.db
+        label = self._labels.get((self.model, alias, pk))
+        if label is None:
+            label = (
+                self.db_manager(alias)
+                .filter(pk=pk)
+                .values_list("label", flat=True)
+                .get()
+            )
+            self._remember(alias, label, pk)
+        return label
+
+    def clear_cache(self):
+        self._ids.clear()
+        self._labels.clear()
+
+
+class UserSessionQuerySet(models.QuerySet):
+    """QuerySet for `UserSession` separating live sessions from history."""
+
+    def active(self, now=None):
+        """Sessions that have not expired yet."""
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(expires_at__gt=now) | models.Q(expires_at__isnull=True)
+        )
+
+    def expired(self, now=None):
+        """Sessions whose `expires_at` has passed."""
+        return self.filter(expires_at__lte=now or timezone.now())
+
+    def for_user(self, user):
+        """Sessions of `user`, read from the user's shard when sharded."""
+        queryset = self.filter(user=user)
+        alias = shard_for_user(user)
+        return queryset.using(alias) if alias else queryset
+
+
+class UserSessionManager(models.Manager.from_queryset(UserSessionQuerySet)):
+    """Manager hiding the optional per-user sharding of `UserSession`.
+
+    Per-user lookups and inserts go through `for_user()`; operations that
+    are not bound to a user (cleanup, archiving) iterate `on_each_shard()`.
+    """
+
+    def shard_aliases(self):
+        return get_session_shards()
+
+    def on_each_shard(self):
+        """Returns one queryset per shard, or the routed queryset if unsharded."""
+        aliases = self.shard_aliases()
+        if not aliases:
+            return [self.get_queryset()]
+        return [self.get_queryset().using(alias) for alias in aliases]
+
+
+class UserSessionArchiveManager(models.Manager):
+    """Manager of the append-only `UserSessionArchive` table.
+
+    Expired sessions are moved out of the live table in bulk batches by
+    `archive_expired`, and the history stays available through `for_user`
+    and `export` for audits.
+    """
+
+    ARCHIVED_FIELDS = (
+        "user_id",
+        "ip_address",
+        "city",
+        "country",
+        "last_activity",
+        "expires_at",
+    )
+
+    def for_user(self, user):
+        queryset = self.filter(user=user).order_by("-session_created_at")
+        alias = shard_for_user(user)
+        return queryset.using(alias) if alias else queryset
+
+    def export(self, start=None, end=None, chunk_size=2000, using=None):
+        """Iterates over archived sessions as dictionaries, oldest first.
+
+        With sharding enabled, pass the shard alias in `using`.
+        """
+        queryset = self.db_manager(using).order_by("session_created_at", "pk")
+        if start is not None:
+            queryset = queryset.filter(session_created_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(session_created_at__lt=end)
+        return queryset.values().iterator(chunk_size=chunk_size)
+
+    def archive_expired(self, before=None, batch_size=1000):
+        """Moves sessions expired before `before` into the archive.
+
+        Each batch is copied with one `bulk_create` and removed from the live
+        table with one set-based delete inside the same transaction, so rows
+        are never lost nor duplicated. Returns the number of archived rows.
+        """
+        from sage_session.models import UserSession
+
+        before = before or timezone.now()
+        archived = 0
+        with use_primary():
+            for sessions in UserSession.objects.on_each_shard():
+                archived += self._archive_shard(sessions, before, batch_size)
+        return archived
+
+    def _archive_shard(self, sessions, before, batch_size):
+        """Archives the expired rows of one shard into that shard's archive."""
+        archive = self.db_manager(sessions.db)
+        archived = 0
+        while True:
+            with transaction.atomic(using=sessions.db):
+                batch = list(
+                    sessions.expired(before)
+                    .select_for_update()
+                    .order_by("pk")
+                    .values(
+                        "pk",
+                        "session_id",
+                        "created_at",
+                        "browser__label",
+                        "device__label",
+                        *self.ARCHIVED_FIELDS,
+                    )[:batch_size]
+                )
+                if not batch:
+                    return archived
+
+                archive.bulk_create(
+                    [
+                        self.model(
+                            session_key=row["session_id"],
+                            session_created_at=row["created_at"],
+                            browser_info=row["browser__label"] or "",
+                            device_info=row["device__label"] or "",
+                            **{field: row[field] for field in self.ARCHIVED_FIELDS},
+                        )
+                        for row in batch
+                    ]
+                )
+                sessions.filter(pk__in=[row["pk"] for row in batch]).delete()
+            archived += len(batch)
+
+
+def truncate_to_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class SessionRollupManager(models.Manager):
+    """Manager maintaining and reading the hourly `SessionRollup` counters.
+
+    `record()` adjusts the counters of one session as it starts or ends,
+    `rebuild()` recomputes a range of buckets from the session tables and
+    `series()` turns the buckets into active session counts. Reads never
+    touch `UserSession`, so their cost grows with the number of buckets
+    rather than the number of sessions.
+    """
+
+    def is_incremental(self):
+        """Whether the counters follow sessions as they start and end."""
+        return getattr(settings, "SESSION_ROLLUP_MODE", "command") == "signals"
+
+    @staticmethod
+    def dimensions(session):
+        """Returns the rollup dimensions of a live or archived session."""
+        browser = session.browser_info
+        return {
+            "country": (session.country or {}).get("country_code") or "",
+            "browser": browser.rsplit(" ", 1)[0] if browser else "",
+            "device": session.device_info or "",
+        }
+
+    def record(self, session, started=0, ended=0, when=None):
+        """Adds `started` and `ended` to the buckets `session` falls into."""
+        period = truncate_to_hour(when or timezone.now())
+        for dimension, value in self.dimensions(session).items():
+            self.increment(period, dimension, value, started=started, ended=ended)
+
+    def record_ended(self, sessions, now=None):
+        """Counts `sessions` as ended, with one write per distinct bucket.
+
+        Sessions that already expired are counted in the hour they expired
+        in, the others in the current hour.
+        """
+        now = now or timezone.now()
+        counters = Counter()
+        for session in sessions:
+            ended_at = min(session.expires_at, now) if session.expires_at else now
+            period = truncate_to_hour(ended_at)
+            for dimension, value in self.dimensions(session).items():
+                counters[period, dimension, value] += 1
+        for (period, dimension, value), ended in counters.items():
+            self.increment(period, dimension, value, ended=ended)
+
+    def increment(self, period, dimension, value, started=0, ended=0):
+        counters = {
+            "started": models.F("started") + started,
+            "ended": models.F("ended") + ended,
+        }
+        bucket = self.filter(period=period, dimension=dimension, value=value)
+        if bucket.update(**counters):
+            return
+        try:
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                self.create(
+                    period=period,
+                    dimension=dimension,
+                    value=value,
+                    started=started,
+                    ended=ended,
+                )
+        except IntegrityError:
+            # A concurrent request created the bucket first.
+            bucket.update(**counters)
+
+    def rebuild(self, start, end=None):
+        """Recomputes the buckets from `start` to `end` from the session tables.
+
+        Sessions are counted as started in the hour of their creation and as
+        ended in the hour they expired, from both the live table on every
+        shard and the archive. Sessions deleted without being archived, e.g.
+        on logout, are gone and no longer counted. The buckets in the range
+        are replaced in one transaction. Returns the number of buckets.
+        """
+        from sage_session.models import UserSession, UserSessionArchive
+
+        start = truncate_to_hour(start)
+        end = min(end or timezone.now(), timezone.now())
+        counters = defaultdict(lambda: [0, 0])
+
+        sources = [
+            (sessions, "created_at", "browser__label", "device__label")
+            for sessions in UserSession.objects.on_each_shard()
+        ]
+        archive_aliases = get_session_shards() or [None]
+        sources += [
+            (
+                UserSessionArchive.objects.db_manager(alias).all(),
+                "session_created_at",
+                "browser_info",
+                "device_info",
+            )
+            for alias in archive_aliases
+        ]
+
+        with use_primary():
+            for queryset, created_field, browser_field, device_field in sources:
+                fields = {
+                    "country": KT("country__country_code"),
+                    "browser": models.F(browser_field),
+                    "device": models.F(device_field),
+                }
+                for index, field in enumerate((created_field, "expires_at")):
+                    rows = (
+                        queryset.filter(**{f"{field}__gte": start, f"{field}__lt": end})
+                        .annotate(
+                            bucket=TruncHour(field, tzinfo=dt_timezone.utc),
+                            **{f"rollup_{name}": expr for name, expr in fields.items()},
+                        )
+                        .values("bucket", *(f"rollup_{name}" for name in fields))
+                        .annotate(total=models.Count("pk"))
+                        .order_by()
+                    )
+                    for row in rows:
+                        browser = row["rollup_browser"] or ""
+                        values = {
+                            "country": row["rollup_country"] or "",
+                            "browser": browser.rsplit(" ", 1)[0] if browser else "",
+                            "device": row["rollup_device"] or "",
+                        }
+                        for dimension, value in values.items():
+                            key = (row["bucket"], dimension, value)
+                            counters[key][index] += row["total"]
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            self.filter(period__gte=start, period__lt=end).delete()
+            self.bulk_create(
+                [
+                    self.model(
+                        period=period,
+                        dimension=dimension,
+                        value=value,
+                        started=started,
+                        ended=ended,
+                    )
+                    for (period, dimension, value), (started, ended) in counters.items()
+                ]
+            )
+        return len(counters)
+
+    def compact(self, before):
+        """Merges the hourly buckets older than `before` into daily buckets.
+
+        Counters are summed into the first hour of each day, so the totals
+        every `series()` is based on are preserved. Returns the number of
+        removed rows.
+        """
+        before = truncate_to_hour(before).replace(hour=0)
+        old = self.filter(period__lt=before)
+        daily = (
+            old.annotate(day=TruncDay("period", tzinfo=dt_timezone.utc))
+            .values("day", "dimension", "value")
+            .annotate(started=models.Sum("started"), ended=models.Sum("ended"))
+            .order_by()
+        )
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            rows = [
+                self.model(
+                    period=row["day"],
+                    dimension=row["dimension"],
+                    value=row["value"],
+                    started=row["started"],
+                    ended=row["ended"],
+                )
+                for row in daily
+            ]
+            removed = old.count()
+            old.delete()
+            self.bulk_create(rows)
+        return removed - len(rows)
+
+    def series(self, dimension, start, end=None):
+        """Returns the active sessions per hour for each value of `dimension`.
+
+        The result maps every value to a list of `(period, active)` pairs,
+        one per hour from `start` to `end`. Sessions started before `start`
+        are carried over from one aggregate over the older buckets.
+        """
+        start = truncate_to_hour(start)
+        end = end or timezone.now()
+        buckets = self.filter(dimension=dimension)
+        carried = {
+            row["value"]: row["active"]
+            for row in buckets.filter(period__lt=start)
+            .values("value")
+            .annotate(active=models.Sum("started") - models.Sum("ended"))
+            .order_by()
+        }
+        changes = defaultdict(dict)
+        for period, value, started, ended in buckets.filter(
+            period__gte=start, period__lt=end
+        ).values_list("period", "value", "started", "ended"):
+            changes[value][period] = started - ended
+
+        periods = []
+        period = start
+        while period < end:
+            periods.append(period)
+            period += timedelta(hours=1)
+
+        series = {}
+        for value in set(carried) | set(changes):
+            active = carried.get(value, 0)
+            points = []
+            for period in periods:
+                active += changes[value].get(period, 0)
+                points.append((period, max(active, 0)))
+            series[value] = points
+        return series
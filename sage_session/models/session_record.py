@@ -0,0 +1,44 @@
+from django.contrib.sessions.base_session import AbstractBaseSession
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SessionRecord(AbstractBaseSession):
+    """
+    SessionRecord Model
+
+    Session table of the `sage_session.backends.store` engine. Next to the encoded
+    session data it keeps the hot metadata read on every request, the authenticated
+    user id and the last activity, so a request loads everything with one read and
+    persists it with one write.
+    """
+
+    user_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name=_("User ID"),
+        help_text=_("Primary key of the authenticated user, empty for anonymous sessions."),
+        db_comment="Primary key of the user authenticated in the session.",
+    )
+
+    last_activity = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Last Activity"),
+        help_text=_("The last time the session was used, updated at most once per interval."),
+        db_comment="Timestamp of the latest recorded use of the session.",
+    )
+
+    @classmethod
+    def get_session_store_class(cls):
+        from sage_session.backends.store import SessionStore
+
+        return SessionStore
+
+    class Meta:
+        db_table = "sage_session_store"
+        managed = True
+        verbose_name = _("Session Record")
+        verbose_name_plural = _("Session Records")
@@ -0,0 +1,85 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from sage_session.models.managers import SessionRollupManager
+
+
+class SessionRollup(models.Model):
+    """
+    SessionRollup Model
+
+    Hourly counters of the sessions started and ended per country, browser family and
+    device. Analytics such as "active sessions per country per hour" or the browser
+    share are answered by summing these few rows instead of scanning `UserSession`
+    and extracting keys from its JSON columns.
+
+    Rows are kept up to date either incrementally as sessions start and end
+    (`SESSION_ROLLUP_MODE = "signals"`) or by the `compact_session_rollups`
+    management command, which recomputes recent buckets from the session tables.
+    """
+
+    DIMENSIONS = (
+        ("country", _("Country")),
+        ("browser", _("Browser")),
+        ("device", _("Device")),
+    )
+
+    period = models.DateTimeField(
+        verbose_name=_("Period"),
+        help_text=_("Start of the hour the counters belong to."),
+        db_comment="Start of the hourly bucket.",
+    )
+
+    dimension = models.CharField(
+        max_length=16,
+        choices=DIMENSIONS,
+        verbose_name=_("Dimension"),
+        help_text=_("The session attribute the sessions are grouped by."),
+        db_comment="Name of the grouped session attribute.",
+    )
+
+    value = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_("Value"),
+        help_text=_("Country code, browser family or device; empty when unknown."),
+        db_comment="Value of the grouped session attribute.",
+    )
+
+    started = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Started"),
+        help_text=_("Number of sessions started during the hour."),
+        db_comment="Sessions started in the bucket.",
+    )
+
+    ended = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Ended"),
+        help_text=_("Number of sessions that expired or were ended during the hour."),
+        db_comment="Sessions ended in the bucket.",
+    )
+
+    objects = SessionRollupManager()
+
+    def __str__(self):
+        return f"{self.period:%Y-%m-%d %H:00} {self.dimension}={self.value}"
+
+    class Meta:
+        db_table = "sage_session_rollup"
+        managed = True
+        verbose_name = _("Session Rollup")
+        verbose_name_plural = _("Session Rollups")
+        ordering = ("period", "dimension", "value")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "dimension", "value"],
+                name="sage_session_rollup_bucket_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["dimension", "period"],
+                name="sage_session_rollup_dim_idx",
+            ),
+        ]
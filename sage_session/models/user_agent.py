@@ -0,0 +1,60 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from sage_session.models.managers import InternedValueManager
+
+
+class InternedValue(models.Model):
+    """Base model for small lookup tables of strings shared by many sessions."""
+
+    label = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("Label"),
+        help_text=_("The interned value, shared by every session referencing it."),
+        db_comment="Unique interned string referenced by user sessions.",
+    )
+
+    objects = InternedValueManager()
+
+    def __str__(self):
+        return self.label
+
+    class Meta:
+        abstract = True
+        ordering = ("label",)
+
+
+class Browser(InternedValue):
+    """
+    Browser Model
+
+    Interned browser family and version (e.g. `Chrome 120.0.6099`) of user sessions.
+    A few hundred distinct values are shared by millions of `UserSession` rows, which
+    only store a small integer reference to them.
+    """
+
+    @property
+    def family(self):
+        return self.label.rsplit(" ", 1)[0]
+
+    class Meta(InternedValue.Meta):
+        db_table = "sage_session_browser"
+        managed = True
+        verbose_name = _("Browser")
+        verbose_name_plural = _("Browsers")
+
+
+class Device(InternedValue):
+    """
+    Device Model
+
+    Interned device family and operating system (e.g. `iPhone iOS 17.2`) of user
+    sessions, referenced by `UserSession` through a small integer foreign key.
+    """
+
+    class Meta(InternedValue.Meta):
+        db_table = "sage_session_device"
+        managed = True
+        verbose_name = _("Device")
+        verbose_name_plural = _("Devices")
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router
 from django.conf import settings
 from django.contrib.sessions.models import Session
 from django_jsonform.models.fields import JSONField
@@ -6,6 +6,10 @@ from django.utils.translation import gettext_lazy as _
 
 from sage_tools.mixins.models import TimeStampMixin
 
+from sage_session.models.managers import UserSessionManager
+from sage_session.models.user_agent import Browser, Device
+from sage_session.routers import shard_for_user
+
 
 class UserSession(TimeStampMixin):
     """
@@ -143,9 +147,14 @@ class UserSession(TimeStampMixin):
         "additionalProperties": False,
     }
 
+    # The user, session and lookup tables may live in another database than
+    # the sessions (see `SESSION_SHARDS`), and cache or signed-cookie engines
+    # have no `Session` rows at all, so these relations never get database
+    # constraints; deletes are cascaded or protected by the ORM.
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_constraint=False,
         verbose_name=_("User"),
         help_text=_("The user associated with this session. This is used to identify the owner of the session."),
         db_comment="Reference to the user associated with this session for ownership tracking.",
@@ -154,6 +163,7 @@ class UserSession(TimeStampMixin):
     session = models.OneToOneField(
         Session,
         on_delete=models.CASCADE,
+        db_constraint=False,
         verbose_name=_("Session"),
         help_text=_("The Django session associated with this record. Ensures one session per record."),
         db_comment="Reference to the Django session instance for session tracking.",
@@ -183,16 +193,28 @@ class UserSession(TimeStampMixin):
         db_comment="Optional field to store country information based on the IP address.",
     )
 
-    browser_info = models.TextField(
+    browser = models.ForeignKey(
+        "sage_session.Browser",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
         verbose_name=_("Browser Information"),
         help_text=_("Details about the browser used to access this session. Helps identify user agents."),
-        db_comment="Stores detailed user-agent string or browser metadata for the session.",
+        db_comment="Reference to the interned browser family and version of the session.",
     )
 
-    device_info = models.TextField(
+    device = models.ForeignKey(
+        "sage_session.Device",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
         verbose_name=_("Device Information"),
         help_text=_("Information about the device used for this session. Helps track device type and operating system."),
-        db_comment="Stores metadata about the device (e.g., model, OS) used during the session.",
+        db_comment="Reference to the interned device and operating system of the session.",
     )
 
     last_activity = models.DateTimeField(
@@ -203,6 +225,22 @@ class UserSession(TimeStampMixin):
         db_comment="Records the last activity timestamp for the session. Useful for monitoring activity.",
     )
 
+    fingerprint = models.CharField(
+        max_length=16,
+        blank=True,
+        default="",
+        verbose_name=_("Fingerprint"),
+        help_text=_("Hash of the browser, operating system and network the session was started from."),
+        db_comment="Client fingerprint used to detect sessions reused from another device or network.",
+    )
+
+    is_flagged = models.BooleanField(
+        default=False,
+        verbose_name=_("Flagged"),
+        help_text=_("Set when the session was used from a client that does not match its fingerprint."),
+        db_comment="Marks sessions suspected of being hijacked.",
+    )
+
     expires_at = models.DateTimeField(
         null=True,
         verbose_name=_("Expires At"),
@@ -210,14 +248,65 @@ class UserSession(TimeStampMixin):
         db_comment="Indicates the expiration time for the session. Helps manage session lifecycle.",
     )
 
+    objects = UserSessionManager()
+
+    def _interning_database(self):
+        return self._state.db or shard_for_user(self.user_id) or router.db_for_write(
+            Browser
+        )
+
+    @property
+    def browser_info(self):
+        """Browser family and version, e.g. `Chrome 120.0.6099`."""
+        if self.browser_id is None:
+            return ""
+        if UserSession.browser.is_cached(self):
+            return self.browser.label
+        return Browser.objects.label_for(self.browser_id, using=self._interning_database())
+
+    @browser_info.setter
+    def browser_info(self, value):
+        self.browser_id = (
+            Browser.objects.intern(value, using=self._interning_database())
+            if value
+            else None
+        )
+
+    @property
+    def device_info(self):
+        """Device family and operating system, e.g. `iPhone iOS 17.2`."""
+        if self.device_id is None:
+            return ""
+        if UserSession.device.is_cached(self):
+            return self.device.label
+        return Device.objects.label_for(self.device_id, using=self._interning_database())
+
+    @device_info.setter
+    def device_info(self, value):
+        self.device_id = (
+            Device.objects.intern(value, using=self._interning_database())
+            if value
+            else None
+        )
+
     def __str__(self):
-        return f"{self.user.username}-{self.session.session_key}"
+        return f"{self.user.username}-{self.session_id}"
 
     def __repr__(self) -> str:
-        return f"{self.user.username}-{self.session.session_key}"
+        return f"{self.user.username}-{self.session_id}"
 
     class Meta:
         db_table = "sage_session_user_info"
         managed = True
         verbose_name = _("User Session")
         verbose_name_plural = _("User Sessions")
+        indexes = [
+            models.Index(
+                fields=["user", "last_activity"],
+                name="sage_session_user_activity_idx",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                name="sage_session_user_created_idx",
+            ),
+        ]
@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django_jsonform.models.fields import JSONField
+
+from sage_session.models.managers import UserSessionArchiveManager
+from sage_session.models.user_session import UserSession
+
+
+class UserSessionArchive(models.Model):
+    """
+    UserSessionArchive Model
+
+    Append-only history of expired `UserSession` rows. Keeping expired sessions out of
+    `sage_session_user_info` keeps the live table and its indexes limited to the active
+    working set the middlewares and views query on every request, while audits can still
+    read the full history from here.
+
+    Rows are moved in bulk by `UserSessionArchive.objects.archive_expired()` or the
+    `archive_user_sessions` management command and are never updated afterwards.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_sessions",
+        verbose_name=_("User"),
+        help_text=_("The user who owned the archived session."),
+        db_comment="Reference to the user who owned the archived session.",
+    )
+
+    session_key = models.CharField(
+        max_length=40,
+        verbose_name=_("Session Key"),
+        help_text=_("The key of the Django session, which no longer exists."),
+        db_comment="Key of the archived Django session.",
+    )
+
+    ip_address = models.GenericIPAddressField(
+        verbose_name=_("IP Address"),
+        help_text=_("The IP address from which the session originated."),
+        db_comment="IP address of the device that initiated the session (IPv4/IPv6).",
+    )
+
+    city = JSONField(
+        schema=UserSession.CITY_JSON_SCHEMA,
+        null=True,
+        blank=True,
+        verbose_name=_("City"),
+        help_text=_("The city associated with the session's IP address."),
+        db_comment="City information derived from the IP address.",
+    )
+
+    country = JSONField(
+        schema=UserSession.COUNTRY_JSON_SCHEMA,
+        null=True,
+        blank=True,
+        verbose_name=_("Country"),
+        help_text=_("The country associated with the session's IP address."),
+        db_comment="Country information derived from the IP address.",
+    )
+
+    browser_info = models.TextField(
+        verbose_name=_("Browser Information"),
+        help_text=_("Details about the browser used to access the session."),
+        db_comment="Browser metadata of the archived session.",
+    )
+
+    device_info = models.TextField(
+        verbose_name=_("Device Information"),
+        help_text=_("Information about the device used for the session."),
+        db_comment="Device and OS metadata of the archived session.",
+    )
+
+    last_activity = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Last Activity"),
+        help_text=_("The last recorded activity of the session."),
+        db_comment="Last activity timestamp of the archived session.",
+    )
+
+    expires_at = models.DateTimeField(
+        null=True,
+        verbose_name=_("Expires At"),
+        help_text=_("The timestamp at which the session expired."),
+        db_comment="Expiration timestamp of the archived session.",
+    )
+
+    session_created_at = models.DateTimeField(
+        verbose_name=_("Session Created At"),
+        help_text=_("The timestamp at which the session was started."),
+        db_comment="Creation timestamp of the original session record.",
+    )
+
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Archived At"),
+        help_text=_("The timestamp at which the session was moved to the archive."),
+        db_comment="Timestamp at which the row was archived.",
+    )
+
+    objects = UserSessionArchiveManager()
+
+    def __str__(self):
+        return f"{self.user_id}-{self.session_key}"
+
+    class Meta:
+        db_table = "sage_session_user_info_archive"
+        managed = True
+        verbose_name = _("Archived User Session")
+        verbose_name_plural = _("Archived User Sessions")
+        indexes = [
+            models.Index(
+                fields=["user", "session_created_at"],
+                name="sage_session_archive_user_idx",
+            ),
+            models.Index(
+                fields=["session_created_at"],
+                name="sage_session_archive_date_idx",
+            ),
+        ]
@@ -0,0 +1,56 @@
+from django.utils.translation import gettext_lazy as _
+
+try:
+    from debug_toolbar.panels import Panel
+except ImportError as err:
+    raise ImportError(
+        "Install `django-debug-toolbar` package. Run `pip install django-debug-toolbar`."
+    ) from err
+
+from sage_session.utils.queries import get_recorded_queries
+
+
+class SessionQueriesPanel(Panel):
+    """Debug toolbar panel listing the queries issued by sage_session.
+
+    Only the queries executed by the sage_session middlewares, views and
+    admin during the current request are shown, together with the time
+    each of them took. Recording has to be enabled through
+    `RECORD_SESSION_QUERIES` (defaults to `DEBUG`).
+
+    Add it to the toolbar configuration:
+
+        DEBUG_TOOLBAR_PANELS = [
+            ...
+            "sage_session.panels.SessionQueriesPanel",
+        ]
+
+    """
+
+    title = _("Sage Session")
+    template = "session_queries_panel.html"
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        return _("%(count)d queries in %(time).2fms") % {
+            "count": stats.get("count", 0),
+            "time": stats.get("total_time", 0),
+        }
+
+    def generate_stats(self, request, response):
+        queries = get_recorded_queries(request)
+        sources = {}
+        for query in queries:
+            summary = sources.setdefault(query["source"], {"count": 0, "time": 0.0})
+            summary["count"] += 1
+            summary["time"] += query["duration"]
+
+        self.record_stats(
+            {
+                "queries": queries,
+                "sources": sources,
+                "count": len(queries),
+                "total_time": sum(query["duration"] for query in queries),
+            }
+        )
@@ -0,0 +1,114 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+SEEN_KEY = "sage_session:presence:{minute}:seen:{user_id}"
+LAST_SEEN_KEY = "sage_session:presence:last:{user_id}"
+COUNTER_KEY = "sage_session:presence:{minute}:online"
+INDEX_KEY = "sage_session:presence:{minute}"
+ENTRY_KEY = "sage_session:presence:{minute}:{index}"
+
+
+def get_cache():
+    return caches[getattr(settings, "SESSION_PRESENCE_CACHE", "default")]
+
+
+def get_window():
+    """Minutes after their last request during which a user counts as online."""
+    return getattr(settings, "SESSION_PRESENCE_WINDOW", 5)
+
+
+def current_minute():
+    return int(time.time() // 60)
+
+
+def window_minutes():
+    minute = current_minute()
+    return range(minute - get_window() + 1, minute + 1)
+
+
+def _increment(cache, key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key was evicted between `add` and `incr`.
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def mark_online(user_id):
+    """Records that `user_id` made a request during the current minute.
+
+    Every request costs one `add` in the `SESSION_PRESENCE_CACHE` cache;
+    only the first request of a user in a minute does more. It then moves
+    the user from the counter of the minute they were last seen in to the
+    counter of the current one, so each user is counted in exactly one
+    minute, and appends them to the current minute's entries. Buckets
+    expire on their own once they fall out of the `SESSION_PRESENCE_WINDOW`.
+    """
+    if user_id is None:
+        return
+    cache = get_cache()
+    minute = current_minute()
+    timeout = (get_window() + 1) * 60
+    try:
+        if not cache.add(SEEN_KEY.format(minute=minute, user_id=user_id), 1, timeout):
+            return
+        last_seen_key = LAST_SEEN_KEY.format(user_id=user_id)
+        last_seen = cache.get(last_seen_key)
+        cache.set(last_seen_key, minute, timeout)
+        if last_seen is not None and last_seen != minute:
+            try:
+                cache.decr(COUNTER_KEY.format(minute=last_seen))
+            except ValueError:
+                # That minute's counter has already expired.
+                pass
+        _increment(cache, COUNTER_KEY.format(minute=minute), timeout)
+        index = _increment(cache, INDEX_KEY.format(minute=minute), timeout)
+        cache.set(ENTRY_KEY.format(minute=minute, index=index), user_id, timeout)
+    except Exception:
+        logger.exception("Could not record the presence of user %s.", user_id)
+
+
+def get_online_user_ids():
+    """Returns the ids of the users seen during the last `SESSION_PRESENCE_WINDOW` minutes.
+
+    Reads the number of entries of each minute of the window and then the
+    entries themselves in two cache round trips. The session table is never
+    queried, but the second read fetches one entry per user and minute, so
+    its cost grows with the number of users online; use `count_online()`
+    when only the number is needed.
+    """
+    cache = get_cache()
+    minutes = window_minutes()
+    indexes = cache.get_many([INDEX_KEY.format(minute=minute) for minute in minutes])
+    keys = [
+        ENTRY_KEY.format(minute=minute, index=index)
+        for minute in minutes
+        for index in range(1, indexes.get(INDEX_KEY.format(minute=minute), 0) + 1)
+    ]
+    return set(cache.get_many(keys).values()) if keys else set()
+
+
+def get_online_users():
+    """Returns a queryset of the users currently online."""
+    return get_user_model().objects.filter(pk__in=get_online_user_ids())
+
+
+def count_online():
+    """Returns the number of users currently online, without querying the database.
+
+    Sums the `SESSION_PRESENCE_WINDOW` per-minute counters in one cache
+    round trip, whatever the number of users online. Each user is counted
+    in the minute they were last seen in only.
+    """
+    counters = get_cache().get_many(
+        [COUNTER_KEY.format(minute=minute) for minute in window_minutes()]
+    )
+    return sum(max(count, 0) for count in counters.values())
@@ -0,0 +1,135 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.contrib.sessions.models import Session
+from django.core.signals import request_finished
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sage_session.backends.session import SessionBackend
+from sage_session.cache import invalidate_session_list, warm_session_caches
+from sage_session.local_cache import local_caches
+from sage_session.models import SessionRollup, UserSession
+from sage_session.routers import get_session_shards, shard_for_user
+from sage_session.utils.engines import uses_session_model
+
+logger = logging.getLogger(__name__)
+
+
+def signals_mode_enabled():
+    """Whether the session lifecycle is driven by signals only."""
+    return getattr(settings, "SESSION_TRACKING_MODE", "middleware") == "signals"
+
+
+@receiver(user_logged_in, dispatch_uid="sage_session_start_session")
+def start_session_on_login(sender, request, user, **kwargs):
+    """Starts tracking the session as part of the login request.
+
+    `login()` has already rotated the session key and stored it, so the
+    tracking marker is written together with the authentication data and
+    the first authenticated request finds the session already tracked.
+    """
+    if request is None or not hasattr(request, "session"):
+        return
+    if not hasattr(request, "user"):
+        # `login()` only updates `request.user` when the attribute exists.
+        request.user = user
+    SessionBackend.start_session(request)
+
+
+@receiver(user_logged_in, dispatch_uid="sage_session_warm_caches")
+def warm_caches_on_login(sender, request, user, **kwargs):
+    """Warms the caches of the user's next requests when `SESSION_LOGIN_WARMUP` is on.
+
+    Connected after `start_session_on_login` and run once the login is
+    committed, so the freshly tracked session is part of the cached list.
+    """
+    if not getattr(settings, "SESSION_LOGIN_WARMUP", False):
+        return
+    using = shard_for_user(user) or router.db_for_write(UserSession)
+    transaction.on_commit(lambda: warm_session_caches(user), using=using)
+
+
+@receiver(user_logged_out, dispatch_uid="sage_session_end_session")
+def end_session_on_logout(sender, request, user, **kwargs):
+    """Removes the tracked session of a user who logs out.
+
+    Runs in signals mode and for session engines without `Session` rows,
+    where no foreign key cascade removes the row.
+    """
+    if request is None or (uses_session_model() and not signals_mode_enabled()):
+        return
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if not session_key:
+        return
+    if user is not None:
+        UserSession.objects.for_user(user).filter(session_id=session_key).delete()
+    else:
+        for sessions in UserSession.objects.on_each_shard():
+            sessions.filter(session_id=session_key).delete()
+
+
+@receiver(post_delete, sender=Session, dispatch_uid="sage_session_session_deleted")
+def end_session_on_delete(sender, instance, **kwargs):
+    """Removes the tracked session when its Django session is deleted.
+
+    Sharded rows live outside the sessions database and are not reached by
+    the foreign key cascade, so they are always cleaned up here.
+    """
+    if not signals_mode_enabled() and not get_session_shards():
+        return
+    for sessions in UserSession.objects.on_each_shard():
+        sessions.filter(session_id=instance.session_key).delete()
+
+
+@receiver(post_save, sender=UserSession, dispatch_uid="sage_session_list_saved")
+def invalidate_session_list_on_save(sender, instance, update_fields=None, **kwargs):
+    """Drops the cached session list of the owner of a saved session."""
+    activity_only = bool(update_fields) and set(update_fields) <= {
+        "last_activity",
+        "modified_at",
+    }
+    invalidate_session_list(
+        instance.user_id, activity_only=activity_only, using=instance._state.db
+    )
+
+
+@receiver(post_delete, sender=UserSession, dispatch_uid="sage_session_list_deleted")
+def invalidate_session_list_on_delete(sender, instance, **kwargs):
+    """Drops the cached session list of the owner of a deleted session."""
+    invalidate_session_list(instance.user_id, using=instance._state.db)
+
+
+@receiver(post_delete, sender=UserSession, dispatch_uid="sage_session_rollup_ended")
+def record_session_end(sender, instance, **kwargs):
+    """Counts a deleted session as ended in the analytics rollups.
+
+    Sessions removed after they expired, e.g. by the archive command, are
+    counted in the hour they expired in.
+    """
+    if SessionRollup.objects.is_incremental():
+        SessionRollup.objects.record_ended([instance])
+
+
+@receiver(post_delete, sender=Session, dispatch_uid="sage_session_list_session_deleted")
+def invalidate_session_list_on_session_delete(sender, instance, **kwargs):
+    """Drops the cached session list of the user a deleted session belonged to.
+
+    Covers session engines and shards where no `UserSession` row is deleted
+    along with the `Session`; the owner is read from the session data itself.
+    """
+    user_id = instance.get_decoded().get(SESSION_KEY)
+    invalidate_session_list(user_id, using=instance._state.db)
+
+
+@receiver(request_finished, dispatch_uid="sage_session_sync_local_caches")
+def sync_local_caches(sender, **kwargs):
+    """Synchronizes the in-process caches once the response has been sent.
+
+    Runs outside of any request transaction, and at most once per
+    `SESSION_LOCAL_CACHE_SYNC_INTERVAL`.
+    """
+    local_caches.maybe_sync()
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_COUNTER_KEY = "sage_session:revoked"
+REVOCATION_ENTRY_KEY = "sage_session:revoked:{index}"
+
+# Upper bound on the entries a node reads when it first loads the list.
+MAX_BACKFILL = 10000
+
+
+class RevocationList:
+    """Shared list of revoked session keys with a per-process copy.
+
+    Revocations are appended to a log kept in the `SESSION_REVOCATION_CACHE`
+    cache: an atomically incremented counter plus one entry per revocation,
+    each expiring after `SESSION_REVOCATION_TTL` seconds (the session cookie
+    age by default), by which time the session is invalid anyway.
+
+    Every process keeps the unexpired keys in a local dictionary and pulls
+    the entries appended since its last read at most once every
+    `SESSION_REVOCATION_REFRESH_INTERVAL` seconds, so `is_revoked` is an
+    in-memory lookup on almost every request. A revocation made by another
+    node is honoured after at most one refresh interval.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._last_index = 0
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "SESSION_REVOCATION_CACHE", "default")]
+
+    @property
+    def ttl(self):
+        return getattr(settings, "SESSION_REVOCATION_TTL", settings.SESSION_COOKIE_AGE)
+
+    def revoke(self, session_keys):
+        """Publishes `session_keys` as revoked to every node."""
+        session_keys = [key for key in session_keys if key]
+        if not session_keys:
+            return
+        expires = time.time() + self.ttl
+        for session_key in session_keys:
+            self._revoked[session_key] = expires
+
+        cache = self.cache
+        cache.add(REVOCATION_COUNTER_KEY, 0, None)
+        try:
+            last = cache.incr(REVOCATION_COUNTER_KEY, len(session_keys))
+        except ValueError:
+            # The counter was evicted between `add` and `incr`.
+            cache.set(REVOCATION_COUNTER_KEY, len(session_keys), None)
+            last = len(session_keys)
+        first = last - len(session_keys) + 1
+        cache.set_many(
+            {
+                REVOCATION_ENTRY_KEY.format(index=index): (session_key, expires)
+                for index, session_key in enumerate(session_keys, start=first)
+            },
+            self.ttl,
+        )
+
+    def is_revoked(self, session_key):
+        if not session_key:
+            return False
+        interval = getattr(settings, "SESSION_REVOCATION_REFRESH_INTERVAL", 5)
+        if self._refreshed_at is None or (
+            time.monotonic() - self._refreshed_at >= interval
+        ):
+            self.refresh()
+        expires = self._revoked.get(session_key)
+        return expires is not None and expires > time.time()
+
+    def refresh(self):
+        """Pulls the revocations appended since the previous refresh."""
+        if not self._lock.acquire(blocking=False):
+            # Another thread is refreshing; answer from the current copy.
+            return
+        try:
+            cache = self.cache
+            current = cache.get(REVOCATION_COUNTER_KEY, 0)
+            if current < self._last_index:
+                # The counter was evicted and restarted.
+                self._last_index = 0
+            start = max(self._last_index, current - MAX_BACKFILL) + 1
+            entries = cache.get_many(
+                [
+                    REVOCATION_ENTRY_KEY.format(index=index)
+                    for index in range(start, current + 1)
+                ]
+            )
+
+            now = time.time()
+            revoked = {
+                key: expires for key, expires in self._revoked.items() if expires > now
+            }
+            for session_key, expires in entries.values():
+                if expires > now:
+                    revoked[session_key] = expires
+            self._revoked = revoked
+            self._last_index = current
+        except Exception:
+            logger.exception("Could not refresh the session revocation list.")
+        finally:
+            self._refreshed_at = time.monotonic()
+            self._lock.release()
+
+    def clear(self):
+        """Forgets the local copy; the next lookup reloads the shared list."""
+        with self._lock:
+            self._revoked = {}
+            self._last_index = 0
+            self._refreshed_at = None
+
+
+revocations = RevocationList()
@@ -0,0 +1,158 @@
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from django.conf import settings
+
+_pinned_to_primary: ContextVar[bool] = ContextVar(
+    "sage_session_pinned_to_primary", default=False
+)
+
+
+def get_read_database() -> Optional[str]:
+    """Returns the database alias sage_session reads are routed to, if any."""
+    return getattr(settings, "SESSION_READ_DATABASE", None)
+
+
+def get_session_shards() -> list[str]:
+    """Returns the database aliases `UserSession` rows are sharded over."""
+    return list(getattr(settings, "SESSION_SHARDS", None) or [])
+
+
+def shard_for_user(user: Any) -> Optional[str]:
+    """Returns the database alias holding the sessions of `user`.
+
+    Users are assigned to `SESSION_SHARDS` by a stable CRC32 hash of their
+    primary key, so every process agrees on the placement without a lookup.
+    Returns `None` when sharding is disabled.
+    """
+    shards = get_session_shards()
+    if not shards:
+        return None
+    user_id = getattr(user, "pk", user)
+    return shards[zlib.crc32(str(user_id).encode()) % len(shards)]
+
+
+@contextmanager
+def use_primary():
+    """Routes sage_session reads inside the block to the primary database.
+
+    Used by code paths that read what they are about to write (e.g. session
+    limit enforcement under a row lock) and for read-your-writes lookups.
+    """
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class SessionReadRouter:
+    """Database router sending read-only sage_session traffic to a replica.
+
+    Listing views, the admin and reporting queries read `sage_session`
+    models from `SESSION_READ_DATABASE`, while every write (and every read
+    inside `use_primary()`) stays on the primary database. Django's own
+    `Session` model and the `SessionRecord` table of
+    `sage_session.backends.store` are left alone because a session store
+    needs to read what it has just written.
+
+    Enable it in the settings:
+
+        DATABASE_ROUTERS = ["sage_session.routers.SessionReadRouter"]
+        SESSION_READ_DATABASE = "replica"
+
+    """
+
+    app_label = "sage_session"
+    primary_only = ("sage_session.sessionrecord",)
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or _pinned_to_primary.get():
+            return None
+        if model._meta.label_lower in self.primary_only:
+            return None
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if self.app_label not in (obj1._meta.app_label, obj2._meta.app_label):
+            return None
+        replica = get_read_database()
+        databases = {obj1._state.db, obj2._state.db}
+        # The replica mirrors the primary, so objects may point across them.
+        if replica in databases and len(databases) == 2:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.app_label and db == get_read_database():
+            return False
+        return None
+
+
+class SessionShardRouter:
+    """Database router placing `UserSession` rows on the owner's shard.
+
+    Saves and instance-bound lookups (e.g. the admin change form) are sent
+    to `shard_for_user(instance.user_id)`. Queries without an instance must
+    go through `UserSession.objects.for_user()`, which pins the shard.
+
+        DATABASE_ROUTERS = ["sage_session.routers.SessionShardRouter"]
+        SESSION_SHARDS = ["sessions_0", "sessions_1", "sessions_2"]
+
+    """
+
+    model_name = "usersession"
+
+    def _shard_for_instance(self, model, hints):
+        if model._meta.label_lower != f"sage_session.{self.model_name}":
+            return None
+        instance = hints.get("instance")
+        user_id = getattr(instance, "user_id", None)
+        return shard_for_user(user_id) if user_id is not None else None
+
+    def db_for_read(self, model, **hints):
+        return self._shard_for_instance(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard_for_instance(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        labels = {obj1._meta.label_lower, obj2._meta.label_lower}
+        if f"sage_session.{self.model_name}" in labels and get_session_shards():
+            # Users and Django sessions are shared by every shard.
+            return True
+        return None
+
+
+def stick_to_primary(user_sessions, user, session_key):
+    """Replaces the current session's row by its copy from the primary.
+
+    Rows read from a lagging replica may miss the activity the current
+    request has just written, which makes the listing flap between requests.
+    Only the current session's row is re-read, the rest keep coming from the
+    replica.
+    """
+    if not get_read_database() or not session_key:
+        return user_sessions
+
+    from sage_session.models import UserSession
+
+    with use_primary():
+        current = (
+            UserSession.objects.for_user(user).filter(session_id=session_key).first()
+        )
+
+    rows = [row for row in user_sessions if row.session_id != session_key]
+    if current is not None:
+        positions = [
+            index
+            for index, row in enumerate(user_sessions)
+            if row.session_id == session_key
+        ]
+        rows.insert(positions[0] if positions else len(rows), current)
+    return rows
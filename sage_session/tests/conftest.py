@@ -0,0 +1,25 @@
+import pytest
+from django.core.cache import cache
+from sage_session.geo import get_geo_provider
+from sage_session.local_cache import local_caches
+from sage_session.models import Browser
+from sage_session.revocation import revocations
+from sage_session.utils.ip import get_client_ip_resolver
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Per-process caches filled by one test must not leak into the next."""
+    local_caches.clear()
+    Browser.objects.clear_cache()
+    get_geo_provider.cache_clear()
+    get_client_ip_resolver.cache_clear()
+    revocations.clear()
+    cache.clear()
+    yield
+    local_caches.clear()
+    Browser.objects.clear_cache()
+    get_geo_provider.cache_clear()
+    get_client_ip_resolver.cache_clear()
+    revocations.clear()
+    cache.clear()
@@ -0,0 +1,128 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db.models.signals import post_delete
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from sage_session.admin.user_session import SessionAdmin, UserSessionAdmin
+from sage_session.cache import get_session_list
+from sage_session.models import SessionRollup, UserSession
+from sage_session.revocation import revocations
+from sage_session.utils.engines import _can_raw_delete, delete_sessions_in_batches
+
+
+@pytest.mark.django_db
+class TestBulkSessionActions:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture
+    def request_(self):
+        request = RequestFactory().post("/admin/")
+        request.user = User.objects.create_superuser(username="admin", password="pass")
+        return request
+
+    def create_user_session(self, user, expires_in=60):
+        session = Session.objects.create(
+            session_key=get_random_string(32),
+            expire_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        return UserSession.objects.create(
+            user=user,
+            session=session,
+            ip_address="192.168.1.1",
+            country={"country_code": "DE"},
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timezone.timedelta(minutes=expires_in),
+        )
+
+    def test_revoke_action_deletes_in_batches(self, settings, user, request_):
+        settings.SESSION_ADMIN_BATCH_SIZE = 2
+        keys = [self.create_user_session(user).session_id for _ in range(5)]
+        model_admin = UserSessionAdmin(UserSession, AdminSite())
+
+        with patch.object(model_admin, "message_user") as message_user:
+            model_admin.revoke_sessions(request_, UserSession.objects.all())
+
+        assert not UserSession.objects.exists()
+        assert not Session.objects.exists()
+        assert all(revocations.is_revoked(key) for key in keys)
+        assert "Revoked 5 sessions in 3 batch(es)" in message_user.call_args[0][1]
+
+    def test_purge_action_only_removes_expired(self, user, request_):
+        live = self.create_user_session(user)
+        expired = self.create_user_session(user, expires_in=-5)
+        model_admin = UserSessionAdmin(UserSession, AdminSite())
+
+        with patch.object(model_admin, "message_user"):
+            model_admin.purge_expired_sessions(request_, UserSession.objects.all())
+
+        assert list(UserSession.objects.all()) == [live]
+        assert not Session.objects.filter(session_key=expired.session_id).exists()
+        assert not revocations.is_revoked(expired.session_id)
+
+    def test_session_admin_revokes_untracked_sessions(self, user, request_):
+        tracked = self.create_user_session(user)
+        untracked = Session.objects.create(
+            session_key=get_random_string(32),
+            expire_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        model_admin = SessionAdmin(Session, AdminSite())
+
+        with patch.object(model_admin, "message_user"):
+            model_admin.revoke_sessions(request_, Session.objects.all())
+
+        assert not Session.objects.exists()
+        assert not UserSession.objects.exists()
+        assert revocations.is_revoked(tracked.session_id)
+        assert revocations.is_revoked(untracked.session_key)
+
+    def test_skips_per_row_signals(self, user):
+        for _ in range(3):
+            self.create_user_session(user)
+
+        with patch("sage_session.receivers.invalidate_session_list") as invalidate:
+            delete_sessions_in_batches(UserSession.objects.all())
+
+        invalidate.assert_not_called()
+        assert not UserSession.objects.exists()
+
+    def test_foreign_receivers_see_every_row(self, user):
+        for _ in range(3):
+            self.create_user_session(user)
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance)
+
+        post_delete.connect(receiver, sender=UserSession)
+        try:
+            assert not _can_raw_delete(UserSession)
+            delete_sessions_in_batches(UserSession.objects.all())
+        finally:
+            post_delete.disconnect(receiver, sender=UserSession)
+
+        assert len(deleted) == 3
+        assert _can_raw_delete(UserSession)
+        assert not UserSession.objects.exists()
+
+    def test_replaces_receivers_once_per_batch(self, settings, user):
+        settings.SESSION_ROLLUP_MODE = "signals"
+        for _ in range(3):
+            self.create_user_session(user)
+        get_session_list(user)
+        progress = []
+
+        delete_sessions_in_batches(UserSession.objects.all(), progress=progress.append)
+
+        assert get_session_list(user) == []
+        assert progress == [3]
+        bucket = SessionRollup.objects.get(dimension="country", value="DE")
+        assert bucket.ended == 3
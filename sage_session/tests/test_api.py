@@ -0,0 +1,189 @@
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from sage_session.models import UserSession
+from sage_session.views.api import (
+    SessionBulkRevokeAPIView,
+    SessionListAPIView,
+    SessionRevokeAPIView,
+)
+
+
+@pytest.mark.django_db
+class TestSessionAPI:
+
+    @pytest.fixture
+    def factory(self):
+        return RequestFactory()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def create_user_session(self, user, key, **kwargs):
+        return UserSession.objects.create(
+            user=user,
+            session=Session.objects.create(
+                session_key=key,
+                expire_date=timezone.now() + timezone.timedelta(minutes=5),
+            ),
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=kwargs.pop("last_activity", timezone.now()),
+            expires_at=timezone.now() + timezone.timedelta(minutes=5),
+            **kwargs,
+        )
+
+    def build_request(self, factory, user, method="get", path="/", **kwargs):
+        request = getattr(factory, method)(path, **kwargs)
+        request.user = user
+        SessionMiddleware(lambda req: None).process_request(request)
+        return request
+
+    def get_json(self, factory, user, **params):
+        request = self.build_request(factory, user, data=params)
+        response = SessionListAPIView.as_view()(request)
+        return response, json.loads(b"".join(response.streaming_content))
+
+    def test_anonymous_is_forbidden(self):
+        response = Client().get(reverse("session_api_list"))
+
+        assert response.status_code == 403
+
+    def test_lists_own_active_sessions(self, factory, user):
+        other = User.objects.create_user(username="other", password="testpass")
+        self.create_user_session(user, "key-1")
+        self.create_user_session(other, "key-2")
+
+        response, body = self.get_json(factory, user)
+
+        assert response["Content-Type"] == "application/json"
+        assert [row["session_id"] for row in body["results"]] == ["key-1"]
+        assert body["results"][0]["browser_info"] == "Chrome 120.0"
+        assert body["next"] is None
+
+    def test_field_projection(self, factory, user):
+        self.create_user_session(user, "key-1")
+
+        _, body = self.get_json(factory, user, fields="session_id,ip_address")
+
+        assert body["results"] == [{"session_id": "key-1", "ip_address": "192.168.1.1"}]
+
+    def test_unknown_field(self, factory, user):
+        request = self.build_request(factory, user, data={"fields": "password"})
+
+        response = SessionListAPIView.as_view()(request)
+
+        assert response.status_code == 400
+
+    def test_cursor_pagination(self, factory, user):
+        for index in range(5):
+            self.create_user_session(user, f"key-{index}")
+
+        _, first = self.get_json(factory, user, limit=2, fields="session_id")
+        _, second = self.get_json(
+            factory, user, limit=2, fields="session_id", cursor=first["next"]
+        )
+        _, last = self.get_json(
+            factory, user, limit=2, fields="session_id", cursor=second["next"]
+        )
+
+        pages = [first, second, last]
+        assert [[row["session_id"] for row in page["results"]] for page in pages] == [
+            ["key-4", "key-3"],
+            ["key-2", "key-1"],
+            ["key-0"],
+        ]
+        assert last["next"] is None
+
+    def test_not_modified(self, factory, user):
+        user_session = self.create_user_session(user, "key-1")
+        response, _ = self.get_json(factory, user)
+        etag = response["ETag"]
+
+        request = self.build_request(factory, user, HTTP_IF_NONE_MATCH=etag)
+        response = SessionListAPIView.as_view()(request)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        user_session.last_activity = timezone.now() + timezone.timedelta(seconds=1)
+        user_session.save()
+        response = SessionListAPIView.as_view()(request)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_revoke(self, factory, user):
+        self.create_user_session(user, "key-1")
+        request = self.build_request(factory, user, method="delete")
+
+        response = SessionRevokeAPIView.as_view()(request, session_id="key-1")
+
+        assert response.status_code == 204
+        assert not Session.objects.filter(session_key="key-1").exists()
+        assert not UserSession.objects.filter(session_id="key-1").exists()
+
+    def test_revoke_other_users_session(self, factory, user):
+        other = User.objects.create_user(username="other", password="testpass")
+        self.create_user_session(other, "key-1")
+        request = self.build_request(factory, user, method="delete")
+
+        response = SessionRevokeAPIView.as_view()(request, session_id="key-1")
+
+        assert response.status_code == 404
+        assert Session.objects.filter(session_key="key-1").exists()
+
+    def test_bulk_revoke(self, factory, user):
+        for index in range(3):
+            self.create_user_session(user, f"key-{index}")
+        request = self.build_request(
+            factory,
+            user,
+            method="post",
+            data={"session_ids": ["key-0", "key-1", "missing"]},
+            content_type="application/json",
+        )
+
+        response = SessionBulkRevokeAPIView.as_view()(request)
+
+        assert sorted(json.loads(response.content)["revoked"]) == ["key-0", "key-1"]
+        assert list(Session.objects.values_list("session_key", flat=True)) == ["key-2"]
+
+    def test_bulk_revoke_all_keeps_current(self, factory, user):
+        for index in range(3):
+            self.create_user_session(user, f"session-key-{index}")
+        request = self.build_request(
+            factory,
+            user,
+            method="post",
+            data={"all": True},
+            content_type="application/json",
+        )
+        request.session = request.session.__class__(session_key="session-key-2")
+
+        response = SessionBulkRevokeAPIView.as_view()(request)
+
+        assert sorted(json.loads(response.content)["revoked"]) == [
+            "session-key-0",
+            "session-key-1",
+        ]
+        assert UserSession.objects.get().session_id == "session-key-2"
+
+    def test_bulk_revoke_invalid_body(self, factory, user):
+        request = self.build_request(
+            factory,
+            user,
+            method="post",
+            data="not json",
+            content_type="application/json",
+        )
+
+        response = SessionBulkRevokeAPIView.as_view()(request)
+
+        assert response.status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+from io import StringIO
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from sage_session.models import UserSession, UserSessionArchive
+
+
+@pytest.mark.django_db
+class TestUserSessionArchive:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def create_user_session(self, user, expires_in):
+        """Helper function to create a session expiring in `expires_in` minutes."""
+        session = Session.objects.create(
+            session_key=get_random_string(32),
+            expire_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        return UserSession.objects.create(
+            user=user,
+            session=session,
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timezone.timedelta(minutes=expires_in),
+        )
+
+    def test_active_and_expired(self, user):
+        live = self.create_user_session(user, 5)
+        expired = self.create_user_session(user, -5)
+
+        assert list(UserSession.objects.active()) == [live]
+        assert list(UserSession.objects.expired()) == [expired]
+
+    def test_archive_expired_moves_rows(self, user):
+        live = self.create_user_session(user, 5)
+        expired = [self.create_user_session(user, -5) for _ in range(5)]
+
+        archived = UserSessionArchive.objects.archive_expired(batch_size=2)
+
+        assert archived == 5
+        assert list(UserSession.objects.all()) == [live]
+        history = UserSessionArchive.objects.for_user(user)
+        assert history.count() == 5
+        assert {row.session_key for row in history} == {
+            row.session_id for row in expired
+        }
+        first = history.get(session_key=expired[0].session_id)
+        assert first.session_created_at == expired[0].created_at
+        assert first.browser_info == "Chrome 120.0"
+
+    def test_export(self, user):
+        self.create_user_session(user, -5)
+        UserSessionArchive.objects.archive_expired()
+
+        rows = list(UserSessionArchive.objects.export())
+
+        assert len(rows) == 1
+        assert rows[0]["user_id"] == user.pk
+        assert rows[0]["ip_address"] == "192.168.1.1"
+
+    def test_command(self, user):
+        self.create_user_session(user, -5)
+        self.create_user_session(user, -120)
+        out = StringIO()
+
+        call_command("archive_user_sessions", "--older-than=60", stdout=out)
+
+        assert "Archived 1 session(s)." in out.getvalue()
+        assert UserSession.objects.count() == 1
@@ -1,8 +1,10 @@
 import pytest
 from django.contrib.auth.models import User
 from django.contrib.sessions.models import Session
+from django.db import connection
 from sage_session.backends.session import SessionBackend
 from sage_session.models import UserSession
+from sage_session.utils.queries import assert_max_queries
 from unittest.mock import patch
 from django.utils import timezone
 from django.utils.crypto import get_random_string
@@ -38,7 +40,7 @@ class TestSessionBackend:
         }
 
         # Patch GeoIP2 and other static methods
-        with patch("sage_session.backends.session.GeoIP2") as mock_geoip2, patch(
+        with patch("sage_session.geo.gis.GeoIP2") as mock_geoip2, patch(
             "sage_session.backends.session.SessionBackend.get_browser_info"
         ) as mock_browser_info, patch(
             "sage_session.backends.session.SessionBackend.get_device_info"
@@ -72,3 +74,50 @@ class TestSessionBackend:
             assert session_manager.expires_at <= (
                 timezone.now() + timezone.timedelta(minutes=5)
             )
+
+    def build_request(self, session, user, remote_addr):
+        request = type("Request", (), {})()
+        request.user = user
+        request.session = session
+        request.META = {
+            "HTTP_USER_AGENT": "FakeUserAgent/1.0",
+            "REMOTE_ADDR": remote_addr,
+        }
+        return request
+
+    def test_create_or_update_session_is_idempotent(self, user):
+        session = self.create_django_session(user)
+
+        with patch("sage_session.geo.gis.GeoIP2"):
+            SessionBackend.create_or_update_session(
+                self.build_request(session, user, "10.0.0.1"), expiry_time=5
+            )
+            SessionBackend.create_or_update_session(
+                self.build_request(session, user, "10.0.0.2"), expiry_time=5
+            )
+
+        user_session = UserSession.objects.get(session=session)
+        assert user_session.ip_address == "10.0.0.2"
+
+    def test_upsert_is_a_single_statement(self, user):
+        session = self.create_django_session(user)
+        UserSession.objects.create(user=user, session=session, ip_address="10.0.0.1")
+        user_session = UserSession(user=user, session=session, ip_address="10.0.0.2")
+
+        with assert_max_queries(1):
+            SessionBackend.upsert_session(user_session)
+
+        assert UserSession.objects.get(session=session).ip_address == "10.0.0.2"
+
+    def test_upsert_without_on_conflict_support(self, user, monkeypatch):
+        session = self.create_django_session(user)
+        UserSession.objects.create(user=user, session=session, ip_address="10.0.0.1")
+        monkeypatch.setattr(
+            connection.features, "supports_update_conflicts_with_target", False
+        )
+
+        SessionBackend.upsert_session(
+            UserSession(user=user, session=session, ip_address="10.0.0.2")
+        )
+
+        assert UserSession.objects.get(session=session).ip_address == "10.0.0.2"
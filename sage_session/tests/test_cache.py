@@ -0,0 +1,116 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.test import RequestFactory
+from django.utils import timezone
+from sage_session.cache import (
+    get_list_timeout,
+    get_session_list,
+    invalidate_session_list,
+)
+from sage_session.middleware import TrackUserActivityMiddleware
+from sage_session.models import UserSession
+from sage_session.utils.queries import assert_max_queries
+
+
+@pytest.mark.django_db
+class TestSessionListCache:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def create_user_session(self, user, key="key-1", browser_info="Chrome 120.0"):
+        return UserSession.objects.create(
+            user=user,
+            session=Session.objects.create(
+                session_key=key,
+                expire_date=timezone.now() + timezone.timedelta(minutes=5),
+            ),
+            ip_address="192.168.1.1",
+            browser_info=browser_info,
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timezone.timedelta(minutes=5),
+        )
+
+    def test_list_is_served_from_cache(self, user):
+        self.create_user_session(user)
+        first = get_session_list(user)
+
+        with assert_max_queries(0):
+            second = get_session_list(user)
+
+        assert first == second
+        assert second[0]["browser_icon"] == "fa-chrome"
+        assert second[0]["session_id"] == "key-1"
+
+    def test_list_expires_with_first_session(self):
+        soon = UserSession(expires_at=timezone.now() + timezone.timedelta(seconds=30))
+        later = UserSession(expires_at=timezone.now() + timezone.timedelta(hours=1))
+
+        assert 1 <= get_list_timeout([later, soon]) <= 30
+        assert get_list_timeout([later]) == 300
+        assert get_list_timeout([]) == 300
+
+    def test_new_session_invalidates(self, user):
+        self.create_user_session(user)
+        get_session_list(user)
+
+        self.create_user_session(user, key="key-2")
+
+        assert len(get_session_list(user)) == 2
+
+    def test_deleted_session_invalidates(self, user):
+        self.create_user_session(user)
+        self.create_user_session(user, key="key-2")
+        get_session_list(user)
+
+        Session.objects.filter(pk="key-2").delete()
+
+        assert [row["session_id"] for row in get_session_list(user)] == ["key-1"]
+
+    def test_session_delete_invalidates_owner(self, user):
+        store = SessionStore()
+        store["_auth_user_id"] = str(user.pk)
+        store.create()
+        UserSession.objects.create(
+            user=user,
+            session_id=store.session_key,
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+        )
+        get_session_list(user)
+        UserSession.objects.filter(session_id=store.session_key)._raw_delete("default")
+
+        Session.objects.get(pk=store.session_key).delete()
+
+        assert get_session_list(user) == []
+
+    def test_activity_updates_are_throttled(self, user, settings):
+        settings.SESSION_LIST_ACTIVITY_THROTTLE = 60
+        self.create_user_session(user)
+        get_session_list(user)
+
+        invalidate_session_list(user.pk, activity_only=True)
+        refreshed = get_session_list(user)
+        invalidate_session_list(user.pk, activity_only=True)
+
+        with assert_max_queries(0):
+            assert get_session_list(user) == refreshed
+
+    def test_track_middleware_invalidates_throttled(self, user):
+        user_session = self.create_user_session(user)
+        get_session_list(user)
+        request = RequestFactory().get("/")
+        request.user = user
+        SessionMiddleware(lambda req: None).process_request(request)
+        request.session = SessionStore(session_key=user_session.session_id)
+
+        TrackUserActivityMiddleware(lambda req: None)(request)
+
+        user_session.refresh_from_db()
+        assert get_session_list(user)[0]["last_activity"] == user_session.last_activity
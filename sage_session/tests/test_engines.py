@@ -0,0 +1,152 @@
+import pytest
+from io import StringIO
+from django.contrib.auth import logout
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+from sage_session.models import UserSession
+from sage_session.revocation import revocations
+from sage_session.utils.engines import (
+    delete_sessions,
+    has_server_side_state,
+    purge_orphaned_sessions,
+    session_exists,
+    uses_session_model,
+)
+
+CACHE_ENGINE = "django.contrib.sessions.backends.cache"
+SIGNED_COOKIES_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+
+@pytest.mark.parametrize(
+    "engine, model_backed, server_side",
+    [
+        ("django.contrib.sessions.backends.db", True, True),
+        ("django.contrib.sessions.backends.cached_db", True, True),
+        (CACHE_ENGINE, False, True),
+        (SIGNED_COOKIES_ENGINE, False, False),
+    ],
+)
+def test_engine_detection(settings, engine, model_backed, server_side):
+    settings.SESSION_ENGINE = engine
+
+    assert uses_session_model() is model_backed
+    assert has_server_side_state() is server_side
+
+
+@pytest.mark.django_db
+class TestEngineAgnosticSessions:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture(autouse=True)
+    def drop_tracked_sessions(self):
+        yield
+        # The test database still enforces the `Session` foreign key.
+        UserSession.objects.all().delete()
+
+    def track(self, user, session_key):
+        return UserSession.objects.create(
+            user=user,
+            session_id=session_key,
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timezone.timedelta(minutes=5),
+        )
+
+    def create_cache_session(self):
+        store = CacheSessionStore()
+        store.create()
+        return store.session_key
+
+    def test_delete_from_cache_engine(self, user, settings):
+        settings.SESSION_ENGINE = CACHE_ENGINE
+        session_key = self.create_cache_session()
+        self.track(user, session_key)
+        assert session_exists(session_key)
+
+        delete_sessions([session_key], user=user)
+
+        assert not session_exists(session_key)
+        assert not UserSession.objects.filter(session_id=session_key).exists()
+        assert revocations.is_revoked(session_key)
+
+    def test_delete_from_database_engine(self, user):
+        session = Session.objects.create(
+            session_key="session-key-1",
+            expire_date=timezone.now() + timezone.timedelta(minutes=5),
+        )
+        self.track(user, session.session_key)
+
+        delete_sessions([session.session_key])
+
+        assert not Session.objects.exists()
+        assert not UserSession.objects.exists()
+
+    def test_signed_cookie_sessions_exist_while_tracked(self, user, settings):
+        settings.SESSION_ENGINE = SIGNED_COOKIES_ENGINE
+        self.track(user, "session-key-1")
+
+        assert session_exists("session-key-1")
+        assert not session_exists("session-key-2")
+
+        delete_sessions(["session-key-1"])
+
+        assert not session_exists("session-key-1")
+        assert revocations.is_revoked("session-key-1")
+
+    def test_purge_orphans_from_cache_engine(self, user, settings):
+        settings.SESSION_ENGINE = CACHE_ENGINE
+        live_key = self.create_cache_session()
+        self.track(user, live_key)
+        self.track(user, "session-key-gone")
+
+        assert purge_orphaned_sessions(batch_size=1) == 1
+        assert list(UserSession.objects.values_list("session_id", flat=True)) == [
+            live_key
+        ]
+
+    def test_purge_orphans_from_database_engine(self, user):
+        Session.objects.create(
+            session_key="session-key-1",
+            expire_date=timezone.now() + timezone.timedelta(minutes=5),
+        )
+        self.track(user, "session-key-1")
+        self.track(user, "session-key-gone")
+
+        assert purge_orphaned_sessions() == 1
+        assert UserSession.objects.get().session_id == "session-key-1"
+
+    def test_signed_cookie_orphans_are_not_purged(self, user, settings):
+        settings.SESSION_ENGINE = SIGNED_COOKIES_ENGINE
+        self.track(user, "session-key-1")
+
+        assert purge_orphaned_sessions() == 0
+        assert UserSession.objects.exists()
+
+    def test_logout_removes_tracked_session(self, user, settings):
+        settings.SESSION_ENGINE = CACHE_ENGINE
+        session_key = self.create_cache_session()
+        self.track(user, session_key)
+        request = RequestFactory().get("/")
+        request.user = user
+        request.session = CacheSessionStore(session_key=session_key)
+
+        logout(request)
+
+        assert not UserSession.objects.exists()
+
+    def test_archive_command_purges_orphans(self, user):
+        self.track(user, "session-key-gone")
+        out = StringIO()
+
+        call_command("archive_user_sessions", "--purge-orphans", stdout=out)
+
+        assert "Purged 1 orphaned session(s)." in out.getvalue()
@@ -0,0 +1,145 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory
+from sage_session.backends.session import SessionBackend
+from sage_session.middleware import SessionManagementMiddleware
+from sage_session.models import UserSession
+from sage_session.utils.fingerprint import (
+    FINGERPRINT_SESSION_KEY,
+    compute_fingerprint,
+    get_request_fingerprint,
+)
+from sage_session.utils.queries import assert_max_queries
+
+CHROME_LINUX = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+CHROME_LINUX_UPDATED = CHROME_LINUX.replace("120.0.0.0", "121.0.0.0")
+FIREFOX_WINDOWS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0"
+)
+
+
+class TestComputeFingerprint:
+
+    def test_stable_across_versions_and_network(self):
+        fingerprint = compute_fingerprint(CHROME_LINUX, "81.2.69.10")
+
+        assert len(fingerprint) == 16
+        assert compute_fingerprint(CHROME_LINUX_UPDATED, "81.2.69.200") == fingerprint
+
+    def test_changes_with_client(self):
+        fingerprint = compute_fingerprint(CHROME_LINUX, "81.2.69.10")
+
+        assert compute_fingerprint(FIREFOX_WINDOWS, "81.2.69.10") != fingerprint
+        assert compute_fingerprint(CHROME_LINUX, "81.2.70.10") != fingerprint
+
+    def test_ipv6_prefix(self):
+        fingerprint = compute_fingerprint(CHROME_LINUX, "2001:db8:1::1")
+
+        assert compute_fingerprint(CHROME_LINUX, "2001:db8:1:ff::1") == fingerprint
+        assert compute_fingerprint(CHROME_LINUX, "2001:db8:2::1") != fingerprint
+
+
+@pytest.mark.django_db
+class TestFingerprintCheck:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def build_request(self, user, user_agent=CHROME_LINUX, remote_addr="192.168.1.10"):
+        request = RequestFactory().get(
+            "/", HTTP_USER_AGENT=user_agent, REMOTE_ADDR=remote_addr
+        )
+        request.user = user
+        SessionMiddleware(lambda req: None).process_request(request)
+        return request
+
+    def start_session(self, user):
+        request = self.build_request(user)
+        SessionBackend.start_session(request)
+        return request.session
+
+    def reuse(self, session, user, **kwargs):
+        request = self.build_request(user, **kwargs)
+        request.session = session
+        return request
+
+    def test_fingerprint_is_stored(self, user):
+        session = self.start_session(user)
+
+        user_session = UserSession.objects.get()
+        assert user_session.fingerprint == session[FINGERPRINT_SESSION_KEY]
+        assert user_session.fingerprint == get_request_fingerprint(
+            self.build_request(user)
+        )
+
+    def test_matching_client_is_query_free(self, user):
+        session = self.start_session(user)
+        request = self.reuse(session, user, user_agent=CHROME_LINUX_UPDATED)
+
+        with assert_max_queries(0):
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        assert request.user == user
+
+    def test_mismatch_is_logged(self, user, caplog):
+        session = self.start_session(user)
+        request = self.reuse(session, user, user_agent=FIREFOX_WINDOWS)
+
+        SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        assert request.user == user
+        assert not UserSession.objects.get().is_flagged
+        assert "not matching its fingerprint" in caplog.text
+
+    def test_mismatch_is_logged_once(self, user, caplog):
+        session = self.start_session(user)
+        middleware = SessionManagementMiddleware(lambda req: None)
+        middleware.process_request(
+            self.reuse(session, user, user_agent=FIREFOX_WINDOWS)
+        )
+        caplog.clear()
+
+        with assert_max_queries(0):
+            middleware.process_request(
+                self.reuse(session, user, user_agent=FIREFOX_WINDOWS)
+            )
+
+        assert "not matching its fingerprint" not in caplog.text
+
+    def test_mismatch_is_flagged(self, user, settings):
+        settings.SESSION_FINGERPRINT_ACTION = "flag"
+        session = self.start_session(user)
+        request = self.reuse(session, user, remote_addr="10.1.2.3")
+
+        SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        assert UserSession.objects.get().is_flagged
+
+    def test_mismatch_logs_out(self, user, settings):
+        settings.SESSION_FINGERPRINT_ACTION = "logout"
+        session = self.start_session(user)
+        request = self.reuse(session, user, user_agent=FIREFOX_WINDOWS)
+
+        SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        assert isinstance(request.user, AnonymousUser)
+
+    def test_check_disabled(self, user, settings):
+        settings.SESSION_FINGERPRINT_ACTION = None
+        session = self.start_session(user)
+        request = self.reuse(session, user, user_agent=FIREFOX_WINDOWS)
+
+        with assert_max_queries(0):
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+
+    def test_unknown_action(self, settings):
+        settings.SESSION_FINGERPRINT_ACTION = "block"
+
+        with pytest.raises(ImproperlyConfigured):
+            SessionManagementMiddleware(lambda req: None)
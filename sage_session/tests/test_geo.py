@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from sage_session.backends.session import SessionBackend
+from sage_session.geo import RangeIndex, RangeIndexProvider, get_geo_provider
+from sage_session.geo.range_index import mmdb_record
+from sage_session.models import UserSession
+
+CSV = """network,country_code,country_name,city,latitude,is_in_european_union
+81.2.69.0/24,GB,United Kingdom,London,51.5142,true
+2001:db8::/32,DE,Germany,Berlin,52.52,1
+"""
+
+RANGES_CSV = """start_ip,end_ip,country_code,country_name
+1.0.0.0,1.0.0.255,AU,Australia
+1.0.4.0,1.0.7.255,AU,Australia
+"""
+
+
+@pytest.fixture
+def geo_csv(tmp_path):
+    path = tmp_path / "ranges.csv"
+    path.write_text(CSV)
+    return path
+
+
+class TestRangeIndex:
+
+    def test_lookup_by_network(self, geo_csv):
+        index = RangeIndex.from_csv(geo_csv)
+
+        record = index.lookup("81.2.69.160")
+        assert record["city"] == "London"
+        assert record["latitude"] == 51.5142
+        assert record["is_in_european_union"] is True
+        assert record["postal_code"] is None
+        assert index.lookup("2001:db8::1")["country_code"] == "DE"
+
+    def test_misses(self, geo_csv):
+        index = RangeIndex.from_csv(geo_csv)
+
+        assert index.lookup("81.2.70.1") is None
+        assert index.lookup("1.1.1.1") is None
+        assert index.lookup("2001:db9::1") is None
+        assert index.lookup("not an ip") is None
+
+    def test_lookup_by_start_and_end(self, tmp_path):
+        path = tmp_path / "ranges.csv"
+        path.write_text(RANGES_CSV)
+        index = RangeIndex.from_csv(path)
+
+        assert index.lookup("1.0.5.9")["country_code"] == "AU"
+        assert index.lookup("1.0.2.1") is None
+        assert len(index) == 2
+        # Identical locations are stored once.
+        assert len(index.records) == 1
+        starts, ends, record_ids = index.tables[4]
+        assert starts.itemsize == ends.itemsize == record_ids.itemsize == 4
+        assert index.lookup("255.255.255.255") is None
+
+    def test_mmdb_record(self):
+        record = mmdb_record(
+            {
+                "city": {"names": {"en": "Boxford"}},
+                "country": {"iso_code": "GB", "names": {"en": "United Kingdom"}},
+                "location": {"latitude": 51.75, "time_zone": "Europe/London"},
+                "subdivisions": [
+                    {"iso_code": "WBK", "names": {"en": "West Berkshire"}}
+                ],
+            }
+        )
+
+        assert record["city"] == "Boxford"
+        assert record["country_code"] == "GB"
+        assert record["region_name"] == "West Berkshire"
+        assert record["continent_code"] is None
+
+
+class TestRangeIndexProvider:
+
+    def test_requires_database(self, settings):
+        settings.SESSION_GEO_DATABASE = None
+
+        with pytest.raises(ImproperlyConfigured):
+            RangeIndexProvider()
+
+    def test_configured_provider(self, settings, geo_csv):
+        settings.SESSION_GEO_PROVIDER = "sage_session.geo.RangeIndexProvider"
+        settings.SESSION_GEO_DATABASE = str(geo_csv)
+
+        provider = get_geo_provider()
+
+        assert isinstance(provider, RangeIndexProvider)
+        assert provider.city("81.2.69.1")["city"] == "London"
+        assert provider.country("81.2.69.1") == {
+            "continent_code": None,
+            "continent_name": None,
+            "country_code": "GB",
+            "country_name": "United Kingdom",
+            "is_in_european_union": True,
+        }
+        assert provider.country("8.8.8.8") is None
+
+    @pytest.mark.django_db
+    def test_backend_uses_provider(self, settings, geo_csv):
+        settings.SESSION_GEO_PROVIDER = "sage_session.geo.RangeIndexProvider"
+        settings.SESSION_GEO_DATABASE = str(geo_csv)
+        user = User.objects.create_user(username="testuser", password="testpass")
+        session = Session.objects.create(
+            session_key="session-key-1",
+            expire_date=timezone.now() + timezone.timedelta(minutes=5),
+        )
+        request = type("Request", (), {})()
+        request.user = user
+        request.session = session
+        request.META = {"HTTP_USER_AGENT": "", "REMOTE_ADDR": "81.2.69.160"}
+
+        SessionBackend.create_or_update_session(request, expiry_time=5)
+
+        user_session = UserSession.objects.get()
+        assert user_session.city["city"] == "London"
+        assert user_session.country["country_name"] == "United Kingdom"
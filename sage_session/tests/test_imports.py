@@ -0,0 +1,65 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Dependencies only needed once a session is created or a lookup is made.
+LAZY_MODULES = (
+    "user_agents",
+    "ua_parser",
+    "ipware",
+    "geoip2",
+    "maxminddb",
+    "django.contrib.gis",
+    "debug_toolbar",
+)
+
+IMPORT_SCRIPT = """
+import django
+django.setup()
+import sage_session.admin
+import sage_session.middleware
+import sage_session.urls
+"""
+
+
+@pytest.fixture(scope="module")
+def import_times():
+    """Imports sage_session in a fresh interpreter under `-X importtime`.
+
+    Returns the cumulative import time in microseconds of every module.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        env=env,
+        text=True,
+        check=True,
+    )
+    pattern = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$")
+    times = {}
+    for line in result.stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+class TestImportTime:
+
+    @pytest.mark.parametrize("module", LAZY_MODULES)
+    def test_heavy_dependencies_are_lazy(self, import_times, module):
+        loaded = [
+            name
+            for name in import_times
+            if name == module or name.startswith(f"{module}.")
+        ]
+
+        assert not loaded, f"Importing sage_session loaded {', '.join(loaded)}."
+
+    def test_sage_session_modules_are_imported(self, import_times):
+        assert "sage_session.middleware" in import_times
+        assert "sage_session.backends.session" in import_times
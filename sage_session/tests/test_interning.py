@@ -0,0 +1,94 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+from sage_session.models import Browser, Device, UserSession
+from sage_session.utils.queries import assert_max_queries
+
+
+@pytest.mark.django_db
+class TestInternedUserAgents:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def create_user_session(self, user, key, browser_info="Chrome 120.0"):
+        return UserSession.objects.create(
+            user=user,
+            session=Session.objects.create(
+                session_key=key,
+                expire_date=timezone.now() + timezone.timedelta(minutes=5),
+            ),
+            ip_address="192.168.1.1",
+            browser_info=browser_info,
+            device_info="Other Linux",
+        )
+
+    def test_intern_returns_same_row(self):
+        first = Browser.objects.intern("Chrome 120.0")
+        second = Browser.objects.intern("Chrome 120.0")
+
+        assert first == second
+        assert Browser.objects.count() == 1
+
+    def test_intern_cache_hit_is_query_free(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            Browser.objects.intern("Firefox 121.0")
+
+        with assert_max_queries(0):
+            Browser.objects.intern("Firefox 121.0")
+
+    def test_rolled_back_intern_is_not_cached(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    Browser.objects.intern("Edge 120.0")
+                    raise RuntimeError
+
+        assert callbacks == []
+        with assert_max_queries(3):
+            pk = Browser.objects.intern("Edge 120.0")
+        assert Browser.objects.filter(pk=pk).exists()
+
+    def test_intern_after_cache_reset(self):
+        pk = Device.objects.intern("iPhone iOS 17.2")
+        Device.objects.clear_cache()
+
+        assert Device.objects.intern("iPhone iOS 17.2") == pk
+        assert Device.objects.count() == 1
+
+    def test_browser_and_device_do_not_share_ids(self):
+        browser = Browser.objects.intern("Same")
+        device = Device.objects.intern("Same")
+
+        assert Browser.objects.label_for(browser) == "Same"
+        assert Device.objects.label_for(device) == "Same"
+
+    def test_sessions_share_interned_rows(self, user):
+        first = self.create_user_session(user, "key-1")
+        second = self.create_user_session(user, "key-2")
+
+        assert first.browser_id == second.browser_id
+        assert Browser.objects.count() == 1
+        assert Device.objects.count() == 1
+
+    def test_text_accessors(self, user):
+        self.create_user_session(user, "key-1")
+        Browser.objects.clear_cache()
+        user_session = UserSession.objects.select_related("browser").get()
+
+        with assert_max_queries(1):
+            assert user_session.browser_info == "Chrome 120.0"
+            assert user_session.device_info == "Other Linux"
+
+    def test_empty_values(self, user):
+        user_session = self.create_user_session(user, "key-1", browser_info="")
+
+        assert user_session.browser_id is None
+        assert user_session.browser_info == ""
+
+    def test_browser_family(self):
+        assert Browser(label="Mobile Safari 17.0").family == "Mobile Safari"
+        assert Browser(label="Other ").family == "Other"
@@ -0,0 +1,86 @@
+import pytest
+from ipaddress import ip_address
+from django.test import RequestFactory
+from sage_session.utils.ip import ClientIPResolver, NetworkTable, get_client_ip
+
+
+class TestNetworkTable:
+
+    def test_membership(self):
+        table = NetworkTable(["10.0.0.0/8", "192.168.1.7", "2001:db8::/32"])
+
+        assert ip_address("10.20.30.40") in table
+        assert ip_address("192.168.1.7") in table
+        assert ip_address("192.168.1.8") not in table
+        assert ip_address("11.0.0.1") not in table
+        assert ip_address("2001:db8::1") in table
+        assert ip_address("2001:db9::1") not in table
+
+    def test_empty(self):
+        assert not NetworkTable([])
+
+
+class TestClientIPResolver:
+
+    @pytest.fixture
+    def resolver(self):
+        return ClientIPResolver(
+            trusted_proxies=["10.0.0.0/8"],
+            headers=["HTTP_X_REAL_IP", "HTTP_X_FORWARDED_FOR"],
+        )
+
+    def build_request(self, remote_addr, **headers):
+        return RequestFactory().get("/", REMOTE_ADDR=remote_addr, **headers)
+
+    def test_direct_client(self, resolver):
+        request = self.build_request("81.2.69.160", HTTP_X_FORWARDED_FOR="1.2.3.4")
+
+        assert resolver.resolve(request) == ("81.2.69.160", True)
+
+    def test_behind_trusted_proxy(self, resolver):
+        request = self.build_request(
+            "10.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4, 81.2.69.160, 10.0.0.2"
+        )
+
+        assert resolver.resolve(request) == ("81.2.69.160", True)
+
+    def test_header_order(self, resolver):
+        request = self.build_request(
+            "10.0.0.1",
+            HTTP_X_REAL_IP="81.2.69.161",
+            HTTP_X_FORWARDED_FOR="81.2.69.160",
+        )
+
+        assert resolver.resolve(request) == ("81.2.69.161", True)
+
+    def test_private_client(self, resolver):
+        request = self.build_request("10.0.0.1", HTTP_X_FORWARDED_FOR="192.168.1.5")
+
+        assert resolver.resolve(request) == ("192.168.1.5", False)
+
+    def test_only_trusted_hops(self, resolver):
+        request = self.build_request("10.0.0.1", HTTP_X_FORWARDED_FOR="10.0.0.9")
+
+        assert resolver.resolve(request) == ("10.0.0.9", False)
+
+    def test_malformed_header(self, resolver):
+        request = self.build_request("10.0.0.1", HTTP_X_FORWARDED_FOR="unknown")
+
+        assert resolver.resolve(request) == ("10.0.0.1", False)
+
+    def test_missing_remote_addr(self, resolver):
+        request = self.build_request("")
+
+        assert resolver.resolve(request) == (None, False)
+
+    def test_falls_back_to_ipware(self):
+        request = self.build_request("81.2.69.160")
+
+        assert ClientIPResolver().resolve(request) == ("81.2.69.160", True)
+
+    def test_from_settings(self, settings):
+        settings.SESSION_TRUSTED_PROXIES = ["172.16.0.0/12"]
+        settings.SESSION_CLIENT_IP_HEADERS = ["HTTP_X_REAL_IP"]
+        request = self.build_request("172.16.0.1", HTTP_X_REAL_IP="81.2.69.160")
+
+        assert get_client_ip(request) == ("81.2.69.160", True)
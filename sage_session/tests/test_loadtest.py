@@ -0,0 +1,52 @@
+import pytest
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from sage_session.management.commands.loadtest_sessions import percentile
+
+
+@pytest.mark.django_db
+class TestLoadtestSessions:
+
+    def run(self, **options):
+        out = StringIO()
+        call_command("loadtest_sessions", concurrency=1, seed=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_reports_metrics(self):
+        output = self.run(users=3, sessions_per_user=2)
+
+        assert "Logins:          6 (0 failed)" in output
+        assert "Throughput:" in output
+        assert "p99" in output
+        assert "Lock waits:" in output
+        assert "Limit overshoot: 0 user(s)" in output
+
+    def test_cleans_up_users(self):
+        self.run(users=2, sessions_per_user=1)
+
+        assert not User.objects.filter(username__startswith="sage-loadtest-").exists()
+
+    def test_keep(self):
+        self.run(users=2, sessions_per_user=1, keep=True)
+
+        assert User.objects.filter(username__startswith="sage-loadtest-").count() == 2
+
+    def test_keeps_existing_users(self):
+        existing = User.objects.create_user(username="sage-loadtest-0")
+
+        self.run(users=2, sessions_per_user=1)
+
+        assert (
+            User.objects.filter(username__startswith="sage-loadtest-").get() == existing
+        )
+
+    def test_rejects_invalid_counts(self):
+        with pytest.raises(CommandError):
+            self.run(users=0)
+
+    def test_percentile(self):
+        assert percentile([], 0.5) == 0.0
+        assert percentile([3, 1, 2, 4], 0.5) == 3
+        assert percentile([1, 2, 3], 0.99) == 3
@@ -0,0 +1,225 @@
+import pytest
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory
+from sage_session.admin.user_session import UserSessionAdmin
+from sage_session.backends.session import parse_user_agent
+from sage_session.local_cache import (
+    STATS_KEY,
+    WORKERS_KEY,
+    CacheRegistry,
+    LRUCache,
+    local_caches,
+    lru_cached,
+)
+from sage_session.models import UserSession
+from sage_session.receivers import sync_local_caches
+
+
+class TestLRUCache:
+
+    @pytest.fixture
+    def registry(self):
+        return CacheRegistry()
+
+    def test_evicts_least_recently_used(self, registry):
+        cache = LRUCache("test", maxsize=2, registry=registry)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_counts_hits_and_misses(self, registry):
+        cache = LRUCache("test", registry=registry)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_expires_entries(self, registry):
+        cache = LRUCache("test", ttl=10, registry=registry)
+        with patch("sage_session.local_cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("sage_session.local_cache.time.monotonic", return_value=111):
+            assert cache.get("a") is None
+
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_size_setting_overrides_default(self, settings, registry):
+        settings.SESSION_LOCAL_CACHE_SIZES = {"test": 1}
+        cache = LRUCache("test", maxsize=100, registry=registry)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert len(cache) == 1
+
+    def test_memory_budget_evicts_from_largest_cache(self, settings, registry):
+        small = LRUCache("small", registry=registry)
+        large = LRUCache("large", registry=registry)
+        small.set("key", "x")
+        for index in range(10):
+            large.set(index, "x" * 1000)
+        settings.SESSION_LOCAL_CACHE_BUDGET = registry.nbytes - 1
+
+        large.set("last", "x")
+
+        assert registry.nbytes <= settings.SESSION_LOCAL_CACHE_BUDGET
+        assert "key" in small
+        assert large.stats()["evictions"] == 1
+
+    def test_lru_cached(self):
+        calls = []
+
+        @lru_cached("test_function")
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        assert double(2) == double(2) == 4
+        double.cache_clear()
+        assert double(value=2) == 4
+        assert calls == [2, 2]
+
+    def test_retrofitted_caches_are_registered(self):
+        parse_user_agent("Mozilla/5.0")
+
+        names = {stats["name"] for stats in local_caches.stats()}
+        assert {
+            "user_agents",
+            "fingerprints",
+            "encryptors",
+            "geo_lookups",
+            "interned_ids",
+            "interned_labels",
+        } <= names
+        assert len(local_caches["user_agents"]) == 1
+
+
+class TestCacheSynchronization:
+
+    def test_clear_everywhere_reaches_other_processes(self):
+        other = CacheRegistry()
+        cache = LRUCache("test", registry=other)
+        other.sync()
+        cache.set("a", 1)
+
+        local_caches.clear_everywhere()
+        other.sync()
+
+        assert "a" not in cache
+
+    def test_processes_publish_separately(self):
+        first, second = CacheRegistry(), CacheRegistry()
+        first.worker, second.worker = "web-1:1", "web-2:2"
+
+        first.sync()
+        second.sync()
+        first.sync()
+
+        assert {"web-1:1", "web-2:2"} <= set(local_caches.worker_stats())
+
+    def test_expired_slots_are_reused(self):
+        stopped, started = CacheRegistry(), CacheRegistry()
+        stopped.worker, started.worker = "web-1:1", "web-1:2"
+        stopped.sync()
+        local_caches.shared_cache.delete(STATS_KEY.format(slot=stopped._slot))
+
+        started.sync()
+
+        assert started._slot == stopped._slot
+        assert local_caches.shared_cache.get(WORKERS_KEY) == 1
+        assert list(local_caches.worker_stats()) == ["web-1:2"]
+
+    def test_reused_slot_is_given_up(self):
+        idle, started = CacheRegistry(), CacheRegistry()
+        idle.worker, started.worker = "web-1:1", "web-1:2"
+        idle.sync()
+        local_caches.shared_cache.delete(STATS_KEY.format(slot=idle._slot))
+        started.sync()
+
+        idle.sync()
+
+        assert idle._slot != started._slot
+        assert set(local_caches.worker_stats()) == {"web-1:1", "web-1:2"}
+
+    def test_lookups_do_not_sync(self):
+        registry = CacheRegistry()
+        cache = LRUCache("test", registry=registry)
+
+        with patch.object(registry, "sync") as sync:
+            cache.get("a")
+
+        sync.assert_not_called()
+
+    def test_request_finished_syncs(self, monkeypatch):
+        monkeypatch.setattr(local_caches, "_next_sync", 0.0)
+
+        with patch.object(local_caches, "sync") as sync:
+            sync_local_caches(sender=None)
+
+        sync.assert_called_once_with()
+
+    def test_command_lists_published_stats(self):
+        other = CacheRegistry()
+        other.worker = "web-1:42"
+        LRUCache("test", registry=other).set("a", 1)
+        other.sync()
+        out = StringIO()
+
+        call_command("session_caches", stdout=out)
+
+        assert "web-1:42" in out.getvalue()
+        assert "test" in out.getvalue()
+
+    def test_command_clears(self):
+        cache = LRUCache("test", registry=CacheRegistry())
+        cache.registry.sync()
+        cache.set("a", 1)
+
+        call_command("session_caches", "--clear", stdout=StringIO())
+        cache.registry.sync()
+
+        assert len(cache) == 0
+
+
+@pytest.mark.django_db
+class TestCachesAdminView:
+
+    @pytest.fixture
+    def model_admin(self):
+        return UserSessionAdmin(UserSession, AdminSite())
+
+    @pytest.fixture
+    def admin_user(self):
+        return User.objects.create_superuser(username="admin", password="pass")
+
+    def test_shows_stats(self, model_admin, admin_user):
+        parse_user_agent("Mozilla/5.0")
+        request = RequestFactory().get("/admin/caches/")
+        request.user = admin_user
+
+        response = model_admin.caches_view(request)
+        response.render()
+
+        assert response.status_code == 200
+        assert b"user_agents" in response.content
+
+    def test_post_clears(self, model_admin, admin_user):
+        parse_user_agent("Mozilla/5.0")
+        request = RequestFactory().post("/admin/caches/")
+        request.user = admin_user
+
+        with patch.object(model_admin, "message_user"):
+            response = model_admin.caches_view(request)
+
+        assert response.status_code == 302
+        assert len(local_caches["user_agents"]) == 0
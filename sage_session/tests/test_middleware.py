@@ -3,10 +3,12 @@ from django.contrib.auth.models import User
 from django.test import RequestFactory
 from django.utils.crypto import get_random_string
 from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.utils import timezone
 from sage_session.middleware.session import SessionManagementMiddleware
 from sage_session.models import UserSession
+from unittest.mock import patch
 
 
 @pytest.mark.django_db
@@ -155,9 +157,88 @@ class TestSessionManagementMiddleware:
                 expires_at=timezone.now() + timezone.timedelta(minutes=5),
             )
 
-        # Call the middleware
+        # Call the middleware; the least recently active session is evicted
         middleware = SessionManagementMiddleware(lambda req: None)
-        middleware.process_request(request)
+        with patch("sage_session.geo.gis.GeoIP2"):
+            middleware.process_request(request)
 
-        # Ensure no new session is created as the max sessions limit is reached
+        # Ensure the max sessions limit is still respected
         assert UserSession.objects.filter(user=user).count() == 10
+
+    def create_tracked_sessions(self, user, count):
+        """Helper function to create `count` tracked sessions for the user."""
+        user_sessions = []
+        for i in range(count):
+            user_sessions.append(
+                UserSession.objects.create(
+                    user=user,
+                    session=self.create_django_session(user),
+                    ip_address=f"192.168.1.{i}",
+                    browser_info=f"Browser {i}",
+                    device_info=f"Device {i}",
+                    last_activity=timezone.now() - timezone.timedelta(minutes=count - i),
+                    expires_at=timezone.now() + timezone.timedelta(minutes=5),
+                )
+            )
+        return user_sessions
+
+    def build_request(self, factory, user):
+        request = factory.get("/")
+        request.user = user
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        request.META["REMOTE_ADDR"] = "192.168.1.1"
+        self.add_session_to_request(request)
+        return request
+
+    def test_lru_policy_evicts_least_recently_active(self, factory, user, settings):
+        settings.MAX_USER_SESSIONS = 3
+        settings.SESSION_EVICTION_POLICY = "lru"
+        idle, *recent = self.create_tracked_sessions(user, 3)
+        # The oldest row is the most recently active one.
+        UserSession.objects.filter(pk=idle.pk).update(last_activity=timezone.now())
+        request = self.build_request(factory, user)
+
+        with patch("sage_session.geo.gis.GeoIP2"):
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        remaining = UserSession.objects.filter(user=user)
+        assert remaining.count() == 3
+        assert remaining.filter(pk=idle.pk).exists()
+        assert not remaining.filter(pk=recent[0].pk).exists()
+        assert not Session.objects.filter(pk=recent[0].session_id).exists()
+        assert remaining.filter(session_id=request.session.session_key).exists()
+
+    def test_oldest_policy_evicts_first_created(self, factory, user, settings):
+        settings.MAX_USER_SESSIONS = 3
+        settings.SESSION_EVICTION_POLICY = "oldest"
+        oldest, *newer = self.create_tracked_sessions(user, 3)
+        UserSession.objects.filter(pk=oldest.pk).update(
+            created_at=timezone.now() - timezone.timedelta(days=1),
+            last_activity=timezone.now(),
+        )
+        request = self.build_request(factory, user)
+
+        with patch("sage_session.geo.gis.GeoIP2"):
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        remaining = UserSession.objects.filter(user=user)
+        assert remaining.count() == 3
+        assert not remaining.filter(pk=oldest.pk).exists()
+        assert remaining.filter(pk__in=[s.pk for s in newer]).count() == 2
+
+    def test_reject_policy_logs_out_new_session(self, factory, user, settings):
+        settings.MAX_USER_SESSIONS = 3
+        settings.SESSION_EVICTION_POLICY = "reject"
+        self.create_tracked_sessions(user, 3)
+        request = self.build_request(factory, user)
+
+        SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        assert UserSession.objects.filter(user=user).count() == 3
+        assert not request.user.is_authenticated
+
+    def test_unknown_eviction_policy(self, settings):
+        settings.SESSION_EVICTION_POLICY = "random"
+
+        with pytest.raises(ImproperlyConfigured):
+            SessionManagementMiddleware(lambda req: None)
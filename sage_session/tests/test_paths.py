@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from django.test import RequestFactory
+from sage_session.middleware import (
+    SessionManagementMiddleware,
+    TrackUserActivityMiddleware,
+)
+from sage_session.utils.paths import TrackingFilter, compile_path_patterns
+
+
+class TestTrackingFilter:
+
+    @pytest.fixture
+    def factory(self):
+        return RequestFactory()
+
+    def test_compile_prefixes_and_regexes(self):
+        pattern = compile_path_patterns(["/health", r"^/api/v\d+/poll/$"])
+
+        assert pattern.match("/health/live")
+        assert pattern.match("/api/v2/poll/")
+        assert not pattern.match("/api/v2/poll/extra")
+        assert not pattern.match("/accounts/health")
+
+    def test_compile_empty_patterns(self):
+        assert compile_path_patterns([]) is None
+
+    def test_prefixes_are_escaped(self):
+        pattern = compile_path_patterns(["/a.b"])
+
+        assert pattern.match("/a.b/c")
+        assert not pattern.match("/axb/c")
+
+    def test_excluded_paths(self, factory):
+        tracking_filter = TrackingFilter(excluded_paths=["/health", "/static/"])
+
+        assert tracking_filter.is_excluded(factory.get("/health"))
+        assert tracking_filter.is_excluded(factory.get("/static/app.css"))
+        assert not tracking_filter.is_excluded(factory.get("/dashboard/"))
+
+    def test_websocket_upgrades_are_excluded(self, factory):
+        tracking_filter = TrackingFilter()
+        request = factory.get("/ws/", HTTP_UPGRADE="websocket")
+
+        assert tracking_filter.is_excluded(request)
+
+    def test_static_and_media_urls_from_settings(self, factory, settings):
+        settings.STATIC_URL = "/static/"
+        settings.MEDIA_URL = "/media/"
+        settings.SESSION_TRACKING_EXCLUDED_PATHS = ["/health"]
+        tracking_filter = TrackingFilter.from_settings()
+
+        assert tracking_filter.is_excluded(factory.get("/media/avatar.png"))
+        assert tracking_filter.is_excluded(factory.get("/static/app.js"))
+        assert tracking_filter.is_excluded(factory.get("/health"))
+
+    def test_sample_rates(self, factory):
+        tracking_filter = TrackingFilter(
+            sample_rates={"/api/poll": 0.1, r"^/api/notifications/\d+/$": 0},
+            default_rate=0.5,
+        )
+
+        assert tracking_filter.sample_rate(factory.get("/api/poll/")) == 0.1
+        assert tracking_filter.sample_rate(factory.get("/api/notifications/3/")) == 0
+        assert tracking_filter.sample_rate(factory.get("/dashboard/")) == 0.5
+
+    def test_should_track_respects_sampling(self, factory):
+        tracking_filter = TrackingFilter(sample_rates={"/api/poll": 0.1})
+
+        with patch("sage_session.utils.paths.random.random", return_value=0.05):
+            assert tracking_filter.should_track(factory.get("/api/poll/"))
+        with patch("sage_session.utils.paths.random.random", return_value=0.5):
+            assert not tracking_filter.should_track(factory.get("/api/poll/"))
+        assert tracking_filter.should_track(factory.get("/dashboard/"))
+
+    def test_middlewares_skip_excluded_paths(self, factory, settings):
+        settings.SESSION_TRACKING_EXCLUDED_PATHS = ["/health"]
+        request = factory.get("/health")
+        request.user = MagicMock()
+
+        SessionManagementMiddleware(lambda req: None).process_request(request)
+        TrackUserActivityMiddleware(lambda req: None)(request)
+
+        # The user (and therefore the session) is never touched.
+        assert request.user.mock_calls == []
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.test import RequestFactory
+from sage_session.middleware import TrackUserActivityMiddleware
+from sage_session.presence import (
+    count_online,
+    get_cache,
+    get_online_user_ids,
+    get_online_users,
+    mark_online,
+)
+
+NOW = 1_700_000_000
+
+
+@pytest.mark.django_db
+class TestPresence:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture
+    def clock(self):
+        with patch("sage_session.presence.time.time", return_value=NOW) as clock:
+            yield clock
+
+    def test_counts_each_user_once(self, clock):
+        mark_online(1)
+        mark_online(1)
+        mark_online(2)
+        clock.return_value = NOW + 60
+        mark_online(1)
+
+        assert get_online_user_ids() == {1, 2}
+        assert count_online() == 2
+
+    def test_users_go_offline_after_window(self, settings, clock):
+        settings.SESSION_PRESENCE_WINDOW = 5
+        mark_online(1)
+        clock.return_value = NOW + 60
+        mark_online(2)
+
+        clock.return_value = NOW + 5 * 60
+
+        assert get_online_user_ids() == {2}
+        assert count_online() == 1
+
+    def test_count_reads_only_counters(self, settings, clock):
+        settings.SESSION_PRESENCE_WINDOW = 5
+        for minute in range(3):
+            clock.return_value = NOW + minute * 60
+            for user_id in range(1, 51):
+                mark_online(user_id)
+
+        cache = get_cache()
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            assert count_online() == 50
+
+        (keys,), _ = get_many.call_args
+        assert get_many.call_count == 1
+        assert len(keys) == 5
+
+    def test_get_online_users(self, user, clock):
+        mark_online(user.pk)
+
+        assert list(get_online_users()) == [user]
+
+    def test_ignores_anonymous(self, clock):
+        mark_online(None)
+
+        assert count_online() == 0
+
+    def build_request(self, path, user):
+        request = RequestFactory().get(path)
+        SessionMiddleware(lambda req: None).process_request(request)
+        request.session.save()
+        request.user = user
+        return request
+
+    def test_middleware_marks_user_online(self, settings, user, clock):
+        settings.SESSION_TRACKING_SAMPLE_RATE = 0.0
+        middleware = TrackUserActivityMiddleware(lambda req: None)
+
+        middleware(self.build_request("/", user))
+
+        assert get_online_user_ids() == {user.pk}
+
+    def test_middleware_skips_excluded_paths(self, settings, user, clock):
+        settings.SESSION_TRACKING_EXCLUDED_PATHS = ["/health"]
+        middleware = TrackUserActivityMiddleware(lambda req: None)
+
+        middleware(self.build_request("/health", user))
+
+        assert count_online() == 0
@@ -0,0 +1,152 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.test import RequestFactory
+from django.utils import timezone
+from sage_session.admin.user_session import UserSessionAdmin
+from sage_session.middleware import (
+    SessionManagementMiddleware,
+    TrackUserActivityMiddleware,
+)
+from sage_session.backends.session import SessionBackend
+from sage_session.models import Browser, Device, UserSession
+from sage_session.utils.queries import (
+    QueryBudgetExceeded,
+    assert_max_queries,
+    get_recorded_queries,
+    record_queries,
+)
+from sage_session.views.api import SessionListAPIView
+from sage_session.views.session import UserSessionsView
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+
+    @pytest.fixture
+    def factory(self):
+        return RequestFactory()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def build_request(self, factory, user, path="/"):
+        """Helper function to build a request with a saved session."""
+        request = factory.get(path)
+        request.user = user
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        request.META["REMOTE_ADDR"] = "192.168.1.1"
+        SessionMiddleware(lambda req: None).process_request(request)
+        request.session.save()
+        return request
+
+    def create_user_session(self, request, user):
+        return UserSession.objects.create(
+            user=user,
+            session_id=request.session.session_key,
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timezone.timedelta(minutes=5),
+        )
+
+    def test_session_middleware_new_session_budget(
+        self, factory, user, django_capture_on_commit_callbacks
+    ):
+        request = self.build_request(factory, user)
+        middleware = SessionManagementMiddleware(lambda req: None)
+        # Browsers and devices seen before are resolved from the in-process cache.
+        with django_capture_on_commit_callbacks(execute=True):
+            Browser.objects.intern(SessionBackend.get_browser_info("Mozilla/5.0"))
+            Device.objects.intern(SessionBackend.get_device_info("Mozilla/5.0"))
+
+        with patch("sage_session.geo.gis.GeoIP2"):
+            with assert_max_queries("SessionManagementMiddleware"):
+                middleware.process_request(request)
+
+        assert UserSession.objects.filter(user=user).count() == 1
+
+    def test_session_middleware_tracked_session_is_query_free(self, factory, user):
+        request = self.build_request(factory, user)
+        middleware = SessionManagementMiddleware(lambda req: None)
+        with patch("sage_session.geo.gis.GeoIP2"):
+            middleware.process_request(request)
+
+        with assert_max_queries(0):
+            middleware.process_request(request)
+
+    def test_track_middleware_budget(self, factory, user):
+        request = self.build_request(factory, user)
+        self.create_user_session(request, user)
+        middleware = TrackUserActivityMiddleware(lambda req: None)
+
+        with assert_max_queries("TrackUserActivityMiddleware"):
+            middleware(request)
+
+    def test_user_sessions_view_budget(self, factory, user):
+        request = self.build_request(factory, user)
+        self.create_user_session(request, user)
+
+        with assert_max_queries("UserSessionsView"):
+            response = UserSessionsView.as_view()(request)
+            response.render()
+
+        assert len(response.context_data["sessions"]) == 1
+
+    def test_session_list_api_budget(self, factory, user):
+        request = self.build_request(factory, user)
+        self.create_user_session(request, user)
+
+        with assert_max_queries("SessionListAPIView"):
+            response = SessionListAPIView.as_view()(request)
+            b"".join(response.streaming_content)
+
+    def test_admin_changelist_budget(self, factory, user):
+        admin_user = User.objects.create_superuser(
+            username="admin", password="adminpass"
+        )
+        request = self.build_request(factory, admin_user, "/admin/")
+        for _ in range(3):
+            self.create_user_session(self.build_request(factory, user), user)
+        model_admin = UserSessionAdmin(UserSession, AdminSite())
+
+        with patch("django.contrib.admin.options.ModelAdmin.message_user"):
+            with assert_max_queries("UserSessionAdmin.changelist"):
+                response = model_admin.changelist_view(request)
+                assert not response.is_rendered
+                response.render()
+
+        assert response.status_code == 200
+
+    def test_budget_exceeded_lists_queries(self, user):
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            with assert_max_queries(1):
+                list(User.objects.all())
+                list(UserSession.objects.all())
+
+        assert "issued 2 queries, budget is 1" in str(excinfo.value)
+
+    def test_record_queries_attaches_to_request(self, factory, user, settings):
+        settings.RECORD_SESSION_QUERIES = True
+        request = factory.get("/")
+
+        with record_queries(request, "TestSource"):
+            list(UserSession.objects.filter(user=user))
+
+        queries = get_recorded_queries(request)
+        assert len(queries) == 1
+        assert queries[0]["source"] == "TestSource"
+        assert queries[0]["duration"] >= 0
+
+    def test_record_queries_disabled(self, factory, user, settings):
+        settings.RECORD_SESSION_QUERIES = False
+        request = factory.get("/")
+
+        with record_queries(request, "TestSource"):
+            list(UserSession.objects.filter(user=user))
+
+        assert get_recorded_queries(request) == []
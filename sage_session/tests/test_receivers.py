@@ -0,0 +1,122 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import login, logout
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory
+from sage_session.handlers.session import SessionHandler
+from sage_session.middleware import SessionManagementMiddleware
+from sage_session.models import UserSession
+from sage_session.utils.queries import assert_max_queries
+
+
+@pytest.mark.django_db
+class TestSessionLifecycleReceivers:
+
+    @pytest.fixture
+    def factory(self):
+        return RequestFactory()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture(autouse=True)
+    def geoip(self):
+        with patch("sage_session.geo.gis.GeoIP2") as mock_geoip2:
+            yield mock_geoip2
+
+    def build_request(self, factory, remote_addr="192.168.1.1"):
+        request = factory.get("/")
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        if remote_addr:
+            request.META["REMOTE_ADDR"] = remote_addr
+        SessionMiddleware(lambda req: None).process_request(request)
+        return request
+
+    def test_login_starts_tracking(self, factory, user):
+        request = self.build_request(factory)
+
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+
+        user_session = UserSession.objects.get(user=user)
+        assert user_session.session_id == request.session.session_key
+        assert SessionHandler(request).exists("default_session")
+
+    def test_login_without_client_ip_is_not_tracked(self, factory, user):
+        request = self.build_request(factory, remote_addr=None)
+        del request.META["REMOTE_ADDR"]
+
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+
+        assert not UserSession.objects.filter(user=user).exists()
+
+    def test_tracked_login_needs_no_extra_work_on_next_request(self, factory, user):
+        request = self.build_request(factory)
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+
+        with patch(
+            "sage_session.backends.session.SessionBackend.start_session"
+        ) as start_session:
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+
+        start_session.assert_not_called()
+
+    def test_first_request_sends_session_cookie(self, factory, user, settings):
+        request = factory.get("/")
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        request.META["REMOTE_ADDR"] = "192.168.1.1"
+        request.user = user
+
+        def get_response(request):
+            SessionManagementMiddleware(lambda req: None).process_request(request)
+            return HttpResponse()
+
+        response = SessionMiddleware(get_response)(request)
+
+        cookie = response.cookies[settings.SESSION_COOKIE_NAME]
+        assert cookie.value == request.session.session_key
+        assert UserSession.objects.filter(
+            user=user, session_id=cookie.value
+        ).exists()
+
+    def test_signals_mode_middleware_is_query_free(self, factory, user, settings):
+        settings.SESSION_TRACKING_MODE = "signals"
+        request = self.build_request(factory)
+        request.user = user
+        middleware = SessionManagementMiddleware(lambda req: None)
+
+        with assert_max_queries(0):
+            middleware.process_request(request)
+
+        assert not UserSession.objects.filter(user=user).exists()
+
+    def test_signals_mode_logout_removes_session(self, factory, user, settings):
+        settings.SESSION_TRACKING_MODE = "signals"
+        request = self.build_request(factory)
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+        assert UserSession.objects.filter(user=user).exists()
+
+        with patch("django.contrib.sessions.backends.db.SessionStore.delete"):
+            logout(request)
+
+        assert not UserSession.objects.filter(user=user).exists()
+
+    def test_signals_mode_session_delete_removes_session(
+        self, factory, user, settings
+    ):
+        settings.SESSION_TRACKING_MODE = "signals"
+        request = self.build_request(factory)
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+
+        with patch.object(
+            UserSession.objects,
+            "on_each_shard",
+            wraps=UserSession.objects.on_each_shard,
+        ) as on_each_shard:
+            Session.objects.get(pk=request.session.session_key).delete()
+
+        on_each_shard.assert_called_once()
+        assert not UserSession.objects.filter(user=user).exists()
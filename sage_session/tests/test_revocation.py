@@ -0,0 +1,98 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import RequestFactory
+from sage_session.middleware import SessionManagementMiddleware
+from sage_session.revocation import REVOCATION_COUNTER_KEY, RevocationList
+from sage_session.views.session import DeleteSessionView
+
+
+class TestRevocationList:
+
+    @pytest.fixture
+    def node(self, settings):
+        settings.SESSION_REVOCATION_REFRESH_INTERVAL = 0
+        return RevocationList()
+
+    def test_revoked_locally_at_once(self, node):
+        node.revoke(["session-a"])
+
+        assert node.is_revoked("session-a")
+        assert not node.is_revoked("session-b")
+        assert not node.is_revoked(None)
+
+    def test_other_nodes_see_revocations(self, node):
+        other = RevocationList()
+        assert not other.is_revoked("session-a")
+
+        node.revoke(["session-a", "session-b"])
+
+        assert other.is_revoked("session-a")
+        assert other.is_revoked("session-b")
+
+    def test_refresh_interval(self, node, settings):
+        settings.SESSION_REVOCATION_REFRESH_INTERVAL = 60
+        other = RevocationList()
+        other.is_revoked("session-a")
+
+        node.revoke(["session-a"])
+
+        assert not other.is_revoked("session-a")
+        other.refresh()
+        assert other.is_revoked("session-a")
+
+    def test_entries_expire(self, node, settings):
+        settings.SESSION_REVOCATION_TTL = -1
+
+        node.revoke(["session-a"])
+
+        assert not node.is_revoked("session-a")
+        assert not RevocationList().is_revoked("session-a")
+
+    def test_counter_eviction(self, node):
+        other = RevocationList()
+        node.revoke(["session-a", "session-b"])
+        other.refresh()
+
+        cache.delete(REVOCATION_COUNTER_KEY)
+        node.revoke(["session-c"])
+
+        assert other.is_revoked("session-c")
+
+
+@pytest.mark.django_db
+class TestRevocationMiddleware:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def build_request(self, user, session_key, method="get"):
+        request = getattr(RequestFactory(), method)("/")
+        request.user = user
+        SessionMiddleware(lambda req: None).process_request(request)
+        request.session = SessionStore(session_key=session_key)
+        return request
+
+    def test_revoked_session_is_logged_out(self, user, settings):
+        settings.SESSION_TRACKING_MODE = "signals"
+        store = SessionStore()
+        store.create()
+        request = self.build_request(user, store.session_key)
+        middleware = SessionManagementMiddleware(lambda req: None)
+
+        middleware.process_request(request)
+        assert request.user == user
+
+        delete_request = self.build_request(user, None, method="post")
+        delete_request._messages = FallbackStorage(delete_request)
+        DeleteSessionView.as_view()(delete_request, session_id=store.session_key)
+        request = self.build_request(user, store.session_key)
+        middleware.process_request(request)
+
+        assert not Session.objects.filter(session_key=store.session_key).exists()
+        assert isinstance(request.user, AnonymousUser)
@@ -0,0 +1,184 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from sage_session.admin.session_rollup import SessionRollupAdmin
+from sage_session.backends.session import SessionBackend
+from sage_session.models import SessionRollup, UserSession, UserSessionArchive
+from sage_session.models.managers import truncate_to_hour
+
+
+@pytest.mark.django_db
+class TestSessionRollups:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture
+    def hour(self):
+        return truncate_to_hour(timezone.now())
+
+    def create_user_session(self, user, country="DE", created_at=None, expires_in=60):
+        session = Session.objects.create(
+            session_key=get_random_string(32),
+            expire_date=timezone.now() + timedelta(days=1),
+        )
+        user_session = UserSession.objects.create(
+            user=user,
+            session=session,
+            ip_address="192.168.1.1",
+            country={"country_code": country},
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=timezone.now(),
+            expires_at=timezone.now() + timedelta(minutes=expires_in),
+        )
+        if created_at is not None:
+            UserSession.objects.filter(pk=user_session.pk).update(created_at=created_at)
+        return user_session
+
+    def test_retracked_session_is_started_once(
+        self, user, settings, django_capture_on_commit_callbacks
+    ):
+        settings.SESSION_ROLLUP_MODE = "signals"
+        request = RequestFactory().get("/")
+        request.user = user
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        request.META["REMOTE_ADDR"] = "192.168.1.1"
+        SessionMiddleware(lambda req: None).process_request(request)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert SessionBackend.start_session(request)
+            assert SessionBackend.start_session(request)
+
+        assert UserSession.objects.filter(user=user).count() == 1
+        assert SessionRollup.objects.get(dimension="country").started == 1
+
+    def test_record_increments_every_dimension(self, user, hour):
+        user_session = self.create_user_session(user)
+
+        SessionRollup.objects.record(user_session, started=1)
+        SessionRollup.objects.record(user_session, started=1, ended=1)
+
+        buckets = {
+            (row.dimension, row.value): (row.started, row.ended)
+            for row in SessionRollup.objects.filter(period=hour)
+        }
+        assert buckets == {
+            ("country", "DE"): (2, 1),
+            ("browser", "Chrome"): (2, 1),
+            ("device", "Other Linux"): (2, 1),
+        }
+
+    def test_series_carries_older_buckets(self, hour):
+        SessionRollup.objects.create(
+            period=hour - timedelta(hours=5), dimension="country", value="DE", started=4
+        )
+        SessionRollup.objects.create(
+            period=hour - timedelta(hours=1), dimension="country", value="DE", ended=1
+        )
+        SessionRollup.objects.create(
+            period=hour, dimension="country", value="FR", started=2
+        )
+
+        series = SessionRollup.objects.series(
+            "country", hour - timedelta(hours=2), hour + timedelta(minutes=1)
+        )
+
+        assert [active for _, active in series["DE"]] == [4, 3, 3]
+        assert [active for _, active in series["FR"]] == [0, 0, 2]
+
+    def test_rebuild_counts_live_and_archived_sessions(self, user, hour):
+        self.create_user_session(user, country="DE")
+        self.create_user_session(user, country="FR", expires_in=-1)
+        UserSessionArchive.objects.archive_expired()
+        SessionRollup.objects.create(period=hour, dimension="country", value="XX")
+
+        rebuilt = SessionRollup.objects.rebuild(hour - timedelta(hours=2))
+
+        # In the first minute of an hour, FR ends in the previous bucket.
+        countries = {}
+        for row in SessionRollup.objects.filter(dimension="country"):
+            started, ended = countries.get(row.value, (0, 0))
+            countries[row.value] = (started + row.started, ended + row.ended)
+        assert countries == {"DE": (1, 0), "FR": (1, 1)}
+        assert rebuilt == SessionRollup.objects.count()
+
+    def test_compact_preserves_totals(self, hour):
+        day = hour.replace(hour=0) - timedelta(days=40)
+        for offset in range(3):
+            SessionRollup.objects.create(
+                period=day + timedelta(hours=offset),
+                dimension="browser",
+                value="Chrome",
+                started=2,
+                ended=1,
+            )
+
+        removed = SessionRollup.objects.compact(hour - timedelta(days=30))
+
+        assert removed == 2
+        bucket = SessionRollup.objects.get()
+        assert (bucket.period, bucket.started, bucket.ended) == (day, 6, 3)
+
+    def test_deleted_session_is_counted_in_signals_mode(self, settings, user, hour):
+        settings.SESSION_ROLLUP_MODE = "signals"
+        user_session = self.create_user_session(user, country="DE")
+
+        user_session.session.delete()
+
+        bucket = SessionRollup.objects.get(dimension="country", value="DE")
+        assert (bucket.period, bucket.started, bucket.ended) == (hour, 0, 1)
+
+    def test_deleted_session_is_ignored_in_command_mode(self, user):
+        self.create_user_session(user).session.delete()
+
+        assert not SessionRollup.objects.exists()
+
+    def test_command_rebuilds_and_compacts(self, user):
+        self.create_user_session(user)
+        out = StringIO()
+
+        call_command("compact_session_rollups", stdout=out)
+
+        assert "Rebuilt 3 bucket(s)." in out.getvalue()
+        assert "Compacted away 0 hourly bucket(s)." in out.getvalue()
+
+    def test_command_skips_rebuild_in_signals_mode(self, settings):
+        settings.SESSION_ROLLUP_MODE = "signals"
+        out = StringIO()
+
+        call_command("compact_session_rollups", stdout=out)
+
+        assert "Rebuilt" not in out.getvalue()
+
+    def test_admin_dashboard_reads_rollups(self, hour, django_assert_num_queries):
+        admin_user = User.objects.create_superuser(username="admin", password="pass")
+        SessionRollup.objects.create(
+            period=hour, dimension="browser", value="Chrome", started=3
+        )
+        SessionRollup.objects.create(
+            period=hour, dimension="browser", value="Firefox", started=1
+        )
+        request = RequestFactory().get("/admin/", {"dimension": "browser"})
+        request.user = admin_user
+        model_admin = SessionRollupAdmin(SessionRollup, AdminSite())
+
+        with django_assert_num_queries(2):
+            response = model_admin.changelist_view(request)
+
+        rows = response.context_data["rows"]
+        assert [(row["value"], row["active"], row["share"]) for row in rows] == [
+            ("Chrome", 3, 75.0),
+            ("Firefox", 1, 25.0),
+        ]
+        response.render()
+        assert b"Chrome" in response.content
@@ -0,0 +1,199 @@
+import pytest
+from io import StringIO
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.sessions.models import Session
+from django.test import RequestFactory
+from django.utils import timezone
+from sage_session.admin.user_session import ShardListFilter, UserSessionAdmin
+from sage_session.models import UserSession
+from sage_session.routers import (
+    SessionReadRouter,
+    SessionShardRouter,
+    shard_for_user,
+    stick_to_primary,
+    use_primary,
+)
+
+
+class TestSessionReadRouter:
+
+    @pytest.fixture
+    def router(self):
+        return SessionReadRouter()
+
+    def test_reads_go_to_replica(self, router, settings):
+        settings.SESSION_READ_DATABASE = "replica"
+
+        assert router.db_for_read(UserSession) == "replica"
+        assert router.db_for_write(UserSession) is None
+
+    def test_other_apps_are_not_routed(self, router, settings):
+        settings.SESSION_READ_DATABASE = "replica"
+
+        assert router.db_for_read(Session) is None
+        assert router.db_for_read(User) is None
+
+    def test_use_primary_pins_reads(self, router, settings):
+        settings.SESSION_READ_DATABASE = "replica"
+
+        with use_primary():
+            assert router.db_for_read(UserSession) is None
+        assert router.db_for_read(UserSession) == "replica"
+
+    def test_without_replica(self, router, settings):
+        settings.SESSION_READ_DATABASE = None
+
+        assert router.db_for_read(UserSession) is None
+
+    def test_no_migrations_on_replica(self, router, settings):
+        settings.SESSION_READ_DATABASE = "replica"
+
+        assert router.allow_migrate("replica", "sage_session") is False
+        assert router.allow_migrate("default", "sage_session") is None
+        assert router.allow_migrate("replica", "auth") is None
+
+
+@pytest.mark.django_db
+class TestStickToPrimary:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    def create_user_session(self, user, last_activity):
+        return UserSession.objects.create(
+            user=user,
+            session=Session.objects.create(
+                session_key=f"key-{last_activity.timestamp()}",
+                expire_date=timezone.now() + timezone.timedelta(minutes=5),
+            ),
+            ip_address="192.168.1.1",
+            browser_info="Chrome 120.0",
+            device_info="Other Linux",
+            last_activity=last_activity,
+        )
+
+    def test_replaces_stale_current_row(self, user, settings):
+        settings.SESSION_READ_DATABASE = "default"
+        now = timezone.now()
+        other = self.create_user_session(user, now - timezone.timedelta(hours=1))
+        current = self.create_user_session(user, now - timezone.timedelta(hours=2))
+        stale_rows = list(UserSession.objects.filter(user=user).order_by("pk"))
+        UserSession.objects.filter(pk=current.pk).update(last_activity=now)
+
+        rows = stick_to_primary(stale_rows, user, current.session_id)
+
+        assert [row.pk for row in rows] == [other.pk, current.pk]
+        assert rows[1].last_activity == now
+
+    def test_appends_row_missing_from_replica(self, user, settings):
+        settings.SESSION_READ_DATABASE = "default"
+        current = self.create_user_session(user, timezone.now())
+
+        rows = stick_to_primary([], user, current.session_id)
+
+        assert rows == [current]
+
+    def test_noop_without_replica(self, user, settings):
+        settings.SESSION_READ_DATABASE = None
+        rows = [object()]
+
+        assert stick_to_primary(rows, user, "key") is rows
+
+
+class TestSessionSharding:
+
+    @pytest.fixture
+    def shards(self, settings):
+        settings.SESSION_SHARDS = ["default", "sessions_1", "sessions_2"]
+        return settings.SESSION_SHARDS
+
+    def test_shard_is_stable(self, shards):
+        placements = {shard_for_user(user_id) for user_id in range(300)}
+
+        assert placements == set(shards)
+        assert shard_for_user(42) == shard_for_user(42)
+        assert shard_for_user(User(pk=42)) == shard_for_user(42)
+
+    def test_sharding_disabled(self, settings):
+        settings.SESSION_SHARDS = None
+
+        assert shard_for_user(42) is None
+        assert UserSession.objects.for_user(User(pk=42)).db == "default"
+
+    def test_for_user_pins_shard(self, shards):
+        user = User(pk=7)
+
+        assert UserSession.objects.for_user(user).db == shard_for_user(user)
+
+    def test_on_each_shard(self, shards):
+        assert [qs.db for qs in UserSession.objects.on_each_shard()] == shards
+
+    def test_router_uses_instance_user(self, shards):
+        router = SessionShardRouter()
+        instance = UserSession(user_id=7)
+
+        assert router.db_for_write(UserSession, instance=instance) == shard_for_user(7)
+        assert router.db_for_read(UserSession) is None
+        assert router.db_for_write(User, instance=User(pk=7)) is None
+
+    def test_admin_shard_filter(self, shards):
+        model_admin = UserSessionAdmin(UserSession, AdminSite())
+        request = RequestFactory().get("/admin/")
+        shard_filter = ShardListFilter(
+            request, {"shard": ["sessions_1"]}, UserSession, model_admin
+        )
+
+        assert [alias for alias, _ in shard_filter.lookup_choices] == shards
+        queryset = shard_filter.queryset(request, UserSession.objects.all())
+        assert queryset.db == "sessions_1"
+
+    def test_admin_shard_filter_hidden_without_shards(self, settings):
+        settings.SESSION_SHARDS = None
+        model_admin = UserSessionAdmin(UserSession, AdminSite())
+        shard_filter = ShardListFilter(
+            RequestFactory().get("/admin/"), {}, UserSession, model_admin
+        )
+
+        assert not shard_filter.has_output()
+
+
+@pytest.mark.django_db
+class TestRebalanceCommand:
+
+    def test_requires_shards(self, settings):
+        settings.SESSION_SHARDS = None
+
+        with pytest.raises(CommandError):
+            call_command("rebalance_user_sessions")
+
+    def test_dry_run_counts_misplaced_sessions(self, settings):
+        settings.SESSION_SHARDS = ["default", "sessions_1"]
+        users = [
+            User.objects.create_user(username=f"user{i}", password="testpass")
+            for i in range(6)
+        ]
+        misplaced = 0
+        for i, user in enumerate(users):
+            UserSession.objects.using("default").create(
+                user=user,
+                session=Session.objects.create(
+                    session_key=f"key-{i}",
+                    expire_date=timezone.now() + timezone.timedelta(minutes=5),
+                ),
+                ip_address="192.168.1.1",
+                browser_info="Chrome 120.0",
+                device_info="Other Linux",
+            )
+            misplaced += shard_for_user(user) != "default"
+        out = StringIO()
+
+        call_command(
+            "rebalance_user_sessions", "--source=default", "--dry-run", stdout=out
+        )
+
+        assert f"Would move {misplaced} session(s)." in out.getvalue()
+        assert UserSession.objects.count() == 6
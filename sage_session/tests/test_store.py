@@ -0,0 +1,114 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
+from django.core.cache import cache
+from django.db import router
+from django.utils import timezone
+from sage_session.backends.store import SessionStore
+from sage_session.models import SessionRecord
+from sage_session.routers import SessionReadRouter
+from sage_session.utils.engines import uses_session_model
+from sage_session.utils.queries import assert_max_queries
+
+
+@pytest.mark.django_db
+class TestSessionStore:
+
+    @pytest.fixture
+    def store(self):
+        store = SessionStore()
+        store[SESSION_KEY] = "42"
+        store.create()
+        return store
+
+    def test_create_stores_metadata(self, store):
+        record = SessionRecord.objects.get(session_key=store.session_key)
+
+        assert record.user_id == "42"
+        assert record.last_activity is not None
+        assert record.get_decoded()[SESSION_KEY] == "42"
+
+    def test_load_from_cache_is_query_free(self, store):
+        with assert_max_queries(0):
+            session = SessionStore(session_key=store.session_key)
+            assert session[SESSION_KEY] == "42"
+
+    def test_load_from_database_is_one_query(self, store):
+        cache.clear()
+
+        with assert_max_queries(1):
+            session = SessionStore(session_key=store.session_key)
+            assert session[SESSION_KEY] == "42"
+            assert session.last_activity is not None
+
+        with assert_max_queries(0):
+            assert SessionStore(session_key=store.session_key)[SESSION_KEY] == "42"
+
+    def test_load_ignores_read_replica(self, store, settings):
+        settings.SESSION_READ_DATABASE = "replica"
+        cache.clear()
+
+        with patch.object(router, "routers", [SessionReadRouter()]):
+            assert router.db_for_read(SessionRecord) == "default"
+            session = SessionStore(session_key=store.session_key)
+            assert session[SESSION_KEY] == "42"
+            assert session.exists(store.session_key)
+
+    def test_save_is_one_update(self, store):
+        session = SessionStore(session_key=store.session_key)
+        session["theme"] = "dark"
+
+        with assert_max_queries(1) as recorders:
+            session.save()
+
+        assert recorders[0].queries[0]["sql"].startswith("UPDATE")
+        record = SessionRecord.objects.get(session_key=store.session_key)
+        assert record.get_decoded()["theme"] == "dark"
+
+    def test_save_of_deleted_session(self, store):
+        session = SessionStore(session_key=store.session_key)
+        session.load()
+        SessionRecord.objects.all().delete()
+
+        with pytest.raises(UpdateError):
+            session.save()
+
+    def test_stale_activity_marks_session_modified(self, store, settings):
+        settings.SESSION_STORE_ACTIVITY_INTERVAL = 60
+        session = SessionStore(session_key=store.session_key)
+        session.load()
+        assert not session.modified
+
+        SessionRecord.objects.update(
+            last_activity=timezone.now() - timezone.timedelta(minutes=5)
+        )
+        cache.clear()
+        session = SessionStore(session_key=store.session_key)
+        session.load()
+        assert session.modified
+
+    def test_anonymous_sessions_are_not_touched(self, settings):
+        settings.SESSION_STORE_ACTIVITY_INTERVAL = 0
+        store = SessionStore()
+        store["cart"] = [1]
+        store.create()
+
+        session = SessionStore(session_key=store.session_key)
+        session.load()
+
+        assert not session.modified
+
+    def test_delete(self, store):
+        session_key = store.session_key
+        assert store.exists(session_key)
+
+        store.flush()
+
+        assert not store.exists(session_key)
+        assert not SessionRecord.objects.exists()
+
+    def test_is_an_engine_without_session_model(self, settings):
+        settings.SESSION_ENGINE = "sage_session.backends.store"
+
+        assert not uses_session_model()
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import login
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.test import RequestFactory
+from sage_session.cache import get_cache, get_session_list, warm_session_caches
+from sage_session.handlers.session import SessionHandler
+from sage_session.models import Browser, Device
+
+
+@pytest.mark.django_db
+class TestLoginWarmup:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="testuser", password="testpass")
+
+    @pytest.fixture(autouse=True)
+    def geoip(self):
+        with patch("sage_session.geo.gis.GeoIP2") as mock_geoip2:
+            yield mock_geoip2
+
+    def login(self, user):
+        request = RequestFactory().get("/")
+        request.META["HTTP_USER_AGENT"] = "Mozilla/5.0"
+        request.META["REMOTE_ADDR"] = "192.168.1.1"
+        SessionMiddleware(lambda req: None).process_request(request)
+        login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+        return request
+
+    def test_login_warms_session_list(
+        self,
+        settings,
+        user,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.SESSION_LOGIN_WARMUP = True
+        with django_capture_on_commit_callbacks(execute=True):
+            request = self.login(user)
+
+        with django_assert_num_queries(0):
+            session_list = get_session_list(user, request.session.session_key)
+        assert [row["session_id"] for row in session_list] == [
+            request.session.session_key
+        ]
+
+    def test_warmup_fills_interning_caches(
+        self, user, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        self.login(user)
+        get_cache().clear()
+        Browser.objects.clear_cache()
+
+        with django_assert_num_queries(1):
+            with django_capture_on_commit_callbacks(execute=True):
+                assert warm_session_caches(user)
+        row = user.usersession_set.get()
+
+        with django_assert_num_queries(0):
+            assert row.browser_info == Browser.objects.label_for(row.browser_id)
+            assert row.device_info == Device.objects.label_for(row.device_id)
+
+    def test_warmup_keeps_cached_list(self, user, django_assert_num_queries):
+        self.login(user)
+        get_session_list(user)
+
+        with django_assert_num_queries(0):
+            assert not warm_session_caches(user)
+
+    def test_warmup_is_off_by_default(self, user, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            self.login(user)
+
+        assert get_cache().get(f"sage_session:sessions:{user.pk}") is None
+
+    def test_handlers_share_the_encryptor(self, user):
+        request = self.login(user)
+
+        assert SessionHandler(request).fernet is SessionHandler(request).fernet
@@ -1,5 +1,10 @@
 from django.urls import path
 
+from sage_session.views.api import (
+    SessionBulkRevokeAPIView,
+    SessionListAPIView,
+    SessionRevokeAPIView,
+)
 from sage_session.views.session import UserSessionsView, DeleteSessionView
 
 urlpatterns = [
@@ -9,4 +14,15 @@ urlpatterns = [
         DeleteSessionView.as_view(),
         name="delete_user_session",
     ),
+    path("api/sessions/", SessionListAPIView.as_view(), name="session_api_list"),
+    path(
+        "api/sessions/revoke/",
+        SessionBulkRevokeAPIView.as_view(),
+        name="session_api_bulk_revoke",
+    ),
+    path(
+        "api/sessions/<str:session_id>/",
+        SessionRevokeAPIView.as_view(),
+        name="session_api_revoke",
+    ),
 ]
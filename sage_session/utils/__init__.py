@@ -0,0 +1,10 @@
+from .ip import ClientIPResolver, NetworkTable, get_client_ip
+from .paths import TrackingFilter, compile_path_patterns
+from .queries import (
+    QUERY_BUDGETS,
+    QueryBudgetExceeded,
+    QueryRecorder,
+    assert_max_queries,
+    get_recorded_queries,
+    record_queries,
+)
@@ -0,0 +1,257 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import (
+    SessionStore as SignedCookieSessionStore,
+)
+from django.contrib.sessions.models import Session
+from django.db import router, transaction
+from django.db.models import signals
+from django.dispatch.dispatcher import NONE_ID, _make_id
+
+from sage_session.revocation import revocations
+from sage_session.routers import use_primary
+
+DISPATCH_UID_PREFIX = "sage_session_"
+
+
+def get_session_store_class():
+    """Returns the `SessionStore` class of the configured `SESSION_ENGINE`."""
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def uses_session_model():
+    """Whether sessions are rows of `django.contrib.sessions.models.Session`.
+
+    True for the `db` and `cached_db` engines. With any other engine
+    `UserSession` only keeps the session key, without a database constraint.
+    """
+    store_class = get_session_store_class()
+    get_model_class = getattr(store_class, "get_model_class", None)
+    return get_model_class is not None and get_model_class() is Session
+
+
+def has_server_side_state():
+    """Whether the engine keeps sessions on the server, so they can be deleted."""
+    return not issubclass(get_session_store_class(), SignedCookieSessionStore)
+
+
+def session_exists(session_key):
+    """Whether `session_key` is a live session of the configured engine.
+
+    Signed-cookie sessions only exist in the browser, so a key counts as
+    live while it is tracked by a `UserSession`.
+    """
+    from sage_session.models import UserSession
+
+    if not session_key:
+        return False
+    if has_server_side_state():
+        return get_session_store_class()().exists(session_key)
+    return any(
+        sessions.filter(session_id=session_key).exists()
+        for sessions in UserSession.objects.on_each_shard()
+    )
+
+
+def delete_sessions(session_keys, user=None):
+    """Ends the sessions with the given keys on every node.
+
+    With the `Session` model a single set-based delete cascades to the
+    `UserSession` rows. Other engines delete each key from their store and
+    the tracked rows explicitly, from the shard of `user` when given.
+    Every key is also published to the revocation list, which is the only
+    way to end a signed-cookie session before it expires.
+    """
+    from sage_session.models import UserSession
+
+    session_keys = [session_key for session_key in session_keys if session_key]
+    if not session_keys:
+        return
+    if uses_session_model():
+        Session.objects.filter(session_key__in=session_keys).delete()
+    else:
+        store = get_session_store_class()()
+        for session_key in session_keys:
+            store.delete(session_key)
+        if user is not None:
+            shards = [UserSession.objects.for_user(user)]
+        else:
+            shards = UserSession.objects.on_each_shard()
+        for sessions in shards:
+            sessions.filter(session_id__in=session_keys).delete()
+    revocations.revoke(session_keys)
+
+
+def purge_orphaned_sessions(batch_size=1000):
+    """Deletes `UserSession` rows whose session no longer exists.
+
+    Covers engines and shards the foreign key cascade does not reach.
+    Signed-cookie sessions cannot be checked on the server; their rows are
+    only removed once expired. Returns the number of purged rows.
+    """
+    from sage_session.models import UserSession
+
+    if not has_server_side_state():
+        return 0
+    model_backed = uses_session_model()
+    store = get_session_store_class()()
+    purged = 0
+    with use_primary():
+        for sessions in UserSession.objects.on_each_shard():
+            last_pk = 0
+            while True:
+                batch = list(
+                    sessions.filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .values_list("pk", "session_id")[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+                keys = [session_key for _, session_key in batch]
+                if model_backed:
+                    live = set(
+                        Session.objects.filter(session_key__in=keys).values_list(
+                            "session_key", flat=True
+                        )
+                    )
+                else:
+                    live = {key for key in keys if store.exists(key)}
+                orphans = [pk for pk, session_key in batch if session_key not in live]
+                if orphans:
+                    sessions.filter(pk__in=orphans).delete()
+                    purged += len(orphans)
+    return purged
+
+
+def _has_foreign_receivers(signal, model):
+    """Whether `signal` has receivers for `model` other than sage_session's own.
+
+    The package connects its receivers with a `dispatch_uid` starting with
+    `sage_session_`; their work is repeated in bulk by the callers.
+    """
+    senders = {_make_id(model), NONE_ID}
+    return any(
+        sender in senders and not str(dispatch_uid).startswith(DISPATCH_UID_PREFIX)
+        for (dispatch_uid, sender), *_ in signal.receivers
+    )
+
+
+def _can_raw_delete(model, handled=()):
+    """Whether rows of `model` can be deleted without Django's collector.
+
+    True when no model other than the `handled` ones references it, so no
+    cascade is skipped, and nobody but sage_session listens to its delete
+    signals, whose work the caller does itself.
+    """
+    return all(
+        relation.related_model in handled for relation in model._meta.related_objects
+    ) and not any(
+        _has_foreign_receivers(signal, model)
+        for signal in (signals.pre_delete, signals.post_delete)
+    )
+
+
+def _delete_tracked_sessions(session_keys):
+    """Deletes the `UserSession` rows of `session_keys` on every shard.
+
+    Returns the number of deleted rows.
+    """
+    from sage_session.cache import invalidate_session_list
+    from sage_session.models import SessionRollup, UserSession
+
+    deleted = 0
+    raw_delete = _can_raw_delete(UserSession)
+    for sessions in UserSession.objects.on_each_shard():
+        rows = sessions.filter(session_id__in=session_keys)
+        tracked = list(
+            rows.select_related("browser", "device").only(
+                "user_id",
+                "browser",
+                "device",
+                "country",
+                "expires_at",
+                "browser__label",
+                "device__label",
+            )
+        )
+        if not tracked:
+            continue
+        if not raw_delete:
+            rows.delete()
+            deleted += len(tracked)
+            continue
+        rows._raw_delete(rows.db)
+        deleted += len(tracked)
+        for user_id in {row.user_id for row in tracked}:
+            invalidate_session_list(user_id, using=rows.db)
+        if SessionRollup.objects.is_incremental():
+            SessionRollup.objects.record_ended(tracked)
+    return deleted
+
+
+def _delete_stored_sessions(session_keys):
+    """Deletes `session_keys` from the store of the session engine."""
+    from sage_session.models import UserSession
+
+    if uses_session_model():
+        ended = Session.objects.filter(session_key__in=session_keys)
+        if _can_raw_delete(Session, handled=(UserSession,)):
+            ended._raw_delete(ended.db)
+        else:
+            ended.delete()
+    elif has_server_side_state():
+        store = get_session_store_class()()
+        for session_key in session_keys:
+            store.delete(session_key)
+
+
+def bulk_delete_sessions(session_keys, revoke=True):
+    """Deletes the sessions with the given keys with set-based statements.
+
+    Unlike `delete_sessions`, the `UserSession` and `Session` rows are
+    removed with raw deletes that skip the collector and its per-row
+    signals whenever nothing else references them or listens to their
+    deletion. What the package's receivers would have done is done once per
+    batch instead: the owners' cached session lists are dropped and the
+    rollups count the sessions as ended. With `revoke` the keys are also
+    published to the revocation list. Returns the number of deleted
+    `UserSession` rows.
+    """
+    session_keys = [session_key for session_key in session_keys if session_key]
+    if not session_keys:
+        return 0
+
+    with use_primary(), transaction.atomic(using=router.db_for_write(Session)):
+        deleted = _delete_tracked_sessions(session_keys)
+        _delete_stored_sessions(session_keys)
+    if revoke:
+        revocations.revoke(session_keys)
+    return deleted
+
+
+def delete_sessions_in_batches(
+    queryset, key_field="session_id", batch_size=1000, revoke=True, progress=None
+):
+    """Deletes the sessions selected by `queryset` in batches of `batch_size`.
+
+    `queryset` may select `UserSession` or `Session` rows; `key_field` names
+    the field holding the session key. Each batch is read with a primary key
+    cursor and passed to `bulk_delete_sessions`, and `progress` is called
+    with the number of sessions processed so far after each one. Returns
+    that number.
+    """
+    processed = 0
+    last_pk = None
+    queryset = queryset.order_by("pk")
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch.values_list("pk", key_field)[:batch_size])
+        if not batch:
+            return processed
+        last_pk = batch[-1][0]
+        bulk_delete_sessions([session_key for _, session_key in batch], revoke=revoke)
+        processed += len(batch)
+        if progress is not None:
+            progress(processed)
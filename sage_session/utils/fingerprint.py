@@ -0,0 +1,46 @@
+from hashlib import blake2b
+from ipaddress import ip_network
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from sage_session.local_cache import lru_cached
+from sage_session.utils.ip import get_client_ip
+
+FINGERPRINT_SESSION_KEY = "_sage_session_fingerprint"
+# The last mismatching fingerprint handled, so it is only reported once.
+FINGERPRINT_MISMATCH_SESSION_KEY = "_sage_session_fingerprint_mismatch"
+
+
+@lru_cached("fingerprints", maxsize=4096)
+def compute_fingerprint(
+    user_agent: str, ip_address: str, ipv4_prefix: int = 24, ipv6_prefix: int = 48
+) -> str:
+    """Returns a 16 character hash binding a session to its client.
+
+    Only the browser and OS families and the network prefix of the address
+    are hashed, so browser updates and address changes within the same
+    network keep the fingerprint stable.
+    """
+    from sage_session.backends.session import parse_user_agent
+
+    ua = parse_user_agent(user_agent)
+    network = ip_network(ip_address, strict=False)
+    prefix = ipv4_prefix if network.version == 4 else ipv6_prefix
+    network = network.supernet(new_prefix=min(prefix, network.prefixlen))
+    value = f"{ua.browser.family}|{ua.os.family}|{network}"
+    return blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def get_request_fingerprint(request: HttpRequest) -> Optional[str]:
+    """Returns the fingerprint of the client making `request`, if known."""
+    ip_address, _ = get_client_ip(request)
+    if ip_address is None:
+        return None
+    return compute_fingerprint(
+        request.META.get("HTTP_USER_AGENT", ""),
+        ip_address,
+        getattr(settings, "SESSION_FINGERPRINT_IPV4_PREFIX", 24),
+        getattr(settings, "SESSION_FINGERPRINT_IPV6_PREFIX", 48),
+    )
@@ -0,0 +1,115 @@
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest
+
+DEFAULT_CLIENT_IP_HEADERS = ("HTTP_X_FORWARDED_FOR",)
+
+
+class NetworkTable:
+    """Set of IP networks answering membership with one hash lookup per prefix.
+
+    Networks are stored as their integer prefixes, grouped by IP version and
+    prefix length, so checking an address costs one shift and one set lookup
+    for each distinct prefix length instead of a scan over all networks.
+    """
+
+    def __init__(self, networks: Iterable[str]) -> None:
+        self.prefixes = {4: {}, 6: {}}
+        for network in networks:
+            network = ip_network(network, strict=False)
+            shift = network.max_prefixlen - network.prefixlen
+            self.prefixes[network.version].setdefault(shift, set()).add(
+                int(network.network_address) >> shift
+            )
+
+    def __bool__(self) -> bool:
+        return any(self.prefixes.values())
+
+    def __contains__(self, address) -> bool:
+        value = int(address)
+        return any(
+            value >> shift in prefixes
+            for shift, prefixes in self.prefixes[address.version].items()
+        )
+
+
+class ClientIPResolver:
+    """Resolves the client IP of a request behind known proxies.
+
+    When `REMOTE_ADDR` is one of the `trusted_proxies`, the `headers` are
+    read in order and each comma separated list is walked from the right,
+    skipping trusted hops; the first untrusted address, or the leftmost one
+    if every hop is trusted, is the client. Any other peer is the client
+    itself, so forged headers are ignored.
+
+    Without trusted proxies the resolver defers to `ipware`.
+    """
+
+    def __init__(
+        self,
+        trusted_proxies: Iterable[str] = (),
+        headers: Iterable[str] = DEFAULT_CLIENT_IP_HEADERS,
+    ) -> None:
+        self.trusted_proxies = NetworkTable(trusted_proxies)
+        self.headers = tuple(headers)
+
+    @classmethod
+    def from_settings(cls) -> "ClientIPResolver":
+        return cls(
+            getattr(settings, "SESSION_TRUSTED_PROXIES", ()),
+            getattr(settings, "SESSION_CLIENT_IP_HEADERS", DEFAULT_CLIENT_IP_HEADERS),
+        )
+
+    def resolve(self, request: HttpRequest) -> Tuple[Optional[str], bool]:
+        """Returns the client IP and whether it is publicly routable."""
+        if not self.trusted_proxies:
+            from ipware import get_client_ip
+
+            return get_client_ip(request)
+
+        address = self._parse(request.META.get("REMOTE_ADDR"))
+        if address is None:
+            return None, False
+        if address in self.trusted_proxies:
+            address = self._from_headers(request) or address
+        return str(address), address.is_global
+
+    def _from_headers(self, request):
+        for header in self.headers:
+            value = request.META.get(header)
+            if not value:
+                continue
+            hops = [self._parse(hop) for hop in value.split(",")]
+            for hop in reversed(hops):
+                if hop is None:
+                    # Everything left of a malformed hop is untrustworthy.
+                    break
+                if hop not in self.trusted_proxies:
+                    return hop
+            else:
+                # Every hop is trusted: the request started inside the network.
+                return hops[0]
+        return None
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        try:
+            return ip_address(value.strip())
+        except ValueError:
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_client_ip_resolver() -> ClientIPResolver:
+    """Returns the resolver built from the settings, compiled once."""
+    return ClientIPResolver.from_settings()
+
+
+def get_client_ip(request: HttpRequest) -> Tuple[Optional[str], bool]:
+    """Returns the client IP of `request` and whether it is routable."""
+    return get_client_ip_resolver().resolve(request)
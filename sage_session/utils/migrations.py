@@ -0,0 +1,33 @@
+def intern_user_agent_fields(apps, schema_editor):
+    """Converts the legacy `browser_info`/`device_info` text columns.
+
+    Meant to run as a `RunPython` step in a migration placed between adding
+    the `browser`/`device` foreign keys and removing the old text columns.
+    Every distinct string is interned once and the sessions referencing it
+    are updated with a single set-based `UPDATE`, so the cost grows with the
+    number of distinct values rather than the number of sessions.
+    """
+    alias = schema_editor.connection.alias
+    UserSession = apps.get_model("sage_session", "UserSession")
+    targets = (
+        ("browser_info", "browser_id", apps.get_model("sage_session", "Browser")),
+        ("device_info", "device_id", apps.get_model("sage_session", "Device")),
+    )
+
+    for text_field, fk_field, model in targets:
+        sessions = UserSession.objects.using(alias)
+        labels = set(
+            sessions.exclude(**{text_field: ""})
+            .values_list(text_field, flat=True)
+            .distinct()
+        )
+        model.objects.using(alias).bulk_create(
+            [model(label=label) for label in labels], ignore_conflicts=True
+        )
+        ids = dict(
+            model.objects.using(alias)
+            .filter(label__in=labels)
+            .values_list("label", "pk")
+        )
+        for label, pk in ids.items():
+            sessions.filter(**{text_field: label}).update(**{fk_field: pk})
@@ -0,0 +1,103 @@
+import random
+import re
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.http import HttpRequest
+
+
+def compile_path_patterns(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    """Compiles URL prefixes and regular expressions into a single regex.
+
+    Entries starting with `^` are treated as regular expressions, anything
+    else as a literal path prefix. Returns `None` when there is nothing to
+    match so callers can skip the check entirely.
+
+    """
+    alternatives = [
+        pattern if pattern.startswith("^") else f"^{re.escape(pattern)}"
+        for pattern in patterns
+        if pattern
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in alternatives))
+
+
+def _default_excluded_paths() -> list[str]:
+    """Static and media URLs are never worth tracking.
+
+    Unset URLs resolve to the site root, which must not exclude everything.
+    """
+    urls = (
+        getattr(settings, "STATIC_URL", None),
+        getattr(settings, "MEDIA_URL", None),
+    )
+    return [str(url) for url in urls if url and str(url).startswith("/") and url != "/"]
+
+
+class TrackingFilter:
+    """Decides which requests the tracking middlewares should look at.
+
+    Excluded requests (matching `SESSION_TRACKING_EXCLUDED_PATHS`, static and
+    media URLs, or websocket upgrades) are skipped entirely. Activity updates
+    for the remaining requests can be sampled per path through
+    `SESSION_TRACKING_SAMPLE_RATES`, so chatty polling endpoints only touch
+    the database for a fraction of their hits.
+
+    All patterns are compiled once, into one regex for the exclusions and
+    one regex with a named group per sampling rule.
+
+    """
+
+    def __init__(
+        self,
+        excluded_paths: Iterable[str] = (),
+        sample_rates: Optional[dict[str, float]] = None,
+        default_rate: float = 1.0,
+    ) -> None:
+        self.excluded = compile_path_patterns(excluded_paths)
+        self.default_rate = default_rate
+
+        self.rates: dict[str, float] = {}
+        groups = []
+        for index, (pattern, rate) in enumerate((sample_rates or {}).items()):
+            compiled = compile_path_patterns([pattern])
+            if compiled is None:
+                continue
+            name = f"rule{index}"
+            self.rates[name] = float(rate)
+            groups.append(f"(?P<{name}>{compiled.pattern})")
+        self.sampling = re.compile("|".join(groups)) if groups else None
+
+    @classmethod
+    def from_settings(cls) -> "TrackingFilter":
+        excluded = list(getattr(settings, "SESSION_TRACKING_EXCLUDED_PATHS", []))
+        return cls(
+            excluded_paths=excluded + _default_excluded_paths(),
+            sample_rates=getattr(settings, "SESSION_TRACKING_SAMPLE_RATES", None),
+            default_rate=getattr(settings, "SESSION_TRACKING_SAMPLE_RATE", 1.0),
+        )
+
+    def is_excluded(self, request: HttpRequest) -> bool:
+        """Returns whether the request should bypass session tracking."""
+        if request.META.get("HTTP_UPGRADE", "").lower() == "websocket":
+            return True
+        return bool(self.excluded and self.excluded.match(request.path_info))
+
+    def sample_rate(self, request: HttpRequest) -> float:
+        """Returns the fraction of requests to this path that are tracked."""
+        if self.sampling:
+            match = self.sampling.match(request.path_info)
+            if match:
+                return self.rates[match.lastgroup]
+        return self.default_rate
+
+    def should_track(self, request: HttpRequest) -> bool:
+        """Returns whether an activity update should be recorded."""
+        if self.is_excluded(request):
+            return False
+        rate = self.sample_rate(request)
+        if rate >= 1:
+            return True
+        return rate > 0 and random.random() < rate  # noqa: S311
@@ -0,0 +1,139 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Optional, Union
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+REQUEST_QUERIES_ATTR = "_sage_session_queries"
+
+# Maximum number of queries each sage_session component may issue on its
+# hottest path. Tests assert against these numbers, so a change that adds a
+# query has to raise the budget here explicitly.
+QUERY_BUDGETS = {
+    "SessionManagementMiddleware": 3,
+    "TrackUserActivityMiddleware": 1,
+    "UserSessionsView": 1,
+    "DeleteSessionView": 3,
+    "SessionListAPIView": 2,
+    "UserSessionAdmin.changelist": 8,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code issues more queries than its budget."""
+
+
+class QueryRecorder:
+    """Database execute wrapper that records every query passing through it.
+
+    Each recorded entry is a dictionary holding the originating `source`
+    label, the database alias, the SQL statement, its parameters and the
+    duration in milliseconds.
+
+    """
+
+    def __init__(self, source: str = "sage_session", alias: str = "default") -> None:
+        self.source = source
+        self.alias = alias
+        self.queries: list[dict[str, Any]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "source": self.source,
+                    "alias": self.alias,
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "duration": (time.perf_counter() - start) * 1000,
+                }
+            )
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+
+@contextmanager
+def _capture(source: str, using: Optional[str] = None):
+    """Installs a `QueryRecorder` on one or all configured connections."""
+    aliases = [using] if using else list(connections)
+    recorders = []
+    with ExitStack() as stack:
+        for alias in aliases:
+            recorder = QueryRecorder(source, alias)
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+            recorders.append(recorder)
+        yield recorders
+
+
+def is_recording_enabled() -> bool:
+    """Returns whether per-request query recording is switched on."""
+    return getattr(settings, "RECORD_SESSION_QUERIES", settings.DEBUG)
+
+
+@contextmanager
+def record_queries(request: Optional[HttpRequest], source: str):
+    """Records the queries issued by a sage_session component on the request.
+
+    Recording is only active when `RECORD_SESSION_QUERIES` (defaults to
+    `DEBUG`) is enabled, so production requests pay nothing for it. The
+    captured queries are exposed through `get_recorded_queries` and the
+    debug toolbar panel in `sage_session.panels`.
+
+    """
+    if request is None or not is_recording_enabled():
+        yield
+        return
+
+    with _capture(source) as recorders:
+        yield
+    recorded = getattr(request, REQUEST_QUERIES_ATTR, None)
+    if recorded is None:
+        recorded = []
+        setattr(request, REQUEST_QUERIES_ATTR, recorded)
+    for recorder in recorders:
+        recorded.extend(recorder.queries)
+
+
+def get_recorded_queries(request: HttpRequest) -> list[dict[str, Any]]:
+    """Returns the queries sage_session recorded for the given request."""
+    return list(getattr(request, REQUEST_QUERIES_ATTR, []))
+
+
+@contextmanager
+def assert_max_queries(budget: Union[int, str], using: Optional[str] = None):
+    """Asserts that the wrapped block stays within a query budget.
+
+    `budget` is either a number of queries or the name of a component in
+    `QUERY_BUDGETS`. Queries on every configured database are counted
+    unless `using` narrows it down to a single alias.
+
+    Example:
+        with assert_max_queries("TrackUserActivityMiddleware"):
+            middleware(request)
+
+    """
+    label = budget if isinstance(budget, str) else "block"
+    limit = QUERY_BUDGETS[budget] if isinstance(budget, str) else budget
+
+    with _capture(label, using) as recorders:
+        yield recorders
+
+    queries = [query for recorder in recorders for query in recorder.queries]
+    if len(queries) > limit:
+        statements = "\n".join(
+            f"{index}. [{query['alias']}] {query['sql']}"
+            for index, query in enumerate(queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f"{label} issued {len(queries)} queries, budget is {limit}:\n{statements}"
+        )
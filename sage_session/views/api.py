@@ -0,0 +1,167 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views.generic import View
+
+from sage_session.models import UserSession
+from sage_session.routers import use_primary
+from sage_session.utils.engines import delete_sessions
+from sage_session.utils.queries import record_queries
+
+# Fields exposed by the API, mapped to the lookups selected for them.
+API_FIELDS = {
+    "session_id": "session_id",
+    "ip_address": "ip_address",
+    "city": "city",
+    "country": "country",
+    "browser_info": "browser__label",
+    "device_info": "device__label",
+    "last_activity": "last_activity",
+    "expires_at": "expires_at",
+    "created_at": "created_at",
+}
+
+
+class SessionAPIMixin(LoginRequiredMixin):
+    """Answers anonymous API requests with a 403 instead of a login redirect."""
+
+    raise_exception = True
+
+    def error(self, message, status=400):
+        return JsonResponse({"error": message}, status=status)
+
+
+class SessionListAPIView(SessionAPIMixin, View):
+    """Lists the active sessions of the current user as JSON.
+
+    Query parameters:
+
+    - `fields`: comma separated subset of `API_FIELDS` to return; only those
+      columns are selected.
+    - `limit`: page size, capped by `SESSION_API_MAX_PAGE_SIZE`.
+    - `cursor`: the `next` value of the previous page.
+
+    The response carries an `ETag` derived from the number of sessions and
+    the latest `last_activity`, so a client polling with `If-None-Match`
+    gets a 304 from a single aggregate query.
+    """
+
+    def get(self, request):
+        with record_queries(request, self.__class__.__name__):
+            fields = request.GET.get("fields")
+            fields = fields.split(",") if fields else list(API_FIELDS)
+            unknown = [field for field in fields if field not in API_FIELDS]
+            if unknown:
+                return self.error(f"Unknown fields: {', '.join(unknown)}.")
+
+            max_page_size = getattr(settings, "SESSION_API_MAX_PAGE_SIZE", 100)
+            try:
+                limit = min(int(request.GET.get("limit", max_page_size)), max_page_size)
+                cursor = request.GET.get("cursor")
+                cursor = int(cursor) if cursor else None
+            except ValueError:
+                return self.error("limit and cursor must be integers.")
+            if limit < 1:
+                return self.error("limit must be positive.")
+
+            sessions = UserSession.objects.for_user(request.user).active()
+            etag = self.get_etag(sessions)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                if cursor is not None:
+                    sessions = sessions.filter(pk__lt=cursor)
+                rows = sessions.order_by("-pk").values(
+                    "pk", *(API_FIELDS[field] for field in fields)
+                )[: limit + 1]
+                response = StreamingHttpResponse(
+                    self.stream(list(rows), fields, limit),
+                    content_type="application/json",
+                )
+            response.headers["ETag"] = etag
+            return response
+
+    @staticmethod
+    def get_etag(sessions):
+        state = sessions.aggregate(
+            count=Count("pk"), last_pk=Max("pk"), last_activity=Max("last_activity")
+        )
+        last_activity = state["last_activity"]
+        return quote_etag(
+            "{count}-{last_pk}-{timestamp}".format(
+                timestamp=last_activity.timestamp() if last_activity else 0, **state
+            )
+        )
+
+    @staticmethod
+    def stream(rows, fields, limit):
+        encoder = DjangoJSONEncoder()
+        yield '{"results": ['
+        for index, row in enumerate(rows[:limit]):
+            item = {field: row[API_FIELDS[field]] for field in fields}
+            yield ("," if index else "") + encoder.encode(item)
+        next_cursor = rows[limit - 1]["pk"] if len(rows) > limit else None
+        yield '], "next": ' + encoder.encode(next_cursor) + "}"
+
+
+class SessionRevokeAPIView(SessionAPIMixin, View):
+    """Revokes one session of the current user."""
+
+    def delete(self, request, session_id):
+        with record_queries(request, self.__class__.__name__):
+            revoked = revoke_sessions(request.user, [session_id])
+        if not revoked:
+            return self.error("Session not found.", status=404)
+        return HttpResponse(status=204)
+
+
+class SessionBulkRevokeAPIView(SessionAPIMixin, View):
+    """Revokes several sessions of the current user.
+
+    The JSON body either lists the keys to revoke under `session_ids` or sets
+    `all` to revoke every session except the one making the request.
+    """
+
+    def post(self, request):
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return self.error("Invalid JSON body.")
+        if not isinstance(payload, dict):
+            return self.error("Expected a JSON object.")
+
+        with record_queries(request, self.__class__.__name__):
+            if payload.get("all"):
+                revoked = revoke_sessions(
+                    request.user, exclude=request.session.session_key
+                )
+            else:
+                session_ids = payload.get("session_ids")
+                if not isinstance(session_ids, list) or not all(
+                    isinstance(session_id, str) for session_id in session_ids
+                ):
+                    return self.error("session_ids must be a list of strings.")
+                revoked = revoke_sessions(request.user, session_ids)
+        return JsonResponse({"revoked": revoked})
+
+
+def revoke_sessions(user, session_ids=None, exclude=None):
+    """Ends the given sessions of `user` in the session store.
+
+    Keys that do not belong to `user` are ignored. Ownership is checked on the
+    primary database so a just-created session can be revoked immediately.
+    Returns the revoked keys.
+    """
+    with use_primary():
+        sessions = UserSession.objects.for_user(user)
+        if session_ids is not None:
+            sessions = sessions.filter(session_id__in=session_ids)
+        if exclude:
+            sessions = sessions.exclude(session_id=exclude)
+        revoked = list(sessions.values_list("session_id", flat=True))
+    delete_sessions(revoked, user=user)
+    return revoked
@@ -3,17 +3,9 @@ from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.contrib.sessions.models import Session
-from sage_session.models import UserSession
-
-BROWSER_ICONS = {
-    "Chrome": "fa-chrome",
-    "Firefox": "fa-firefox",
-    "Safari": "fa-safari",
-    "Edge": "fa-edge",
-    "Opera": "fa-opera",
-    "Internet Explorer": "fa-internet-explorer",
-}
+from sage_session.cache import BROWSER_ICONS, get_session_list  # noqa: F401
+from sage_session.utils.engines import delete_sessions, session_exists
+from sage_session.utils.queries import record_queries
 
 
 class DynamicTemplateMixin:
@@ -25,30 +17,16 @@ class DynamicTemplateMixin:
 
     def get_queryset(self):
         """Fetches and processes the user session data."""
-        sessions = UserSession.objects.filter(user=self.request.user)
-
-        session_data = []
-        for session in sessions:
-            browser_name = session.browser_info.split()[0]
-            icon_class = BROWSER_ICONS.get(
-                browser_name, "fa-question-circle"
-            )  # Default icon if not found
-            session_data.append(
-                {
-                    "device_info": session.device_info,
-                    "ip_address": session.ip_address,
-                    "browser_info": session.browser_info,
-                    "browser_icon": icon_class,
-                    "last_activity": session.last_activity,
-                    "session_id": session.session_id,
-                }
-            )
-        return session_data
+        with record_queries(self.request, self.__class__.__name__):
+            return get_session_list(self.request.user, self.request.session.session_key)
 
     def get_context_data(self, **kwargs):
         """Adds session data to the context."""
         context = super().get_context_data(**kwargs)
-        context[self.context_object_name] = self.get_queryset()
+        object_list = getattr(self, "object_list", None)
+        context[self.context_object_name] = (
+            self.get_queryset() if object_list is None else object_list
+        )
         return context
 
 
@@ -60,10 +38,11 @@ class DeleteSessionMixin(DynamicTemplateMixin, LoginRequiredMixin):
     """Mixin for handling session deletion with dynamic template."""
 
     def post(self, request, session_id):
-        try:
-            session = Session.objects.get(session_key=session_id)
-            session.delete()  # Remove session from session store
-        except Session.DoesNotExist:
+        with record_queries(request, self.__class__.__name__):
+            found = session_exists(session_id)
+            if found:
+                delete_sessions([session_id])  # Remove session from session store
+        if not found:
             messages.error(request, "Session not found.")
         else:
             messages.success(request, "Session successfully deleted.")